@@ -0,0 +1,448 @@
+"""
+End-to-end benchmark of the API against a local PostgreSQL instance.
+
+Usage (from api/):
+    python -m benchmark --dsn postgresql://postgres@localhost:5432/postgres
+    python -m benchmark --dsn ... --save-baseline
+    python -m benchmark --dsn ... --leagues 4 --reads 500 --concurrency 8 --json bench.json
+
+A fresh database (--database, dropped and recreated on every run) gets every
+db/*.sql file applied in name order, and the app is driven in-process through
+httpx's ASGI transport (no uvicorn, no network):
+
+  sync_insert  POST /api/sync/all with generated FBref-style tables (fixtures,
+               standings, home/away, squad and player stats), one league each
+  sync_update  the same payloads again: the upsert path plus derived refreshes
+  importer     importer/import_excel.py on a generated workbook (first run
+               inserts, later runs upsert)
+  matches, players, standings
+               GET /api/matches, /api/players, /api/standings across the synced
+               leagues, --concurrency requests in flight
+
+Each workload reports throughput and p50/p95/p99 latency; HTTP workloads also
+report database queries and time per request from the Server-Timing header.
+Results are compared with the baseline file (--baseline, written by
+--save-baseline) and the run exits with status 1 when any workload's p95 grows,
+or its throughput drops, by more than --tolerance.
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+from urllib.parse import urlparse, urlunparse
+import numpy as np
+import psycopg2
+from psycopg2 import sql
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(API_DIR)
+DEFAULT_BASELINE = os.path.join(API_DIR, "benchmark_baseline.json")
+SEASON = "2025-2026"
+IMPORT_SEASON = "2024-2025"
+TEAMS_PER_LEAGUE = 20
+PLAYERS_PER_TEAM = 25
+PLAYED_SHARE = 0.75  # share of gameweeks with a result
+LOCAL_HOSTS = (None, "", "localhost", "127.0.0.1", "::1")
+
+_SERVER_TIMING = re.compile(r'db;dur=([\d.]+);desc="(\d+) queries"')
+
+
+# ─── Database ──────────────────────────────────────────────────────────────
+
+def create_database(admin_dsn, name):
+    """Drop and recreate `name` on the server, apply db/*.sql; returns its DSN and the server version."""
+    admin = psycopg2.connect(admin_dsn)
+    admin.autocommit = True
+    cur = admin.cursor()
+    cur.execute(sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE)").format(sql.Identifier(name)))
+    cur.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(name)))
+    cur.execute("SHOW server_version")
+    version = cur.fetchone()[0]
+    admin.close()
+
+    dsn = urlunparse(urlparse(admin_dsn)._replace(path="/" + name))
+    conn = psycopg2.connect(dsn)
+    cur = conn.cursor()
+    for path in sorted(glob.glob(os.path.join(REPO_DIR, "db", "*.sql"))):
+        with open(path) as f:
+            cur.execute(f.read())
+        conn.commit()
+    conn.close()
+    return dsn, version
+
+
+def drop_database(admin_dsn, name):
+    admin = psycopg2.connect(admin_dsn)
+    admin.autocommit = True
+    admin.cursor().execute(sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE)").format(sql.Identifier(name)))
+    admin.close()
+
+
+# ─── Generated data ────────────────────────────────────────────────────────
+
+def _season_fixtures(rng, teams, first_day):
+    """Double round robin: (gameweek, date, home, away, home goals or None, away goals or None)."""
+    n = len(teams)
+    rotation = list(range(n))
+    rounds = []
+    for _ in range(n - 1):
+        rounds.append([(rotation[i], rotation[n - 1 - i]) for i in range(n // 2)])
+        rotation = [rotation[0], rotation[-1]] + rotation[1:-1]
+    rounds += [[(a, h) for h, a in pairings] for pairings in rounds]
+    played_weeks = int(len(rounds) * PLAYED_SHARE)
+    strength = rng.normal(0, 0.35, n)
+    fixtures = []
+    for gw, pairings in enumerate(rounds, start=1):
+        day = first_day + timedelta(days=7 * (gw - 1))
+        for h, a in pairings:
+            if gw <= played_weeks:
+                hg = int(rng.poisson(np.exp(0.3 + strength[h] - strength[a])))
+                ag = int(rng.poisson(np.exp(0.05 + strength[a] - strength[h])))
+            else:
+                hg = ag = None
+            fixtures.append((gw, day, teams[h], teams[a], hg, ag))
+    return fixtures
+
+
+def _table(fixtures, teams):
+    rows = {t: {"mp": 0, "w": 0, "d": 0, "l": 0, "gf": 0, "ga": 0,
+                "home": [0] * 8, "away": [0] * 8} for t in teams}
+    for _, _, home, away, hg, ag in fixtures:
+        if hg is None:
+            continue
+        for team, gf, ga, venue in ((home, hg, ag, "home"), (away, ag, hg, "away")):
+            r = rows[team]
+            result = "w" if gf > ga else "d" if gf == ga else "l"
+            r["mp"] += 1; r[result] += 1; r["gf"] += gf; r["ga"] += ga
+            split = r[venue]
+            split[0] += 1; split["wdl".index(result) + 1] += 1
+            split[4] += gf; split[5] += ga; split[6] += gf - ga; split[7] += {"w": 3, "d": 1, "l": 0}[result]
+    for r in rows.values():
+        r["pts"] = 3 * r["w"] + r["d"]
+    return sorted(rows.items(), key=lambda kv: (-kv[1]["pts"], kv[1]["ga"] - kv[1]["gf"]))
+
+
+def _players(rng, teams):
+    positions = ["GK", "DF", "DF", "DF", "DF", "MF", "MF", "MF", "FW", "FW"]
+    for team in teams:
+        for k in range(PLAYERS_PER_TEAM):
+            minutes = int(rng.integers(0, 2700))
+            goals = int(rng.poisson(minutes / 900))
+            yield {
+                "player": f"{team} Player {k + 1}", "nation": "eng ENG", "pos": positions[k % len(positions)],
+                "squad": team, "age": str(int(rng.integers(18, 36))), "born": str(int(rng.integers(1989, 2007))),
+                "mp": str(minutes // 80), "starts": str(minutes // 90), "min": str(minutes),
+                "90s": f"{minutes / 90:.1f}", "gls": str(goals), "ast": str(int(rng.poisson(goals * 0.6))),
+                "xg": f"{goals * rng.uniform(0.7, 1.3):.1f}", "npxg": f"{goals * rng.uniform(0.6, 1.1):.1f}",
+                "xag": f"{rng.uniform(0, 6):.1f}", "prgc": str(int(rng.integers(0, 80))),
+                "prgp": str(int(rng.integers(0, 150))),
+            }
+
+
+def sync_payload(league_index, seed=0):
+    """One league-season as the extension sends it: raw tables for /api/sync/all."""
+    rng = np.random.default_rng(seed + league_index)
+    league = f"Bench League {league_index + 1}"
+    teams = [f"BL{league_index + 1} Team {j + 1}" for j in range(TEAMS_PER_LEAGUE)]
+    fixtures = _season_fixtures(rng, teams, date(2025, 8, 16))
+    table = _table(fixtures, teams)
+
+    def score(hg, ag):
+        return "" if hg is None else f"{hg}–{ag}"
+
+    tables = [
+        {"headers": ["Wk", "Day", "Date", "Time", "Home", "Score", "Away", "Attendance", "Venue", "Referee"],
+         "rows": [[str(gw), day.strftime("%a"), day.isoformat(), "15:00", home, score(hg, ag), away,
+                   str(int(rng.integers(10000, 60000))), f"{home} Stadium", "Referee"]
+                  for gw, day, home, away, hg, ag in fixtures]},
+        {"headers": ["Rk", "Squad", "MP", "W", "D", "L", "GF", "GA", "GD", "Pts", "Pts/G"],
+         "rows": [[str(rank), team, str(r["mp"]), str(r["w"]), str(r["d"]), str(r["l"]), str(r["gf"]),
+                   str(r["ga"]), str(r["gf"] - r["ga"]), str(r["pts"]), f"{r['pts'] / max(r['mp'], 1):.2f}"]
+                  for rank, (team, r) in enumerate(table, start=1)]},
+        {"headers": ["Rk", "Squad"] + [f"{venue}_{k}" for venue in ("home", "away")
+                                       for k in ("games", "wins", "ties", "losses", "goals_for",
+                                                 "goals_against", "goal_diff", "points")],
+         "rows": [[str(rank), team] + [str(v) for v in r["home"] + r["away"]]
+                  for rank, (team, r) in enumerate(table, start=1)]},
+        {"headers": ["Squad", "# Pl", "Age", "Poss", "MP", "Starts", "Min", "90s", "Gls", "Ast", "xG", "npxG", "PrgC", "PrgP"],
+         "rows": [[prefix + team, str(int(rng.integers(20, 32))), f"{rng.uniform(24, 29):.1f}",
+                   f"{rng.uniform(35, 65):.1f}", str(r["mp"]), str(11 * r["mp"]), str(990 * r["mp"]),
+                   f"{11 * r['mp']:.1f}", str(r["gf"] if not prefix else r["ga"]), str(int(r["gf"] * 0.7)),
+                   f"{rng.uniform(20, 70):.1f}", f"{rng.uniform(18, 65):.1f}",
+                   str(int(rng.integers(300, 900))), str(int(rng.integers(800, 1800)))]
+                  for prefix in ("", "vs ") for team, r in table]},
+    ]
+    player_rows = list(_players(rng, teams))
+    headers = list(player_rows[0])
+    tables.append({"headers": ["Rk"] + [h.title() if h != "90s" else h for h in headers],
+                   "rows": [[str(i + 1)] + [p[h] for h in headers] for i, p in enumerate(player_rows)]})
+    return {"league": league, "season": SEASON, "tables": tables}
+
+
+def write_workbook(path, n_leagues, seed=0):
+    """A workbook in the layout importer/import_excel.py parses: one sheet per league."""
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    for i in range(n_leagues):
+        rng = np.random.default_rng(seed + 1000 + i)
+        league = f"Bench League {i + 1}"
+        teams = [f"BL{i + 1} Team {j + 1}" for j in range(TEAMS_PER_LEAGUE)]
+        fixtures = _season_fixtures(rng, teams, date(2024, 8, 17))
+        table = _table(fixtures, teams)
+        ws = wb.create_sheet(league[:31])
+        prefix = f"{IMPORT_SEASON} {league} TABLE"
+
+        ws.append([f"{prefix} SCORES & FIXTURES"])
+        ws.append(["gameweek", "dayofweek", "date", "start_time", "home_team", "score", "away_team",
+                   "attendance", "venue", "referee"])
+        for gw, day, home, away, hg, ag in fixtures:
+            ws.append([gw, day.strftime("%a"), day.isoformat(), "15:00", home,
+                       "" if hg is None else f"{hg}–{ag}", away, int(rng.integers(10000, 60000)),
+                       f"{home} Stadium", "Referee"])
+
+        ws.append([f"{prefix} SQUAD STANDARD STATS"])
+        ws.append(["team", "players_used", "avg_age", "possession", "games", "games_starts", "minutes",
+                   "minutes_90s", "goals", "assists", "xg", "npxg"])
+        for team, r in table:
+            ws.append([team, int(rng.integers(20, 32)), round(float(rng.uniform(24, 29)), 1),
+                       round(float(rng.uniform(35, 65)), 1), r["mp"], 11 * r["mp"], 990 * r["mp"],
+                       11 * r["mp"], r["gf"], int(r["gf"] * 0.7), round(float(rng.uniform(20, 70)), 1),
+                       round(float(rng.uniform(18, 65)), 1)])
+
+        ws.append([f"{prefix} PLAYER STANDARD STATS"])
+        ws.append(["ranker", "player", "nationality", "position", "team", "age", "birth_year", "games",
+                   "games_starts", "minutes", "minutes_90s", "goals", "assists", "xg"])
+        for k, p in enumerate(_players(rng, teams), start=1):
+            ws.append([k, p["player"], p["nation"], p["pos"], p["squad"], int(p["age"]), int(p["born"]),
+                       int(p["mp"]), int(p["starts"]), int(p["min"]), float(p["90s"]), int(p["gls"]),
+                       int(p["ast"]), float(p["xg"])])
+    wb.save(path)
+
+
+# ─── Workloads ─────────────────────────────────────────────────────────────
+
+def _summary(latencies, wall, db=None, rows=None, errors=0):
+    lat = np.array(latencies) * 1000
+    result = {
+        "requests": len(latencies),
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall > 0 else None,
+        "mean_ms": round(float(lat.mean()), 2) if len(lat) else None,
+    }
+    for q in (50, 95, 99):
+        result[f"p{q}_ms"] = round(float(np.percentile(lat, q)), 2) if len(lat) else None
+    if rows is not None:
+        result["rows_per_sec"] = round(rows / wall, 1) if wall > 0 else None
+    if db:
+        result["db_queries_per_request"] = round(sum(q for _, q in db) / len(db), 1)
+        result["db_ms_per_request"] = round(sum(ms for ms, _ in db) / len(db), 2)
+    return result
+
+
+def _db_timing(response):
+    match = _SERVER_TIMING.search(response.headers.get("server-timing", ""))
+    return (float(match.group(1)), int(match.group(2))) if match else None
+
+
+async def run_sync(client, payloads):
+    """POST every payload to /api/sync/all one after the other, as the extension does."""
+    latencies, db, rows, errors = [], [], 0, 0
+    started = time.perf_counter()
+    for payload in payloads:
+        t = time.perf_counter()
+        response = await client.post("/api/sync/all", json=payload)
+        latencies.append(time.perf_counter() - t)
+        if response.status_code != 200:
+            errors += 1
+            continue
+        body = response.json()
+        rows += sum(v for k, v in body.items() if k.endswith("_inserted"))
+        timing = _db_timing(response)
+        if timing:
+            db.append(timing)
+    return _summary(latencies, time.perf_counter() - started, db, rows, errors)
+
+
+def run_importer(path, runs):
+    """Import the workbook `runs` times through the importer, on a pooled app connection."""
+    sys.path.insert(0, os.path.join(REPO_DIR, "importer"))
+    import import_excel
+    from database import get_connection
+
+    latencies, rows = [], 0
+    started = time.perf_counter()
+    for _ in range(runs):
+        conn = get_connection()
+        try:
+            t = time.perf_counter()
+            rows += sum(import_excel.import_workbook(conn, path, log=lambda *_: None))
+            latencies.append(time.perf_counter() - t)
+        finally:
+            conn.close()
+    return _summary(latencies, time.perf_counter() - started, rows=rows)
+
+
+async def run_reads(client, path, param_sets, n_requests, concurrency):
+    """n_requests GETs of `path`, cycling through param_sets, `concurrency` at a time."""
+    limiter = asyncio.Semaphore(concurrency)
+    latencies, db, errors = [], [], 0
+
+    async def one(params):
+        nonlocal errors
+        async with limiter:
+            t = time.perf_counter()
+            response = await client.get(path, params=params)
+            latencies.append(time.perf_counter() - t)
+        if response.status_code != 200:
+            errors += 1
+        timing = _db_timing(response)
+        if timing:
+            db.append(timing)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(param_sets[i % len(param_sets)]) for i in range(n_requests)))
+    return _summary(latencies, time.perf_counter() - started, db, errors=errors)
+
+
+async def run_http(args, payloads):
+    import httpx
+    import main
+    from database import get_connection
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        results = {
+            "sync_insert": await run_sync(client, payloads),
+            "sync_update": await run_sync(client, payloads),
+        }
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute("SELECT id FROM leagues WHERE name LIKE 'Bench League %' ORDER BY id")
+        league_ids = [r["id"] for r in cur.fetchall()]
+        cur.execute("SELECT id FROM seasons WHERE name = %s", (SEASON,))
+        season_id = cur.fetchone()["id"]
+        conn.close()
+
+        per_league = [{"league_id": lid, "season_id": season_id} for lid in league_ids]
+        reads = {
+            "matches": ("/api/matches", per_league),
+            "players": ("/api/players", [{**p, "limit": 100} for p in per_league]),
+            "standings": ("/api/standings", per_league),
+        }
+        for name, (path, params) in reads.items():
+            await run_reads(client, path, params, min(args.reads, 20), args.concurrency)  # warm-up
+            results[name] = await run_reads(client, path, params, args.reads, args.concurrency)
+    return results
+
+
+# ─── Baseline ──────────────────────────────────────────────────────────────
+
+def compare(results, baseline, tolerance):
+    """[(workload, p95 change, throughput change, regressed)] against the baseline's workloads."""
+    rows = []
+    for name, base in baseline.get("workloads", {}).items():
+        current = results.get(name)
+        if not current or not base.get("p95_ms") or not base.get("throughput_rps"):
+            continue
+        p95 = current["p95_ms"] / base["p95_ms"] - 1
+        rps = current["throughput_rps"] / base["throughput_rps"] - 1
+        rows.append((name, p95, rps, p95 > tolerance or rps < -tolerance))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end API benchmark against a local PostgreSQL")
+    parser.add_argument("--dsn", default=os.getenv("BENCH_DSN", "postgresql://postgres@localhost:5432/postgres"),
+                        help="Server to benchmark on (any existing database; the bench database is created next to it)")
+    parser.add_argument("--database", default="football_bench", help="Database to (re)create for the run")
+    parser.add_argument("--sslmode", default="prefer")
+    parser.add_argument("--allow-remote", action="store_true", help="Allow a DSN that is not localhost")
+    parser.add_argument("--leagues", type=int, default=4, help="League-seasons synced (and imported)")
+    parser.add_argument("--import-runs", type=int, default=3)
+    parser.add_argument("--reads", type=int, default=300, help="Requests per read endpoint")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run's results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95/throughput change before flagging")
+    parser.add_argument("--keep", action="store_true", help="Keep the bench database afterwards")
+    parser.add_argument("--json", default=None, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    target = urlparse(args.dsn)
+    if target.hostname not in LOCAL_HOSTS and not args.allow_remote:
+        parser.error(f"{target.hostname} is not local; the benchmark drops and recreates --database (use --allow-remote)")
+    if args.database == target.path.lstrip("/"):
+        parser.error("--database must differ from the DSN's own database")
+
+    print(f"Creating {args.database} and applying db/*.sql ...")
+    bench_dsn, server_version = create_database(args.dsn, args.database)
+
+    # database.py loads api/.env with override=True, so point it at the bench database explicitly
+    import database
+    database.DATABASE_URL = bench_dsn
+    database.DB_SSLMODE = args.sslmode
+
+    try:
+        payloads = [sync_payload(i, args.seed) for i in range(args.leagues)]
+        results = asyncio.run(run_http(args, payloads))
+        with tempfile.TemporaryDirectory() as tmp:
+            workbook = os.path.join(tmp, "bench.xlsx")
+            write_workbook(workbook, args.leagues, args.seed)
+            results["importer"] = run_importer(workbook, args.import_runs)
+    finally:
+        database.close_pool()
+        if not args.keep:
+            drop_database(args.dsn, args.database)
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": {"postgres": server_version, "python": platform.python_version(),
+                        "cpus": os.cpu_count(), "machine": platform.machine()},
+        "config": {k: getattr(args, k) for k in ("leagues", "import_runs", "reads", "concurrency", "seed")},
+        "workloads": results,
+    }
+
+    print(f"\n{'workload':<12} {'reqs':>5} {'err':>4} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'rows/s':>9} {'q/req':>6} {'db ms':>7}")
+    for name, r in results.items():
+        print(f"{name:<12} {r['requests']:>5} {r['errors']:>4} {r['throughput_rps'] or 0:>8.1f} "
+              f"{r['p50_ms'] or 0:>8.2f} {r['p95_ms'] or 0:>8.2f} {r['p99_ms'] or 0:>8.2f} "
+              f"{r.get('rows_per_sec') or 0:>9.1f} {r.get('db_queries_per_request') or 0:>6.1f} "
+              f"{r.get('db_ms_per_request') or 0:>7.2f}")
+
+    regressed = False
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != report["config"]:
+            print(f"\nNote: baseline was recorded with {baseline.get('config')}; numbers may not be comparable")
+        print(f"\nAgainst baseline from {baseline.get('created')} (tolerance {args.tolerance:.0%}):")
+        for name, p95, rps, flag in compare(results, baseline, args.tolerance):
+            regressed |= flag
+            print(f"  {name:<12} p95 {p95:+7.1%}  throughput {rps:+7.1%}  {'REGRESSION' if flag else 'ok'}")
+        report["regressions"] = [name for name, _, _, flag in compare(results, baseline, args.tolerance) if flag]
+    else:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if regressed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
+import contextvars
 import os
+import threading
+import time
 import psycopg2
+import psycopg2.extensions
 from psycopg2.extras import RealDictCursor
 from urllib.parse import urlparse
 from dotenv import load_dotenv
@@ -8,9 +12,186 @@ _env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
 load_dotenv(dotenv_path=_env_path, override=True)
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# The hosted Postgres requires SSL; a local server (e.g. for python -m benchmark) usually has none
+DB_SSLMODE = os.getenv("DB_SSLMODE", "require")
 
+# Idle connections kept for reuse; connections idle longer than POOL_MAX_IDLE_SECONDS
+# are dropped on checkout since the hosted Postgres proxy closes them server-side.
+# Ones idle longer than POOL_PING_AFTER_SECONDS are pinged first, so a server that
+# went away (restart, failover) is noticed before a request gets the connection.
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+POOL_MAX_IDLE_SECONDS = 300
+POOL_PING_AFTER_SECONDS = float(os.getenv("DB_POOL_PING_AFTER_SECONDS", 1))
 
-def get_connection():
+_idle = []
+_idle_lock = threading.Lock()
+
+# Requests that run more queries than this are logged as likely N+1 patterns
+QUERY_WARN_THRESHOLD = int(os.getenv("DB_QUERY_WARN_THRESHOLD", 100))
+
+_request_stats = contextvars.ContextVar("db_request_stats", default=None)
+
+
+class QueryStats:
+    """Queries run on behalf of one request (see track_queries)."""
+    __slots__ = ("queries", "seconds", "rows", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.statements = {}  # SQL as sent by the caller -> [executions, seconds, slowest]
+
+    def record(self, query, seconds, rows, executions=1):
+        self.queries += executions
+        self.seconds += seconds
+        self.rows += rows
+        entry = self.statements.get(query)
+        if entry is None:
+            self.statements[query] = [executions, seconds, seconds]
+        else:
+            entry[0] += executions
+            entry[1] += seconds
+            if seconds > entry[2]:
+                entry[2] = seconds
+
+    def slowest(self, n=5):
+        """[(statement, executions, total seconds, slowest seconds)] by slowest single execution."""
+        ranked = sorted(self.statements.items(), key=lambda kv: kv[1][2], reverse=True)[:n]
+        return [(statement_text(q), *entry) for q, entry in ranked]
+
+    def most_repeated(self):
+        """(statement, executions) of the statement run most often, or None."""
+        if not self.statements:
+            return None
+        query, entry = max(self.statements.items(), key=lambda kv: kv[1][0])
+        return statement_text(query), entry[0]
+
+
+def statement_text(query, limit=300):
+    """Readable one-line SQL for reports."""
+    if isinstance(query, bytes):
+        # execute_values sends pre-rendered pages; keep the statement, not the rows
+        query = query.decode("utf-8", "replace")
+        cut = query.upper().find(" VALUES ")
+        if cut != -1:
+            query = query[:cut] + " VALUES ..."
+    elif not isinstance(query, str):
+        query = str(query)
+    text = " ".join(query.split())
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def track_queries():
+    """Collect stats for queries run in the current context (and threads it hands work to).
+
+    Returns (stats, token); pass the token to stop_tracking() when the request ends.
+    """
+    stats = QueryStats()
+    return stats, _request_stats.set(stats)
+
+
+def stop_tracking(token):
+    _request_stats.reset(token)
+
+
+class _InstrumentedCursor:
+    """Times execute()/executemany() into the current request's QueryStats, if any.
+
+    Rows are what the statement returned (rowcount of a result set); server-side
+    cursors fetch after execute() and their rows are not counted.
+    """
+    def execute(self, query, vars=None):
+        stats = _request_stats.get()
+        if stats is None:
+            return super().execute(query, vars)
+        started = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            rows = self.rowcount if self.description is not None and self.rowcount > 0 else 0
+            stats.record(query, time.perf_counter() - started, rows)
+
+    def executemany(self, query, vars_list):
+        stats = _request_stats.get()
+        if stats is None:
+            return super().executemany(query, vars_list)
+        vars_list = list(vars_list)
+        started = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            # One round trip per parameter set
+            stats.record(query, time.perf_counter() - started, 0, executions=len(vars_list))
+
+
+_instrumented_classes = {}
+
+
+def _instrumented(cursor_class):
+    cls = _instrumented_classes.get(cursor_class)
+    if cls is None:
+        cls = _instrumented_classes[cursor_class] = type(
+            "Instrumented" + cursor_class.__name__, (_InstrumentedCursor, cursor_class), {})
+    return cls
+
+
+class PooledConnection(psycopg2.extensions.connection):
+    """Connection whose close() hands it back to the pool instead of disconnecting."""
+    _checked_out = False
+    _released_at = 0.0
+
+    def cursor(self, name=None, cursor_factory=None, **kwargs):
+        # Every cursor class (RealDictCursor, tuple cursors, server-side) gets timed
+        factory = cursor_factory or self.cursor_factory or psycopg2.extensions.cursor
+        return super().cursor(name, cursor_factory=_instrumented(factory), **kwargs)
+
+    def close(self):
+        # Already back in the pool (or never handed out): a repeated close() is a no-op
+        if not self._checked_out:
+            return
+        self._checked_out = False
+        try:
+            status = self.info.transaction_status
+            if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                return self.discard()
+            if status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                self.rollback()
+        except psycopg2.Error:
+            return self.discard()
+        self._released_at = time.monotonic()
+        with _idle_lock:
+            if len(_idle) < POOL_SIZE:
+                _idle.append(self)
+                return
+        self.discard()
+
+    def discard(self):
+        """Really disconnect."""
+        try:
+            super().close()
+        except psycopg2.Error:
+            pass
+
+    def usable(self, now):
+        """Whether an idle connection can be handed out again (pinging it if it idled a while)."""
+        if self.closed or now - self._released_at >= POOL_MAX_IDLE_SECONDS:
+            return False
+        try:
+            if self.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                self.rollback()
+            if now - self._released_at >= POOL_PING_AFTER_SECONDS:
+                # Plain cursor: the ping is not a query of the request being served
+                cur = psycopg2.extensions.connection.cursor(self)
+                cur.execute("SELECT 1")
+                cur.close()
+                self.rollback()
+            return self.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        except psycopg2.Error:
+            return False
+
+
+def _connect():
         p = urlparse(DATABASE_URL)
         return psycopg2.connect(
             host=p.hostname,
@@ -18,12 +199,39 @@ def get_connection():
             dbname=p.path.lstrip("/"),
             user=p.username,
             password=p.password,
-            sslmode="require",
+            sslmode=DB_SSLMODE,
             connect_timeout=10,
             cursor_factory=RealDictCursor,
+            connection_factory=PooledConnection,
         )
 
 
+def get_connection():
+        conn = None
+        while conn is None:
+            with _idle_lock:
+                if not _idle:
+                    break
+                candidate = _idle.pop()
+            # Checked outside the lock: a ping is a round trip
+            if candidate.usable(time.monotonic()):
+                conn = candidate
+            else:
+                candidate.discard()
+        if conn is None:
+            conn = _connect()
+        conn._checked_out = True
+        return conn
+
+
+def close_pool():
+        """Disconnect every idle pooled connection (on shutdown; checked-out ones are discarded on close())."""
+        with _idle_lock:
+            idle, _idle[:] = list(_idle), []
+        for conn in idle:
+            conn.discard()
+
+
 def get_db():
         conn = get_connection()
         try:
@@ -0,0 +1,78 @@
+"""
+Refreshes of the data derived from match results, shared by the sync
+endpoints and the match edit/delete routes.
+
+Each refresh runs in its own savepoint inside the caller's transaction, so a
+failure there rolls back that refresh alone and never the results being
+written. Cached predictions are dropped with invalidate_predictions() only
+after the caller has committed.
+"""
+import logging
+from ml import prediction_cache
+from ml.feature_store import update_team_features
+from ratings import update_ratings
+from standings_snapshots import rebuild_snapshots
+import league_overview
+import sync_timing
+from sync_timing import phase
+
+logger = logging.getLogger(__name__)
+
+
+def invalidate_predictions(results):
+    """Drop cached predictions for teams whose results changed; only after the commit,
+    or a prediction request in between would re-cache one from the old features."""
+    prediction_cache.invalidate_teams({team for home, away, _ in results for team in (home, away)})
+
+
+def _earliest_gameweek(results):
+    """Earliest gameweek among changed results; 1 if one has no gameweek."""
+    earliest = None
+    for _, _, gw in results:
+        if gw is None:
+            return 1
+        earliest = gw if earliest is None else min(earliest, gw)
+    return earliest
+
+
+def in_savepoint(cur, name, fn, *args):
+    """Run a derived-data refresh in a savepoint so it can never fail the sync itself.
+
+    Timed as its own sync phase ("sp_snapshots" -> "snapshots"); a failure is
+    logged and listed in the sync timer's failed phases.
+    """
+    label = name.removeprefix("sp_")
+    with phase(label):
+        cur.execute(f"SAVEPOINT {name}")
+        try:
+            result = fn(cur, *args)
+            cur.execute(f"RELEASE SAVEPOINT {name}")
+            return result
+        except Exception:
+            logger.exception("Derived-data refresh %r failed; rolled back", label)
+            cur.execute(f"ROLLBACK TO SAVEPOINT {name}")
+            sync_timing.fail(label)
+            return None
+
+
+def refresh_snapshots(cur, league_id, season_id, results):
+    """Rebuild standings snapshots from the earliest gameweek whose results changed."""
+    from_gw = _earliest_gameweek(results)
+    if from_gw is None:
+        return 0
+    return in_savepoint(cur, "sp_snapshots", rebuild_snapshots, league_id, season_id, from_gw) or 0
+
+
+def refresh_features(cur, league_id, season_id, stale=()):
+    """Replay the team feature store for teams whose results changed."""
+    return in_savepoint(cur, "sp_features", update_team_features, league_id, season_id, stale) or 0
+
+
+def refresh_ratings(cur, league_id, since=None):
+    """Apply new or changed results to the league's Elo/Poisson ratings."""
+    return in_savepoint(cur, "sp_ratings", update_ratings, league_id, since) or 0
+
+
+def refresh_overview(cur, league_id, season_id):
+    """Re-assemble the precomputed league overview after any change touching the league."""
+    return in_savepoint(cur, "sp_overview", league_overview.build_overview, league_id, season_id) is not None
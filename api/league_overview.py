@@ -0,0 +1,185 @@
+"""
+Precomputed league-season overview (standings, top scorers, recent results,
+squad leaders), served with the league-season's upcoming fixtures.
+
+The document is assembled once after each sync that touches the league and
+stored in league_overviews; reads come from a small in-process cache or a
+primary-key lookup, with the stored JSON text spliced in untouched. Upcoming
+fixtures depend on today's date, so they are queried when the document is
+served rather than frozen into it at build time.
+"""
+import threading
+import time
+from serialization import dumps, tuple_cursor
+
+TOP_N = 10
+LEADERS_N = 5
+CACHE_TTL_SECONDS = 60  # other workers may rebuild; bound how long a copy can be stale
+
+_cache = {}  # (league_id, season_id or None) -> (expires_at, json bytes)
+_cache_lock = threading.Lock()
+
+# Squad leader boards: (key, column, direction)
+_LEADER_BOARDS = [
+    ("goals",      "ts.goals",      "DESC"),
+    ("assists",    "ts.assists",    "DESC"),
+    ("possession", "ts.possession", "DESC"),
+    ("youngest",   "ts.avg_age",    "ASC"),
+]
+
+
+def _standings(cur, league_id, season_id):
+    cur.execute("""
+        SELECT ls.rank, ls.team_id, t.name AS team, ls.games, ls.wins, ls.ties, ls.losses,
+               ls.goals_for, ls.goals_against, ls.goal_diff, ls.points
+        FROM league_standings ls
+        JOIN teams t ON t.id = ls.team_id
+        WHERE ls.league_id = %s AND ls.season_id = %s
+        ORDER BY ls.rank
+    """, (league_id, season_id))
+    rows = cur.fetchall()
+    if rows:
+        return rows
+    # No scraped table yet: fall back to the latest per-gameweek snapshot
+    cur.execute("""
+        SELECT ss.rank, ss.team_id, t.name AS team, ss.games, ss.wins, ss.ties, ss.losses,
+               ss.goals_for, ss.goals_against, ss.goals_for - ss.goals_against AS goal_diff, ss.points
+        FROM standings_snapshots ss
+        JOIN teams t ON t.id = ss.team_id
+        WHERE ss.league_id = %s AND ss.season_id = %s
+          AND ss.gameweek = (SELECT MAX(gameweek) FROM standings_snapshots
+                             WHERE league_id = %s AND season_id = %s)
+        ORDER BY ss.rank
+    """, (league_id, season_id, league_id, season_id))
+    return cur.fetchall()
+
+
+def _top_scorers(cur, league_id, season_id):
+    cur.execute("""
+        SELECT ps.player_name, ps.position, t.name AS team, ps.goals, ps.assists, ps.minutes_90s
+        FROM player_stats ps
+        JOIN teams t ON t.id = ps.team_id
+        WHERE t.league_id = %s AND ps.season_id = %s AND ps.goals IS NOT NULL
+        ORDER BY ps.goals DESC, ps.assists DESC NULLS LAST
+        LIMIT %s
+    """, (league_id, season_id, TOP_N))
+    return cur.fetchall()
+
+
+def _matches(cur, league_id, season_id, played):
+    condition = ("m.home_score IS NOT NULL AND m.away_score IS NOT NULL" if played
+                 else "m.home_score IS NULL AND m.match_date >= CURRENT_DATE")
+    cur.execute(f"""
+        SELECT m.id, m.match_date, m.start_time, m.gameweek,
+               ht.name AS home_team, at.name AS away_team,
+               m.home_score, m.away_score, m.venue
+        FROM matches m
+        JOIN teams ht ON ht.id = m.home_team_id
+        JOIN teams at ON at.id = m.away_team_id
+        WHERE m.league_id = %s AND m.season_id = %s AND {condition}
+        ORDER BY m.match_date {"DESC" if played else "ASC"}, m.start_time
+        LIMIT %s
+    """, (league_id, season_id, TOP_N))
+    return cur.fetchall()
+
+
+def _squad_leaders(cur, league_id, season_id):
+    leaders = {}
+    for key, column, direction in _LEADER_BOARDS:
+        cur.execute(f"""
+            SELECT t.name AS team, {column} AS value
+            FROM team_squad_stats ts
+            JOIN teams t ON t.id = ts.team_id
+            WHERE ts.league_id = %s AND ts.season_id = %s AND ts.split = 'for'
+              AND {column} IS NOT NULL
+            ORDER BY {column} {direction}
+            LIMIT %s
+        """, (league_id, season_id, LEADERS_N))
+        leaders[key] = cur.fetchall()
+    return leaders
+
+
+def _assemble(cur, league_id, season_id):
+    cur.execute("""
+        SELECT l.id AS league_id, l.name AS league, s.id AS season_id, s.name AS season
+        FROM leagues l, seasons s WHERE l.id = %s AND s.id = %s
+    """, (league_id, season_id))
+    header = cur.fetchone()
+    if not header:
+        return None
+    return dumps({
+        **header,
+        "standings":      _standings(cur, league_id, season_id),
+        "top_scorers":    _top_scorers(cur, league_id, season_id),
+        "recent_results": _matches(cur, league_id, season_id, played=True),
+        "squad_leaders":  _squad_leaders(cur, league_id, season_id),
+    })
+
+
+def build_overview(cur, league_id, season_id):
+    """Assemble and store the overview document; returns it as JSON bytes.
+
+    The in-process cache is not touched: the caller commits, then calls forget()
+    (or remember()), so readers never see a document that was rolled back.
+    """
+    document = _assemble(cur, league_id, season_id)
+    if document is None:
+        return None
+    cur.execute("""
+        INSERT INTO league_overviews (league_id, season_id, document, built_at)
+        VALUES (%s, %s, %s::jsonb, NOW())
+        ON CONFLICT (league_id, season_id) DO UPDATE SET
+            document = EXCLUDED.document,
+            built_at = NOW()
+    """, (league_id, season_id, document.decode()))
+    return document
+
+
+def current_season(conn, league_id):
+    """Latest season (by name) the league has matches or an overview for."""
+    cur = tuple_cursor(conn)
+    cur.execute("""
+        SELECT s.id FROM seasons s
+        WHERE s.id IN (SELECT season_id FROM matches WHERE league_id = %s
+                       UNION SELECT season_id FROM league_overviews WHERE league_id = %s)
+        ORDER BY s.name DESC LIMIT 1
+    """, (league_id, league_id))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def read_overview(conn, league_id, season_id):
+    """The overview as served: the stored document plus upcoming fixtures as of now.
+
+    Read-only: a league-season not synced since overviews were introduced is
+    assembled for this response but not stored (the next sync stores it).
+    """
+    cur = tuple_cursor(conn)
+    cur.execute("SELECT document FROM league_overviews WHERE league_id = %s AND season_id = %s",
+                (league_id, season_id))
+    row = cur.fetchone()
+    document = row[0].encode() if row else _assemble(conn.cursor(), league_id, season_id)
+    if document is None:
+        return None
+    upcoming = dumps(_matches(conn.cursor(), league_id, season_id, played=False))
+    return document[:document.rindex(b"}")] + b', "upcoming_fixtures": ' + upcoming + b"}"
+
+
+def cached(league_id, season_id):
+    with _cache_lock:
+        entry = _cache.get((league_id, season_id))
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+
+def remember(league_id, season_id, document):
+    with _cache_lock:
+        _cache[(league_id, season_id)] = (time.monotonic() + CACHE_TTL_SECONDS, document)
+
+
+def forget(league_id, season_id):
+    """Drop cached copies after a committed rebuild, including the latest-season one."""
+    with _cache_lock:
+        _cache.pop((league_id, season_id), None)
+        _cache.pop((league_id, None), None)
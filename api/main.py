@@ -1,15 +1,29 @@
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from dotenv import load_dotenv
+import database
+import metrics
+import season_simulator
 
 
-from routes import leagues, teams, matches, standings, squad_stats, player_stats, sync, health, auth, cleanup, predictions
+from routes import leagues, teams, matches, standings, squad_stats, player_stats, sync, health, auth, cleanup, predictions, export, batch, ratings
 
 
 load_dotenv()
 
 
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    # Stop the simulator's worker processes and disconnect pooled connections
+    # instead of leaving them to the OS and the server's timeout
+    season_simulator.shutdown_pool()
+    database.close_pool()
+
+
 app = FastAPI(
     title="Football Analytics API",
     description="Production API for football data scraped from FBref",
@@ -18,6 +32,7 @@ app = FastAPI(
     # Without this, FastAPI redirects /api/leagues → http://…/api/leagues/ (trailing slash),
     # which browsers block as Mixed Content (page is HTTPS, redirect is HTTP).
     redirect_slashes=False,
+    lifespan=lifespan,
 )
 
 
@@ -38,6 +53,16 @@ app.add_middleware(
 )
 
 
+# Compress JSON / MessagePack / Arrow bodies only when they are big enough to be worth it
+# (clients opt in via Accept-Encoding; small responses go out uncompressed)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+
+# Per-route latency histograms, status counts and in-flight gauges for /api/metrics
+# (added last so it is outermost and times compression too)
+app.add_middleware(metrics.MetricsMiddleware)
+
+
 # Register all route modules
 app.include_router(health.router,       prefix="/api",             tags=["Health"])
 app.include_router(leagues.router,      prefix="/api/leagues",     tags=["Leagues"])
@@ -50,6 +75,9 @@ app.include_router(sync.router,         prefix="/api/sync",        tags=["Sync"]
 app.include_router(cleanup.router,      prefix="/api/cleanup",     tags=["Cleanup"])
 app.include_router(auth.router,                                    tags=["Auth"])
 app.include_router(predictions.router,  prefix="/api/predictions", tags=["Predictions"])
+app.include_router(export.router,       prefix="/api/export",      tags=["Export"])
+app.include_router(batch.router,        prefix="/api/batch",       tags=["Batch"])
+app.include_router(ratings.router,      prefix="/api/ratings",     tags=["Ratings"])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,225 @@
+"""
+Per-route request metrics (latency histogram, request count by status, requests
+in flight, database queries per request), exposed in Prometheus text format at
+/api/metrics.
+
+MetricsMiddleware is a plain ASGI middleware (no BaseHTTPMiddleware task or
+Request object per call): a request costs two perf_counter() calls, a bisect
+into the bucket bounds and a few dict updates. The route template
+("/api/matches/{match_id}") is read from the scope the router filled in, so
+paths are never matched twice. In-flight requests are kept by scope and only
+grouped by template when /api/metrics is scraped.
+
+Database work is collected by the cursor wrapper in database.py for the
+duration of each request: the response carries it as a Server-Timing entry
+(db;dur=<ms>;desc="<n> queries"), the route's counters and queries-per-request
+histogram are updated, the slowest statements feed the /api/metrics/queries
+table, and a request over database.QUERY_WARN_THRESHOLD queries is logged
+with its most repeated statement (the usual N+1 signature).
+
+Updates happen on the event loop, but /api/metrics and /api/metrics/queries
+are sync endpoints served from the threadpool, so every update and the
+snapshot those endpoints render from are taken under one lock.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+import database
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds; the last bucket is +Inf
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+UNMATCHED = "unmatched"  # 404s and anything else no route claimed
+SLOW_STATEMENTS_KEPT = 20
+
+_stats = {}      # (method, template) -> _RouteStats
+_in_flight = {}  # id(scope) -> scope of requests still being handled
+_slow_statements = {}  # statement -> {"route", "slowest_ms", "executions", "total_ms"}
+_lock = threading.Lock()
+
+
+class _RouteStats:
+    __slots__ = ("buckets", "total", "count", "statuses", "db_queries", "db_seconds", "db_rows", "query_buckets")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.statuses = {}
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.db_rows = 0
+        self.query_buckets = [0] * (len(QUERY_BUCKETS) + 1)
+
+    def copy(self):
+        other = _RouteStats()
+        for name in self.__slots__:
+            value = getattr(self, name)
+            setattr(other, name, value.copy() if isinstance(value, (list, dict)) else value)
+        return other
+
+
+def route_template(scope):
+    """Path template of the route that handled scope, or None before/without routing."""
+    # Newer FastAPI keeps included routers intact and records the prefixed path here
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    if context is not None:
+        return context.path
+    route = scope.get("route")
+    return getattr(route, "path", None)
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        status = 500
+        queries, token = database.track_queries()
+
+        async def send_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if queries.queries:
+                    # Queries a streaming body runs after this point are not in the header
+                    timing = f'db;dur={queries.seconds * 1000:.2f};desc="{queries.queries} queries"'
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        key = id(scope)
+        with _lock:
+            _in_flight[key] = scope
+        started = time.perf_counter()
+        scope["received_at"] = started  # lets sync endpoints time body parsing and validation
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            database.stop_tracking(token)
+            route = (scope["method"], route_template(scope) or UNMATCHED)
+            with _lock:
+                del _in_flight[key]
+                stats = _stats.get(route)
+                if stats is None:
+                    stats = _stats[route] = _RouteStats()
+                stats.count += 1
+                stats.total += elapsed
+                stats.buckets[bisect_left(BUCKETS, elapsed)] += 1
+                stats.statuses[status] = stats.statuses.get(status, 0) + 1
+                stats.query_buckets[bisect_left(QUERY_BUCKETS, queries.queries)] += 1
+                if queries.queries:
+                    stats.db_queries += queries.queries
+                    stats.db_seconds += queries.seconds
+                    stats.db_rows += queries.rows
+                    _record_queries(route, queries)
+            if queries.queries > database.QUERY_WARN_THRESHOLD:
+                statement, executions = queries.most_repeated()
+                logger.warning("%s %s ran %d queries (%.1f ms in the database); most repeated (%dx): %s",
+                               *route, queries.queries, queries.seconds * 1000, executions, statement)
+
+
+def _record_queries(route, queries):
+    """Feed the slow statement table; called with _lock held."""
+    label = f"{route[0]} {route[1]}"
+    for statement, executions, seconds, slowest in queries.slowest(3):
+        entry = _slow_statements.get(statement)
+        if entry is None:
+            if len(_slow_statements) >= SLOW_STATEMENTS_KEPT:
+                fastest = min(_slow_statements, key=lambda k: _slow_statements[k]["slowest_ms"])
+                if _slow_statements[fastest]["slowest_ms"] >= slowest * 1000:
+                    continue
+                del _slow_statements[fastest]
+            entry = _slow_statements[statement] = {"route": label, "slowest_ms": 0.0, "executions": 0, "total_ms": 0.0}
+        entry["executions"] += executions
+        entry["total_ms"] += seconds * 1000
+        if slowest * 1000 > entry["slowest_ms"]:
+            entry.update(route=label, slowest_ms=slowest * 1000)
+
+
+def slow_statements():
+    """Slowest statements seen (by their slowest single execution), with the route that ran it."""
+    with _lock:
+        entries = [(statement, dict(e)) for statement, e in _slow_statements.items()]
+    ranked = sorted(entries, key=lambda kv: kv[1]["slowest_ms"], reverse=True)
+    return [{"statement": statement, "route": e["route"], "executions": e["executions"],
+             "slowest_ms": round(e["slowest_ms"], 2), "total_ms": round(e["total_ms"], 2)}
+            for statement, e in ranked]
+
+
+def _escape(value):
+    """Label value escaping of the text format: backslash, double quote and newline."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(method, route, **extra):
+    pairs = [("method", method), ("route", route)] + [(k, str(v)) for k, v in extra.items()]
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def render():
+    """Prometheus text exposition format (0.0.4)."""
+    with _lock:
+        routes = sorted((route, s.copy()) for route, s in _stats.items())
+        scopes = list(_in_flight.values())
+    lines = [
+        "# HELP http_requests_total Requests handled, by route template and status code.",
+        "# TYPE http_requests_total counter",
+    ]
+    for (method, route), s in routes:
+        for status, n in sorted(s.statuses.items()):
+            lines.append(f"http_requests_total{_labels(method, route, status=status)} {n}")
+
+    lines += [
+        "# HELP http_request_duration_seconds Request latency by route template.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route), s in routes:
+        cumulative = 0
+        for bound, n in zip(BUCKETS + ("+Inf",), s.buckets):
+            cumulative += n
+            lines.append(f"http_request_duration_seconds_bucket{_labels(method, route, le=bound)} {cumulative}")
+        lines.append(f"http_request_duration_seconds_sum{_labels(method, route)} {s.total:.6f}")
+        lines.append(f"http_request_duration_seconds_count{_labels(method, route)} {s.count}")
+
+    lines += [
+        "# HELP http_request_db_queries Database queries per request by route template.",
+        "# TYPE http_request_db_queries histogram",
+    ]
+    for (method, route), s in routes:
+        cumulative = 0
+        for bound, n in zip(QUERY_BUCKETS + ("+Inf",), s.query_buckets):
+            cumulative += n
+            lines.append(f"http_request_db_queries_bucket{_labels(method, route, le=bound)} {cumulative}")
+        lines.append(f"http_request_db_queries_sum{_labels(method, route)} {s.db_queries}")
+        lines.append(f"http_request_db_queries_count{_labels(method, route)} {s.count}")
+
+    for name, attr, help_text in (
+        ("http_request_db_seconds_total", "db_seconds", "Time spent executing database queries."),
+        ("http_request_db_rows_total", "db_rows", "Rows returned by database queries."),
+    ):
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+        for (method, route), s in routes:
+            value = getattr(s, attr)
+            lines.append(f"{name}{_labels(method, route)} {value:.6f}" if isinstance(value, float)
+                         else f"{name}{_labels(method, route)} {value}")
+
+    # Requests still being routed have no template yet and are left out
+    in_flight = dict.fromkeys((route for route, _ in routes), 0)
+    for scope in scopes:
+        template = route_template(scope)
+        if template:
+            key = (scope["method"], template)
+            in_flight[key] = in_flight.get(key, 0) + 1
+    lines += [
+        "# HELP http_requests_in_flight Requests currently being handled, by route template.",
+        "# TYPE http_requests_in_flight gauge",
+    ]
+    for (method, route), n in sorted(in_flight.items()):
+        lines.append(f"http_requests_in_flight{_labels(method, route)} {n}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,188 @@
+"""
+Walk-forward backtest of EnsembleModel against a naive home-win baseline.
+
+Usage (from api/):
+    python -m ml.backtest [--league-id 1] [--folds 20] [--workers 4]
+    python -m ml.backtest --synthetic 8000
+    python -m ml.backtest --dataset data/train
+
+Played matches are replayed in date order and cut into gameweeks (7-day
+blocks from the first match, the same fallback the standings snapshots use).
+Each fold trains on every match before a gameweek (expanding window) and
+predicts that gameweek. Folds run in parallel worker processes; each reports
+accuracy, log-loss and Brier score for the model and the baseline, plus its
+training and prediction time.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+MIN_TRAIN_MATCHES = 200
+N_CLASSES = 3
+
+_X = None
+_y = None
+
+
+def _init_worker(X, y, dataset=None):
+    # Each worker receives the dataset once, not once per fold; on-disk datasets
+    # are memory-mapped by every worker rather than pickled across
+    global _X, _y
+    if dataset:
+        from ml.dataset import open_dataset
+        _, X, y, _, _ = open_dataset(dataset)
+    _X, _y = X, y
+
+
+def _scores(y_true, proba):
+    eps = 1e-15
+    p = np.clip(proba, eps, 1 - eps)
+    onehot = np.eye(N_CLASSES)[y_true]
+    return {
+        "accuracy": float(np.mean(proba.argmax(axis=1) == y_true)),
+        "log_loss": float(-np.mean(np.log(p[np.arange(len(y_true)), y_true]))),
+        "brier": float(np.mean(np.sum((proba - onehot) ** 2, axis=1))),
+    }
+
+
+def _run_fold(fold, start, end, member_n_jobs):
+    from ml.ml_models import EnsembleModel
+    from ml.predictor import outcome_probabilities
+
+    X_train, y_train = _X[:start], _y[:start]
+    X_test, y_test = _X[start:end], _y[start:end]
+
+    model = EnsembleModel(n_jobs=1, member_n_jobs=member_n_jobs)
+    started = time.perf_counter()
+    model.train(X_train, y_train)
+    train_s = time.perf_counter() - started
+    started = time.perf_counter()
+    proba = outcome_probabilities(model, X_test)
+    predict_s = time.perf_counter() - started
+
+    # Baseline: always pick a home win, with the training set's outcome frequencies as probabilities
+    prior = np.bincount(y_train, minlength=N_CLASSES) / len(y_train)
+    baseline = np.tile(prior, (len(y_test), 1))
+    baseline_scores = _scores(y_test, baseline)
+    baseline_scores["accuracy"] = float(np.mean(y_test == 0))
+
+    return {
+        "fold": fold,
+        "train_matches": int(start),
+        "test_matches": int(end - start),
+        "train_seconds": round(train_s, 3),
+        "predict_seconds": round(predict_s, 4),
+        "model": _scores(y_test, proba),
+        "baseline": baseline_scores,
+    }
+
+
+def _folds(weeks, n_folds):
+    """(start, end) row ranges of the last n_folds gameweeks with enough history before them."""
+    bounds = np.flatnonzero(np.diff(weeks)) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [len(weeks)]))
+    folds = [(int(s), int(e)) for s, e in zip(starts, ends) if s >= MIN_TRAIN_MATCHES]
+    return folds[-n_folds:] if n_folds else folds
+
+
+def load_database(league_id=None):
+    """Played matches from the feature store, in date order, with their gameweek index."""
+    from database import get_connection
+    from ml.feature_store import feature_matrix
+    from serialization import tuple_cursor
+
+    conn = get_connection()
+    try:
+        ids, X, y = feature_matrix(conn, league_id=league_id, played=True)
+        cur = tuple_cursor(conn)
+        cur.execute("SELECT id, match_date FROM matches WHERE id = ANY(%s)", (ids.tolist(),))
+        dates = dict(cur.fetchall())
+    finally:
+        conn.close()
+    days = np.array([dates[i].toordinal() for i in ids.tolist()], dtype=np.int64)
+    weeks = (days - days.min()) // 7 if len(days) else days
+    return X, y.astype(np.int64), weeks
+
+
+def load_synthetic(n_matches, n_features=16, matches_per_week=10, seed=0):
+    """Matches from latent team strengths: features are noisy views of the strength gap."""
+    rng = np.random.default_rng(seed)
+    gap = rng.normal(0.25, 1.0, n_matches)  # home advantage built in
+    X = gap[:, None] * rng.uniform(0.2, 1.0, n_features) + rng.normal(0, 1.0, (n_matches, n_features))
+    margin = gap + rng.normal(0, 1.2, n_matches)
+    y = np.where(margin > 0.45, 0, np.where(margin < -0.45, 2, 1)).astype(np.int64)
+    weeks = np.arange(n_matches) // matches_per_week
+    return X, y, weeks
+
+
+def load_dataset(path):
+    """Rows, labels and gameweeks of a dataset written by ml.dataset (memory-mapped)."""
+    from ml.dataset import open_dataset
+    _, X, y, days, _ = open_dataset(path)
+    weeks = (days - days[0]) // 7 if len(days) else np.asarray(days)
+    return X, y.astype(np.int64), weeks
+
+
+def run(X, y, weeks, n_folds=None, workers=None, member_n_jobs=1, dataset=None):
+    folds = _folds(weeks, n_folds)
+    workers = workers or os.cpu_count() or 1
+    # spawn: forking after OpenMP-backed libraries have been imported can deadlock
+    ctx = multiprocessing.get_context("spawn")
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker,
+                             initargs=(None, None, dataset) if dataset else (X, y)) as pool:
+        futures = [pool.submit(_run_fold, k, s, e, member_n_jobs) for k, (s, e) in enumerate(folds)]
+        results = [f.result() for f in futures]
+    wall = time.perf_counter() - started
+
+    tested = sum(r["test_matches"] for r in results)
+    summary = {"folds": len(results), "test_matches": tested, "wall_seconds": round(wall, 2),
+               "train_seconds": round(sum(r["train_seconds"] for r in results), 2)}
+    for side in ("model", "baseline"):
+        summary[side] = {
+            metric: round(sum(r[side][metric] * r["test_matches"] for r in results) / tested, 4) if tested else None
+            for metric in ("accuracy", "log_loss", "brier")
+        }
+    return results, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the match-outcome ensemble")
+    parser.add_argument("--league-id", type=int, default=None)
+    parser.add_argument("--synthetic", type=int, default=None, metavar="N", help="Use N synthetic matches instead of the database")
+    parser.add_argument("--dataset", default=None, help="Use a dataset directory written by ml.dataset")
+    parser.add_argument("--folds", type=int, default=None, help="Only the last N gameweeks")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--member-jobs", type=int, default=1, help="Cores per ensemble member inside each worker")
+    parser.add_argument("--json", default=None, help="Also write fold results and summary to this file")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        X, y, weeks = load_synthetic(args.synthetic)
+    elif args.dataset:
+        X, y, weeks = load_dataset(args.dataset)
+    else:
+        X, y, weeks = load_database(args.league_id)
+    results, summary = run(X, y, weeks, args.folds, args.workers, args.member_jobs, args.dataset)
+
+    print(f"{'fold':>4} {'train':>6} {'test':>5} {'acc':>6} {'base':>6} {'logloss':>8} {'base':>6} "
+          f"{'brier':>6} {'base':>6} {'fit s':>7} {'pred s':>7}")
+    for r in results:
+        m, b = r["model"], r["baseline"]
+        print(f"{r['fold']:>4} {r['train_matches']:>6} {r['test_matches']:>5} "
+              f"{m['accuracy']:>6.3f} {b['accuracy']:>6.3f} {m['log_loss']:>8.4f} {b['log_loss']:>6.4f} "
+              f"{m['brier']:>6.4f} {b['brier']:>6.4f} {r['train_seconds']:>7.3f} {r['predict_seconds']:>7.4f}")
+    print(json.dumps(summary, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"summary": summary, "folds": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
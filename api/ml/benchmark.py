@@ -0,0 +1,54 @@
+"""
+Training/inference timing benchmark for EnsembleModel on a synthetic dataset.
+
+Usage (from api/): python -m ml.benchmark [--rows 20000] [--features 16] [--repeat 3]
+
+Compares fitting the members one after the other with fitting them in
+parallel, and per-row scoring with one vectorized soft-voting batch.
+"""
+import argparse
+import os
+import time
+import numpy as np
+from sklearn.datasets import make_classification
+from ml.ml_models import EnsembleModel
+
+
+def _best_of(repeat, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ensemble training and inference")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--features", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of repetitions per measurement")
+    parser.add_argument("--score-rows", type=int, default=200, help="Rows scored one at a time for the per-row baseline")
+    args = parser.parse_args()
+
+    X, y = make_classification(n_samples=args.rows, n_features=args.features, n_informative=args.features // 2,
+                               n_classes=3, random_state=0)
+    cores = os.cpu_count() or 1
+    print(f"{args.rows} rows x {args.features} features, 3 classes, {cores} cores, best of {args.repeat}")
+
+    sequential = EnsembleModel(n_jobs=1, member_n_jobs=cores)
+    parallel = EnsembleModel(n_jobs=-1)
+    t_seq = _best_of(args.repeat, lambda: sequential.train(X, y))
+    t_par = _best_of(args.repeat, lambda: parallel.train(X, y))
+    print(f"train  sequential members (n_jobs={cores} each): {t_seq:8.3f} s")
+    print(f"train  parallel members   (n_jobs={max(1, cores // 2)} each): {t_par:8.3f} s  ({t_seq / t_par:.2f}x)")
+
+    rows = X[:args.score_rows]
+    t_row = _best_of(args.repeat, lambda: [parallel.predict_proba(r[None, :]) for r in rows]) / len(rows)
+    t_batch = _best_of(args.repeat, lambda: parallel.predict_proba(X))
+    print(f"score  per row:           {t_row * 1e6:10.1f} us/row")
+    print(f"score  batch of {len(X)}:   {t_batch / len(X) * 1e6:10.1f} us/row  ({t_row * len(X) / t_batch:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Memory-bounded extraction of the training set into an on-disk NumPy dataset.
+
+Usage (from api/): python -m ml.dataset --out data/train [--league-id 1] [--squad-stats]
+
+Played matches (home and away team_features rows, optionally each side's
+season squad standard_stats) are streamed from a server-side cursor in
+chunks and written straight into preallocated memory-mapped .npy arrays, so
+peak memory is one chunk of rows however many seasons are extracted. JSONB
+blobs arrive as raw text, are parsed once per row and then decoded key by
+key into float32 columns.
+
+The dataset directory holds X.npy (float32), y.npy (int8 outcome class),
+match_ids.npy, days.npy (match date ordinals), season_ids.npy and meta.json
+with the column names; open_dataset() maps it back read-only.
+"""
+import argparse
+import json
+import os
+from contextlib import contextmanager
+import numpy as np
+import orjson
+import psycopg2.extensions
+from numpy.lib.format import open_memmap
+from ml.feature_store import FEATURE_NAMES, FEATURES, AWAY_WIN, DRAW, HOME_WIN
+from parsing import safe_num
+from serialization import tuple_cursor
+
+CHUNK_ROWS = 5000
+
+
+def _squad_keys(cur, where, params):
+    """standard_stats keys whose values are all numeric across the extracted seasons."""
+    cur.execute(f"""
+        SELECT e.key
+        FROM team_squad_stats ts
+        CROSS JOIN LATERAL jsonb_each(
+            CASE WHEN jsonb_typeof(ts.standard_stats) = 'object' THEN ts.standard_stats ELSE '{{}}'::jsonb END
+        ) e
+        WHERE ts.split = 'for' AND ts.season_id IN (SELECT h.season_id FROM team_features h {where})
+        GROUP BY e.key
+        HAVING bool_and(
+            jsonb_typeof(e.value) IN ('number', 'null')
+            OR (jsonb_typeof(e.value) = 'string'
+                AND translate(e.value #>> '{{}}', ',%%', '') ~ '^(-?[0-9]*\\.?[0-9]+)?$')
+        )
+        ORDER BY e.key
+    """, params)
+    return [r[0] for r in cur.fetchall()]
+
+
+@contextmanager
+def _snapshot(conn):
+    """One read-only REPEATABLE READ transaction, so every query inside sees the same
+    snapshot. Any transaction the caller left open is committed first (the isolation
+    level can only be set before a transaction starts); the session is restored after."""
+    conn.commit()
+    conn.set_session(isolation_level=psycopg2.extensions.ISOLATION_LEVEL_REPEATABLE_READ, readonly=True)
+    try:
+        yield
+        conn.commit()
+    finally:
+        conn.rollback()
+        conn.set_session(isolation_level="DEFAULT", readonly="DEFAULT")
+
+
+def extract_dataset(conn, out_dir, league_id=None, squad_stats=False, chunk_size=CHUNK_ROWS):
+    """Write the dataset to out_dir; returns its metadata."""
+    where = "WHERE h.is_home AND h.goals_for IS NOT NULL"
+    params = []
+    if league_id:
+        where += " AND h.league_id = %s"; params.append(league_id)
+
+    # Row count and the streamed rows must come from the same snapshot
+    with _snapshot(conn):
+        cur = tuple_cursor(conn)
+        cur.execute(f"SELECT COUNT(*) FROM team_features h {where}", params)
+        n_rows = cur.fetchone()[0]
+        keys = _squad_keys(cur, where, params) if squad_stats else []
+        columns = list(FEATURE_NAMES) + [f"home_squad_{k}" for k in keys] + [f"away_squad_{k}" for k in keys]
+
+        feature_cols = ", ".join([f"h.{f}" for f in FEATURES] + [f"a.{f}" for f in FEATURES])
+        squad_cols, squad_joins = "", ""
+        if squad_stats:
+            squad_cols = ", hs.standard_stats, aws.standard_stats"
+            squad_joins = """
+                LEFT JOIN team_squad_stats hs  ON hs.team_id = h.team_id  AND hs.season_id = h.season_id  AND hs.split = 'for'
+                LEFT JOIN team_squad_stats aws ON aws.team_id = a.team_id AND aws.season_id = a.season_id AND aws.split = 'for'
+            """
+        query = f"""
+            SELECT h.match_id, h.match_date, h.goals_for, h.goals_against, h.season_id, {feature_cols}{squad_cols}
+            FROM team_features h
+            JOIN team_features a ON a.match_id = h.match_id AND NOT a.is_home
+            {squad_joins}
+            {where}
+            ORDER BY h.match_date, h.match_id
+        """
+
+        os.makedirs(out_dir, exist_ok=True)
+        X = open_memmap(os.path.join(out_dir, "X.npy"), mode="w+", dtype=np.float32, shape=(n_rows, len(columns)))
+        y = open_memmap(os.path.join(out_dir, "y.npy"), mode="w+", dtype=np.int8, shape=(n_rows,))
+        ids = open_memmap(os.path.join(out_dir, "match_ids.npy"), mode="w+", dtype=np.int64, shape=(n_rows,))
+        days = open_memmap(os.path.join(out_dir, "days.npy"), mode="w+", dtype=np.int32, shape=(n_rows,))
+        seasons = open_memmap(os.path.join(out_dir, "season_ids.npy"), mode="w+", dtype=np.int32, shape=(n_rows,))
+
+        n_feat = len(FEATURE_NAMES)
+        named = tuple_cursor(conn, name="ml_dataset")
+        named.itersize = chunk_size
+        named.execute(query, params)
+        pos = 0
+        while pos < n_rows:
+            rows = named.fetchmany(min(chunk_size, n_rows - pos))
+            if not rows:
+                break
+            end = pos + len(rows)
+            ids[pos:end] = [r[0] for r in rows]
+            days[pos:end] = [r[1].toordinal() for r in rows]
+            gf = np.array([r[2] for r in rows], dtype=np.float32)
+            ga = np.array([r[3] for r in rows], dtype=np.float32)
+            y[pos:end] = np.select([gf > ga, gf == ga], [HOME_WIN, DRAW], default=AWAY_WIN)
+            seasons[pos:end] = [r[4] for r in rows]
+            X[pos:end, :n_feat] = np.array([r[5:5 + n_feat] for r in rows], dtype=np.float32)
+            if keys:
+                # Parse each blob once, then fill one column per key
+                for side, offset in ((5 + n_feat, n_feat), (6 + n_feat, n_feat + len(keys))):
+                    blobs = [orjson.loads(r[side]) if r[side] else {} for r in rows]
+                    for j, key in enumerate(keys):
+                        X[pos:end, offset + j] = np.array([safe_num(b.get(key)) for b in blobs], dtype=np.float32)
+            pos = end
+        named.close()
+
+    for arr in (X, y, ids, days, seasons):
+        arr.flush()
+    meta = {"rows": pos, "columns": columns, "league_id": league_id, "squad_stats": squad_stats}
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def _read_meta(path):
+    with open(os.path.join(path, "meta.json")) as f:
+        return json.load(f)
+
+
+def open_array(path, name, meta=None):
+    """One of the dataset's arrays (e.g. "season_ids") as a read-only memory map."""
+    meta = meta or _read_meta(path)
+    # rows can be fewer than preallocated if matches changed mid-extract
+    return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")[:meta["rows"]]
+
+
+def open_dataset(path):
+    """(match_ids, X, y, days, meta) as read-only memory maps; nothing is loaded into RAM up front."""
+    meta = _read_meta(path)
+    return (open_array(path, "match_ids", meta), open_array(path, "X", meta), open_array(path, "y", meta),
+            open_array(path, "days", meta), meta)
+
+
+def main():
+    from database import get_connection
+    parser = argparse.ArgumentParser(description="Extract the training set into a memory-mapped NumPy dataset")
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--league-id", type=int, default=None)
+    parser.add_argument("--squad-stats", action="store_true", help="Add each side's season standard_stats keys")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+    conn = get_connection()
+    try:
+        meta = extract_dataset(conn, args.out, args.league_id, args.squad_stats, args.chunk_size)
+    finally:
+        conn.close()
+    print(f"Wrote {meta['rows']} rows x {len(meta['columns'])} columns to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Incremental team feature store (team_features) feeding the match models.
+
+One row per team per match holds what was known before kick-off: rolling
+form over the last FORM_WINDOW played matches, home/away strength from the
+team's earlier results this season at the same venue, and rest days. After a
+fixtures sync only teams whose stored outcome no longer matches `matches` are
+replayed, starting from their earliest changed match and seeded with the
+results just before it.
+
+feature_matrix() reads the store back as a dense match-level NumPy matrix
+(home features followed by away features) for training and inference.
+"""
+from collections import deque
+import numpy as np
+from psycopg2.extras import execute_values
+from serialization import tuple_cursor
+
+FORM_WINDOW = 5
+
+FEATURES = ("form_games", "form_points", "form_goals_for", "form_goals_against",
+            "venue_ppg", "venue_goals_for", "venue_goals_against", "rest_days")
+FEATURE_NAMES = tuple(f"home_{f}" for f in FEATURES) + tuple(f"away_{f}" for f in FEATURES)
+
+# Match outcome classes for y
+HOME_WIN, DRAW, AWAY_WIN, UNPLAYED = 0, 1, 2, -1
+
+
+def _dirty_teams(cur, league_id, season_id):
+    """(team_id, earliest date) for teams whose stored rows are missing or stale."""
+    cur.execute("""
+        SELECT side.team_id, MIN(m.match_date)
+        FROM matches m
+        CROSS JOIN LATERAL (VALUES (m.home_team_id, m.home_score, m.away_score),
+                                   (m.away_team_id, m.away_score, m.home_score))
+             AS side(team_id, gf, ga)
+        LEFT JOIN team_features tf ON tf.team_id = side.team_id AND tf.match_id = m.id
+        WHERE m.league_id = %s AND m.season_id = %s AND m.match_date IS NOT NULL
+          AND (tf.match_id IS NULL
+               OR tf.match_date    IS DISTINCT FROM m.match_date
+               OR tf.goals_for     IS DISTINCT FROM side.gf
+               OR tf.goals_against IS DISTINCT FROM side.ga)
+        GROUP BY side.team_id
+    """, (league_id, season_id))
+    return cur.fetchall()
+
+
+def _seed(cur, team_ids, from_dates):
+    """Last FORM_WINDOW played results before each team's replay start, oldest first."""
+    cur.execute("""
+        SELECT d.team_id, p.match_date, p.gf, p.ga
+        FROM unnest(%s::int[], %s::date[]) AS d(team_id, from_date)
+        CROSS JOIN LATERAL (
+            SELECT m.match_date,
+                   CASE WHEN m.home_team_id = d.team_id THEN m.home_score ELSE m.away_score END AS gf,
+                   CASE WHEN m.home_team_id = d.team_id THEN m.away_score ELSE m.home_score END AS ga
+            FROM matches m
+            WHERE (m.home_team_id = d.team_id OR m.away_team_id = d.team_id)
+              AND m.match_date < d.from_date
+              AND m.home_score IS NOT NULL AND m.away_score IS NOT NULL
+            ORDER BY m.match_date DESC, m.id DESC
+            LIMIT %s
+        ) p
+        ORDER BY d.team_id, p.match_date
+    """, (team_ids, from_dates, FORM_WINDOW))
+    seeds = {}
+    for team_id, match_date, gf, ga in cur.fetchall():
+        seeds.setdefault(team_id, []).append((match_date, gf, ga))
+    return seeds
+
+
+def _seed_venue(cur, team_ids, from_dates):
+    """Season-to-date [games, points, goals for, goals against] per (team, season, is_home)
+    from played matches before each team's replay start, for the seasons it replays."""
+    cur.execute("""
+        SELECT d.team_id, p.season_id, p.is_home, COUNT(*),
+               SUM(CASE WHEN p.gf > p.ga THEN 3 WHEN p.gf = p.ga THEN 1 ELSE 0 END),
+               SUM(p.gf), SUM(p.ga)
+        FROM unnest(%s::int[], %s::date[]) AS d(team_id, from_date)
+        CROSS JOIN LATERAL (
+            SELECT m.season_id, m.home_team_id = d.team_id AS is_home,
+                   CASE WHEN m.home_team_id = d.team_id THEN m.home_score ELSE m.away_score END AS gf,
+                   CASE WHEN m.home_team_id = d.team_id THEN m.away_score ELSE m.home_score END AS ga
+            FROM matches m
+            WHERE (m.home_team_id = d.team_id OR m.away_team_id = d.team_id)
+              AND m.match_date < d.from_date
+              AND m.home_score IS NOT NULL AND m.away_score IS NOT NULL
+              AND m.season_id IN (
+                  SELECT r.season_id FROM matches r
+                  WHERE (r.home_team_id = d.team_id OR r.away_team_id = d.team_id)
+                    AND r.match_date >= d.from_date
+              )
+        ) p
+        GROUP BY d.team_id, p.season_id, p.is_home
+    """, (team_ids, from_dates))
+    seeds = {}
+    for team_id, season_id, is_home, games, points, gf, ga in cur.fetchall():
+        seeds.setdefault(team_id, {})[(season_id, is_home)] = [games, points, gf, ga]
+    return seeds
+
+
+def _points(gf, ga):
+    return 3 if gf > ga else 1 if gf == ga else 0
+
+
+def _replay(cur, team_ids, from_dates):
+    seeds = _seed(cur, team_ids, from_dates)
+    venue_seeds = _seed_venue(cur, team_ids, from_dates)
+    cur.execute("""
+        SELECT d.team_id, m.id, m.match_date, m.league_id, m.season_id,
+               m.home_team_id = d.team_id AS is_home,
+               CASE WHEN m.home_team_id = d.team_id THEN m.home_score ELSE m.away_score END AS gf,
+               CASE WHEN m.home_team_id = d.team_id THEN m.away_score ELSE m.home_score END AS ga
+        FROM unnest(%s::int[], %s::date[]) AS d(team_id, from_date)
+        JOIN matches m ON (m.home_team_id = d.team_id OR m.away_team_id = d.team_id)
+                      AND m.match_date >= d.from_date
+        ORDER BY d.team_id, m.match_date, m.id
+    """, (team_ids, from_dates))
+
+    out = []
+    team_id, form, venue, last_date = None, None, None, None
+    for tid, match_id, match_date, league_id, season_id, is_home, gf, ga in cur.fetchall():
+        if tid != team_id:
+            team_id = tid
+            seed = seeds.get(tid, [])
+            form = deque(((gf_, ga_) for _, gf_, ga_ in seed), maxlen=FORM_WINDOW)
+            venue = {k: list(v) for k, v in venue_seeds.get(tid, {}).items()}
+            last_date = seed[-1][0] if seed else None
+        n = len(form)
+        totals = venue.setdefault((season_id, is_home), [0, 0, 0, 0])
+        games = totals[0]
+        out.append((
+            tid, match_id, match_date, league_id, season_id, is_home, n,
+            sum(_points(a, b) for a, b in form) / n if n else None,
+            sum(a for a, _ in form) / n if n else None,
+            sum(b for _, b in form) / n if n else None,
+            totals[1] / games if games else None,
+            totals[2] / games if games else None,
+            totals[3] / games if games else None,
+            (match_date - last_date).days if last_date else None,
+            gf, ga,
+        ))
+        last_date = match_date
+        if gf is not None and ga is not None:
+            form.append((gf, ga))
+            totals[0] += 1
+            totals[1] += _points(gf, ga)
+            totals[2] += gf
+            totals[3] += ga
+    return out
+
+
+def update_team_features(cur, league_id, season_id, stale=()):
+    """
+    Bring team_features up to date for a league-season after its matches changed.
+    `stale` adds (team_id, date) pairs to replay from that cannot be detected
+    from the stored rows (a deleted match takes its rows with it).
+    Returns the number of feature rows rewritten.
+    """
+    cur = tuple_cursor(cur.connection)
+    dirty = dict(_dirty_teams(cur, league_id, season_id))
+    for team_id, from_date in stale:
+        dirty[team_id] = min(from_date, dirty.get(team_id, from_date))
+    if not dirty:
+        return 0
+    team_ids = list(dirty)
+    from_dates = list(dirty.values())
+    rows = _replay(cur, team_ids, from_dates)
+    cur.execute("""
+        DELETE FROM team_features tf
+        USING unnest(%s::int[], %s::date[]) AS d(team_id, from_date)
+        WHERE tf.team_id = d.team_id AND tf.match_date >= d.from_date
+    """, (team_ids, from_dates))
+    execute_values(cur, """
+        INSERT INTO team_features
+            (team_id, match_id, match_date, league_id, season_id, is_home,
+             form_games, form_points, form_goals_for, form_goals_against,
+             venue_ppg, venue_goals_for, venue_goals_against, rest_days,
+             goals_for, goals_against)
+        VALUES %s
+    """, rows, page_size=1000)
+    return len(rows)
+
+def feature_matrix(conn, league_id=None, season_id=None, match_ids=None, played=None):
+    """
+    Dense match-level features, one row per match with both teams' rows present.
+
+    Returns (match_ids int64 [n], X float64 [n, len(FEATURE_NAMES)], y int8 [n]);
+    missing features are NaN and y is HOME_WIN/DRAW/AWAY_WIN, or UNPLAYED.
+    played=True/False restricts to results/fixtures.
+    """
+    cols = ", ".join([f"h.{f}" for f in FEATURES] + [f"a.{f}" for f in FEATURES])
+    query = f"""
+        SELECT h.match_id, h.goals_for, h.goals_against, {cols}
+        FROM team_features h
+        JOIN team_features a ON a.match_id = h.match_id AND NOT a.is_home
+        WHERE h.is_home
+    """
+    params = []
+    if league_id:
+        query += " AND h.league_id = %s"; params.append(league_id)
+    if season_id:
+        query += " AND h.season_id = %s"; params.append(season_id)
+    if match_ids is not None:
+        query += " AND h.match_id = ANY(%s)"; params.append(list(match_ids))
+    if played is not None:
+        query += " AND h.goals_for IS NOT NULL" if played else " AND h.goals_for IS NULL"
+    query += " ORDER BY h.match_date, h.match_id"
+
+    cur = tuple_cursor(conn)
+    cur.execute(query, params)
+    rows = cur.fetchall()
+    data = np.array(rows, dtype=float).reshape(len(rows), 3 + len(FEATURE_NAMES))
+    gf, ga = data[:, 1], data[:, 2]
+    y = np.select([gf > ga, gf == ga, gf < ga], [HOME_WIN, DRAW, AWAY_WIN], default=UNPLAYED).astype(np.int8)
+    return data[:, 0].astype(np.int64), data[:, 3:], y
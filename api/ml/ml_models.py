@@ -1,6 +1,6 @@
+import os
 import numpy as np
-import pandas as pd
-from sklearn.model_selection import train_test_split
+from joblib import Parallel, delayed
 from sklearn.ensemble import RandomForestClassifier
 from xgboost import XGBClassifier
 
@@ -14,22 +14,75 @@ class MLModel:
     def predict(self, X):
         return self.model.predict(X)
 
+    def predict_proba(self, X):
+        return self.model.predict_proba(X)
+
+    @property
+    def classes_(self):
+        return self.model.classes_
+
 class RandomForestModel(MLModel):
-    def __init__(self):
-        super().__init__(RandomForestClassifier())
+    def __init__(self, **params):
+        super().__init__(RandomForestClassifier(**params))
 
 class XGBoostModel(MLModel):
-    def __init__(self):
-        super().__init__(XGBClassifier(use_label_encoder=False, eval_metric='logloss'))
+    def __init__(self, **params):
+        super().__init__(XGBClassifier(eval_metric='mlogloss', **params))
 
 class EnsembleModel(MLModel):
-    def __init__(self):
-        self.models = [RandomForestClassifier(), XGBClassifier(use_label_encoder=False, eval_metric='logloss')]
+    """
+    RandomForest + XGBoost soft-voting ensemble.
+
+    n_jobs:        members fitted concurrently (threads; both libraries release the GIL), 1 = one after the other
+    member_n_jobs: cores each member uses internally; default splits the machine's cores between members
+    weights:       per-member weights for averaging predict_proba
+    rf_params / xgb_params: member hyperparameters (e.g. the winners of `python -m ml.tune`)
+
+    Labels are encoded against CLASSES before fitting, so every member sees the same
+    classes and predict_proba always has one column per class, even for one missing
+    from the training labels (which XGBoost would otherwise reject).
+    """
+    CLASSES = np.array([0, 1, 2])  # HOME_WIN, DRAW, AWAY_WIN (ml.feature_store)
+
+    # Class-level defaults keep artifacts pickled before these options existed loadable
+    weights = None
+    n_jobs = -1
+    _seen = None  # CLASSES present in the training labels
+
+    def __init__(self, weights=None, n_jobs=-1, member_n_jobs=None, rf_params=None, xgb_params=None):
+        if member_n_jobs is None:
+            member_n_jobs = max(1, (os.cpu_count() or 1) // 2)
+        self.models = [
+            RandomForestClassifier(**{**(rf_params or {}), 'n_jobs': member_n_jobs}),
+            XGBClassifier(**{'eval_metric': 'mlogloss', **(xgb_params or {}), 'n_jobs': member_n_jobs}),
+        ]
+        self.weights = np.ones(len(self.models)) if weights is None else np.asarray(weights, dtype=float)
+        self.n_jobs = n_jobs
 
     def train(self, X, y):
-        for model in self.models:
-            model.fit(X, y)
+        y = np.asarray(y)
+        seen = np.unique(y)
+        if not np.isin(seen, self.CLASSES).all():
+            raise ValueError(f"Labels {seen} are not all in {self.CLASSES}")
+        # Members are fitted on 0..k-1 for the k classes present, as XGBoost requires
+        codes = np.searchsorted(seen, y)
+        self.models = Parallel(n_jobs=self.n_jobs, prefer="threads")(
+            delayed(model.fit)(X, codes) for model in self.models
+        )
+        self._seen = seen
 
     def predict(self, X):
-        predictions = np.array([model.predict(X) for model in self.models])
-        return np.round(np.mean(predictions, axis=0))
\ No newline at end of file
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def predict_proba(self, X):
+        # (members, rows, classes seen) -> weighted mean over members
+        proba = np.average(np.stack([model.predict_proba(X) for model in self.models]), axis=0, weights=self.weights)
+        if self._seen is None:
+            return proba
+        full = np.zeros((proba.shape[0], len(self.CLASSES)))
+        full[:, np.searchsorted(self.CLASSES, self._seen)] = proba
+        return full
+
+    @property
+    def classes_(self):
+        return self.models[0].classes_ if self._seen is None else self.CLASSES
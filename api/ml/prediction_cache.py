@@ -0,0 +1,86 @@
+"""
+In-process cache of prediction outputs keyed by (match id, model version).
+
+A fixture's prediction only changes when a new result lands for one of its
+two teams (their feature-store rows are replayed) or a different model is
+activated (the version is part of the key). Entries are indexed by team, so
+the result-writing paths (update_match_result, the fixture syncs) drop exactly
+the predictions involving teams whose results changed, once their transaction
+has committed.
+"""
+import threading
+
+MAX_ENTRIES = 50000
+
+_entries = {}   # (match_id, version) -> (home_team_id, away_team_id, probabilities)
+_by_team = {}   # team_id -> {(match_id, version), ...}
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+_lock = threading.Lock()
+
+
+def lookup(match_ids, version):
+    """({match_id: probabilities} for cached matches, [match ids not cached])."""
+    found, missing = {}, []
+    with _lock:
+        for match_id in match_ids:
+            entry = _entries.get((match_id, version))
+            if entry is None:
+                missing.append(match_id)
+            else:
+                found[match_id] = entry[2]
+        _stats["hits"] += len(found)
+        _stats["misses"] += len(missing)
+    return found, missing
+
+
+def _drop(key):
+    entry = _entries.pop(key, None)
+    if entry:
+        for team_id in entry[:2]:
+            keys = _by_team.get(team_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del _by_team[team_id]
+
+
+def store(version, predictions):
+    """predictions: {match_id: (home_team_id, away_team_id, probabilities)}."""
+    with _lock:
+        for match_id, (home, away, proba) in predictions.items():
+            key = (match_id, version)
+            _entries[key] = (home, away, proba)
+            _by_team.setdefault(home, set()).add(key)
+            _by_team.setdefault(away, set()).add(key)
+        # Oldest first (dict insertion order)
+        while len(_entries) > MAX_ENTRIES:
+            _drop(next(iter(_entries)))
+
+
+def invalidate_teams(team_ids):
+    """Drop every cached prediction for a match involving any of these teams."""
+    dropped = 0
+    with _lock:
+        for team_id in team_ids:
+            for key in list(_by_team.get(team_id, ())):
+                _drop(key)
+                dropped += 1
+        _stats["invalidations"] += dropped
+    return dropped
+
+
+def retain_version(version):
+    """Free entries from other model versions after a hot-swap."""
+    with _lock:
+        for key in [k for k in _entries if k[1] != version]:
+            _drop(key)
+
+
+def stats():
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            **_stats,
+            "entries": len(_entries),
+            "hit_rate": round(_stats["hits"] / lookups, 4) if lookups else None,
+        }
@@ -0,0 +1,91 @@
+"""
+Resident match-outcome model.
+
+The latest artifact from the registry is loaded on the first prediction
+request and kept in memory; each request then scores its whole batch of
+fixtures with a single predict_proba call.
+
+Hot-swapping builds the new ActiveModel off to the side and replaces the
+module reference in one assignment. A request grabs the reference once and
+uses it throughout, so in-flight requests finish on the model they started
+with and never wait on a swap.
+"""
+import threading
+from collections import namedtuple
+import numpy as np
+from ml import prediction_cache, registry
+from ml.feature_store import AWAY_WIN, DRAW, HOME_WIN, feature_matrix
+
+OUTCOMES = ("home_win", "draw", "away_win")
+
+ActiveModel = namedtuple("ActiveModel", "version model metadata")
+
+_active = None
+_load_lock = threading.Lock()   # serializes loaders only; readers never take it once a model is active
+
+
+class ModelUnavailable(Exception):
+    """Raised when no trained model artifact has been published."""
+
+
+def _load(version=None):
+    loaded = registry.load(version)
+    if loaded is None:
+        raise ModelUnavailable("No trained model artifact; run `python -m ml.train` from api/")
+    model, metadata = loaded
+    return ActiveModel(metadata["version"], model, metadata)
+
+
+def active_model():
+    """The resident model, loading the latest artifact on first use."""
+    global _active
+    active = _active
+    if active is None:
+        with _load_lock:
+            if _active is None:
+                _active = _load()
+            active = _active
+    return active
+
+
+def loaded_model():
+    """The resident model if one has been loaded, without triggering a load."""
+    return _active
+
+
+def activate(version=None):
+    """Load `version` (default: latest published) and swap it in for new requests."""
+    global _active
+    with _load_lock:
+        loaded = _load(version)
+        _active = loaded
+    prediction_cache.retain_version(loaded.version)
+    return loaded
+
+
+def outcome_probabilities(model, X):
+    """predict_proba aligned to (home_win, draw, away_win) columns, whatever classes the model saw."""
+    proba = np.zeros((X.shape[0], len(OUTCOMES)))
+    if X.shape[0]:
+        raw = model.predict_proba(X)
+        for j, cls in enumerate(model.classes_):
+            proba[:, (HOME_WIN, DRAW, AWAY_WIN).index(int(cls))] = raw[:, j]
+    return proba
+
+
+def predict_matches(conn, fixtures):
+    """
+    fixtures: [(match_id, home_team_id, away_team_id), ...]
+    Returns (model version, {match_id: probability row}) for every match with
+    features in the store; cached rows are reused, the rest scored in one batch.
+    """
+    active = active_model()
+    teams = {match_id: (home, away) for match_id, home, away in fixtures}
+    found, missing = prediction_cache.lookup(list(teams), active.version)
+    if missing:
+        ids, X, _ = feature_matrix(conn, match_ids=missing)
+        proba = outcome_probabilities(active.model, X)
+        scored = {int(mid): row for mid, row in zip(ids, proba)}
+        prediction_cache.store(active.version, {mid: (*teams[mid], row) for mid, row in scored.items()})
+        found.update(scored)
+    return active.version, found
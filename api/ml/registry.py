@@ -0,0 +1,87 @@
+"""
+Versioned model artifacts on disk.
+
+    <MODEL_DIR>/<name>/<version>/model.joblib
+    <MODEL_DIR>/<name>/<version>/metadata.json
+
+Versions are zero-padded counters ("0001", "0002", ...). A version is written
+into a temporary directory and renamed into place, so a reader never sees a
+half-written artifact. joblib (and whatever the pickled model needs, i.e.
+sklearn/xgboost) is only imported when an artifact is actually saved or loaded.
+"""
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+
+MODEL_DIR = os.getenv("MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "artifacts"))
+DEFAULT_NAME = "match_outcome"
+
+_MODEL_FILE = "model.joblib"
+_METADATA_FILE = "metadata.json"
+
+
+def _model_dir(name):
+    return os.path.join(MODEL_DIR, name)
+
+
+def list_versions(name=DEFAULT_NAME):
+    """Published versions, oldest first."""
+    try:
+        entries = os.listdir(_model_dir(name))
+    except FileNotFoundError:
+        return []
+    return sorted(v for v in entries if v.isdigit())
+
+
+def latest_version(name=DEFAULT_NAME):
+    versions = list_versions(name)
+    return versions[-1] if versions else None
+
+
+def read_metadata(version, name=DEFAULT_NAME):
+    with open(os.path.join(_model_dir(name), version, _METADATA_FILE)) as f:
+        return json.load(f)
+
+
+def save(model, metadata, name=DEFAULT_NAME):
+    """
+    Publish `model` as the next version with `metadata` (features, training
+    window, metrics, params...). Returns the new version string.
+    """
+    import joblib
+    root = _model_dir(name)
+    os.makedirs(root, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".staging-", dir=root)
+    os.chmod(staging, 0o755)
+    joblib.dump(model, os.path.join(staging, _MODEL_FILE))
+    while True:
+        latest = latest_version(name)
+        version = f"{int(latest) + 1 if latest else 1:04d}"
+        metadata = {
+            **metadata,
+            "name": name,
+            "version": version,
+            "model_class": type(model).__name__,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        with open(os.path.join(staging, _METADATA_FILE), "w") as f:
+            json.dump(metadata, f, indent=2, default=str)
+        target = os.path.join(root, version)
+        try:
+            os.rename(staging, target)
+            return version
+        except OSError:
+            if not os.path.exists(target):
+                raise
+            # Another trainer published this version number first; take the next one
+
+
+def load(version=None, name=DEFAULT_NAME):
+    """(model, metadata) for a version, default the latest; None if nothing is published."""
+    import joblib
+    version = version or latest_version(name)
+    if version is None:
+        return None
+    model = joblib.load(os.path.join(_model_dir(name), version, _MODEL_FILE))
+    return model, read_metadata(version, name)
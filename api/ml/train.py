@@ -0,0 +1,122 @@
+"""
+Train the match-outcome ensemble on the team feature store and publish it
+as a new artifact version.
+
+Usage (from api/): python -m ml.train [--league-id 1] [--holdout 0.2] [--dataset data/train]
+
+--dataset trains from a memory-mapped dataset written by `python -m ml.dataset`
+instead of querying the feature store; its league is whatever was extracted
+(ml.dataset --league-id) and is recorded in the training window. Member hyperparameters are carried over
+from the latest artifact (set by `python -m ml.tune --publish`) unless
+--default-params is given.
+
+The most recent `holdout` share of played matches is scored for the
+artifact's metrics before the model is refitted on everything.
+"""
+import argparse
+from datetime import date
+from database import get_connection
+from ml import registry
+from ml.dataset import open_dataset
+from ml.feature_store import FEATURE_NAMES, FORM_WINDOW, feature_matrix
+from serialization import tuple_cursor
+
+MIN_TRAINING_MATCHES = 50
+
+
+def _training_window(conn, match_ids):
+    cur = tuple_cursor(conn)
+    cur.execute("""
+        SELECT MIN(match_date), MAX(match_date), array_agg(DISTINCT league_id), array_agg(DISTINCT season_id)
+        FROM team_features
+        WHERE is_home AND match_id = ANY(%s)
+    """, (list(map(int, match_ids)),))
+    first, last, leagues, seasons = cur.fetchone()
+    return {"from": first, "to": last, "matches": len(match_ids),
+            "league_ids": sorted(leagues or []), "season_ids": sorted(seasons or [])}
+
+
+def latest_hyperparameters():
+    """Member hyperparameters recorded in the latest artifact's metadata ({} if none)."""
+    version = registry.latest_version()
+    meta = registry.read_metadata(version) if version else None
+    return dict((meta or {}).get("hyperparameters") or {})
+
+
+def train_artifact(conn, league_id=None, holdout=0.2, dataset=None, hyperparameters=None, tuning=None):
+    """Fit, evaluate and publish an EnsembleModel; returns the registry version.
+
+    hyperparameters: {"random_forest": {...}, "xgboost": {...}} member parameters
+    tuning:          search summary from ml.tune, stored alongside them
+    """
+    from sklearn.metrics import accuracy_score, log_loss
+    from ml.ml_models import EnsembleModel
+    from ml.predictor import outcome_probabilities
+
+    if dataset:
+        ids, X, y, days, meta = open_dataset(dataset)
+        if meta["columns"] != list(FEATURE_NAMES):
+            raise SystemExit("Dataset has extra columns (extracted with --squad-stats); the served model uses team_features only")
+        window = {"dataset": dataset, "league_id": meta["league_id"], "matches": len(y),
+                  "from": date.fromordinal(int(days[0])) if len(days) else None,
+                  "to": date.fromordinal(int(days[-1])) if len(days) else None}
+    else:
+        ids, X, y = feature_matrix(conn, league_id=league_id, played=True)
+        window = None
+    if len(y) < MIN_TRAINING_MATCHES:
+        raise SystemExit(f"Need at least {MIN_TRAINING_MATCHES} played matches in team_features, have {len(y)}")
+
+    # Rows are in match_date order, so the tail is the most recent matches
+    split = int(len(y) * (1 - holdout))
+    hyperparameters = hyperparameters or {}
+    member_params = {"rf_params": hyperparameters.get("random_forest"),
+                     "xgb_params": hyperparameters.get("xgboost")}
+    metrics = {}
+    if 0 < split < len(y):
+        model = EnsembleModel(**member_params)
+        model.train(X[:split], y[:split])
+        proba = outcome_probabilities(model, X[split:])
+        metrics = {
+            "holdout_matches": len(y) - split,
+            "accuracy": float(accuracy_score(y[split:], proba.argmax(axis=1))),
+            "log_loss": float(log_loss(y[split:], proba, labels=[0, 1, 2])),
+        }
+
+    model = EnsembleModel(**member_params)
+    model.train(X, y)
+    metadata = {
+        "features": list(FEATURE_NAMES),
+        "form_window": FORM_WINDOW,
+        "training_window": window or _training_window(conn, ids),
+        "metrics": metrics,
+        "hyperparameters": hyperparameters,
+    }
+    if tuning:
+        metadata["tuning"] = tuning
+    return registry.save(model, metadata)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train and publish the match-outcome model")
+    parser.add_argument("--league-id", type=int, default=None, help="Train on one league only")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Share of latest matches held out for metrics")
+    parser.add_argument("--dataset", default=None, help="Train from a dataset directory written by ml.dataset")
+    parser.add_argument("--default-params", action="store_true", help="Ignore the latest artifact's tuned hyperparameters")
+    args = parser.parse_args()
+    if args.dataset and args.league_id:
+        parser.error("--league-id does not apply to --dataset; extract one league with ml.dataset --league-id")
+    hyperparameters = {} if args.default_params else latest_hyperparameters()
+    if args.dataset:
+        version = train_artifact(None, holdout=args.holdout, dataset=args.dataset, hyperparameters=hyperparameters)
+    else:
+        conn = get_connection()
+        try:
+            version = train_artifact(conn, args.league_id, args.holdout, hyperparameters=hyperparameters)
+        finally:
+            conn.close()
+    print(f"Published {registry.DEFAULT_NAME} version {version}")
+    print(registry.read_metadata(version))
+
+
+if __name__ == "__main__":
+    main()
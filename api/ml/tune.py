@@ -0,0 +1,290 @@
+"""
+Time-series-aware hyperparameter search for the ensemble's members
+(RandomForestModel and XGBoostModel).
+
+Usage (from api/):
+    python -m ml.tune [--model both] [--trials 24] [--workers 4] [--league-id 1]
+    python -m ml.tune --dataset data/train --publish
+    python -m ml.tune --synthetic 12000
+
+Validation is season-blocked: seasons are ordered by their first match, and
+each fold trains on every earlier season (only matches dated before the
+scored season starts) and scores the whole next season by log-loss, so a
+configuration is never fitted on matches from after the ones it is scored on.
+
+Each trial is a random configuration from the model's search space (trial 0
+is the library defaults). Trials run concurrently in a process pool and walk
+the folds in chronological order; a trial is stopped early once its mean
+log-loss so far is worse than the median of its peers at the same fold
+(median stopping), so unpromising configurations only pay for the first,
+smallest training sets.
+
+--publish trains the ensemble with the winning configurations and publishes
+it as a new artifact version whose metadata records them; later
+`python -m ml.train` runs reuse the latest artifact's hyperparameters.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import numpy as np
+
+MODELS = ("random_forest", "xgboost")
+SEARCH_SPACES = {
+    "random_forest": {
+        "n_estimators": [100, 200, 400],
+        "max_depth": [None, 6, 10, 16],
+        "min_samples_leaf": [1, 5, 20, 50],
+        "max_features": ["sqrt", 0.5, 1.0],
+    },
+    "xgboost": {
+        "n_estimators": [100, 200, 400],
+        "max_depth": [2, 3, 4, 6],
+        "learning_rate": [0.02, 0.05, 0.1, 0.3],
+        "subsample": [0.6, 0.8, 1.0],
+        "colsample_bytree": [0.6, 0.8, 1.0],
+        "min_child_weight": [1, 5, 20],
+    },
+}
+MIN_TRAIN_MATCHES = 200
+GRACE_FOLDS = 1      # folds every trial completes before it can be stopped
+MIN_PEERS = 3        # trials that must have reached a fold before the median is trusted
+
+_X = None
+_y = None
+
+
+def _init_worker(X, y, dataset=None):
+    global _X, _y
+    if dataset:
+        from ml.dataset import open_dataset
+        _, X, y, _, _ = open_dataset(dataset)
+    _X, _y = X, y
+
+
+def _build(model, params, n_jobs):
+    from ml.ml_models import RandomForestModel, XGBoostModel
+    cls = RandomForestModel if model == "random_forest" else XGBoostModel
+    return cls(**params, n_jobs=n_jobs)
+
+
+def _evaluate(model, params, train_idx, test_idx, n_jobs):
+    """Log-loss of one configuration on one season fold."""
+    from sklearn.metrics import log_loss
+    from ml.predictor import outcome_probabilities
+
+    started = time.perf_counter()
+    estimator = _build(model, params, n_jobs)
+    estimator.train(_X[train_idx], _y[train_idx])
+    proba = outcome_probabilities(estimator, _X[test_idx])
+    proba /= proba.sum(axis=1, keepdims=True)  # XGBoost's float32 rows drift off 1 in float64
+    return float(log_loss(_y[test_idx], proba, labels=[0, 1, 2])), time.perf_counter() - started
+
+
+def season_folds(seasons, days):
+    """[(season_id, train_idx, test_idx)]: every season after the first, trained on what came before it."""
+    seasons = np.asarray(seasons)
+    days = np.asarray(days)
+    ids = np.unique(seasons)
+    starts = np.array([days[seasons == s].min() for s in ids])
+    by_start = np.argsort(starts, kind="stable")
+    order = ids[by_start]
+    rank_of = np.empty(len(ids), dtype=np.int64)
+    rank_of[by_start] = np.arange(len(ids))
+    rank = rank_of[np.searchsorted(ids, seasons)]
+
+    folds = []
+    for k in range(1, len(order)):
+        test_idx = np.flatnonzero(rank == k)
+        # Seasons overlap across leagues: keep only matches played before this season began
+        train_idx = np.flatnonzero((rank < k) & (days < days[test_idx].min()))
+        if len(train_idx) >= MIN_TRAIN_MATCHES:
+            folds.append((int(order[k]), train_idx, test_idx))
+    return folds
+
+
+def sample_trials(model, n_trials, seed=0):
+    """Distinct configurations from the model's search space; the first is the library defaults."""
+    rng = random.Random(seed)
+    space = SEARCH_SPACES[model]
+    trials, seen = [{}], set()
+    attempts = 0
+    while len(trials) < n_trials and attempts < n_trials * 20:
+        attempts += 1
+        params = {key: rng.choice(values) for key, values in space.items()}
+        key = tuple(sorted(params.items(), key=lambda kv: kv[0]))
+        if key not in seen:
+            seen.add(key)
+            trials.append(params)
+    return trials
+
+
+def _weighted_mean(losses, sizes):
+    return sum(l * n for l, n in zip(losses, sizes)) / sum(sizes[:len(losses)])
+
+
+def search(X, y, seasons, days, models=MODELS, n_trials=24, workers=None, member_n_jobs=1,
+           dataset=None, seed=0):
+    """Run the search; returns {model: {"best": {...}, "trials": [...]}} and a summary."""
+    folds = season_folds(seasons, days)
+    if len(folds) < 2:
+        raise SystemExit(f"Need at least 3 seasons (2 scored folds with {MIN_TRAIN_MATCHES}+ training matches), "
+                         f"have {len(folds)} fold(s)")
+    sizes = [len(test) for _, _, test in folds]
+
+    trials = [{"model": m, "trial": i, "params": p, "losses": [], "seconds": 0.0, "status": "running"}
+              for m in models for i, p in enumerate(sample_trials(m, n_trials, seed))]
+    workers = workers or os.cpu_count() or 1
+    # spawn: forking after OpenMP-backed libraries have been imported can deadlock
+    ctx = multiprocessing.get_context("spawn")
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                             initializer=_init_worker,
+                             initargs=(None, None, dataset) if dataset else (X, y)) as pool:
+        def submit(trial):
+            _, train_idx, test_idx = folds[len(trial["losses"])]
+            return pool.submit(_evaluate, trial["model"], trial["params"], train_idx, test_idx, member_n_jobs)
+
+        # Running mean log-loss of every trial that reached fold k, per model
+        at_fold = {m: [[] for _ in folds] for m in models}
+        pending = {submit(t): t for t in trials}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                trial = pending.pop(future)
+                loss, seconds = future.result()
+                trial["losses"].append(loss)
+                trial["seconds"] += seconds
+                k = len(trial["losses"]) - 1
+                mean = _weighted_mean(trial["losses"], sizes)
+                peers = at_fold[trial["model"]][k]
+                peers.append(mean)
+                if k + 1 == len(folds):
+                    trial["status"] = "complete"
+                elif k + 1 >= GRACE_FOLDS and len(peers) >= MIN_PEERS and mean > float(np.median(peers)):
+                    trial["status"] = "stopped"
+                else:
+                    pending[submit(trial)] = trial
+    wall = time.perf_counter() - started
+
+    results = {}
+    for m in models:
+        mine = [t for t in trials if t["model"] == m]
+        for t in mine:
+            t["log_loss"] = round(_weighted_mean(t["losses"], sizes), 5)
+            t["folds"] = len(t["losses"])
+            t["seconds"] = round(t["seconds"], 2)
+        complete = sorted((t for t in mine if t["status"] == "complete"), key=lambda t: t["log_loss"])
+        best = complete[0]
+        results[m] = {
+            "best": {"trial": best["trial"], "params": best["params"], "log_loss": best["log_loss"]},
+            "defaults_log_loss": mine[0]["log_loss"] if mine[0]["status"] == "complete" else None,
+            "trials": [{k: t[k] for k in ("trial", "params", "status", "folds", "log_loss", "seconds")} for t in mine],
+        }
+    summary = {
+        "cv": "season-blocked",
+        "folds": [{"season_id": s, "train_matches": len(tr), "test_matches": len(te)} for s, tr, te in folds],
+        "trials": len(trials),
+        "stopped_early": sum(t["status"] == "stopped" for t in trials),
+        "fold_fits": sum(len(t["losses"]) for t in trials),
+        "fold_fits_without_stopping": len(trials) * len(folds),
+        "wall_seconds": round(wall, 2),
+    }
+    return results, summary
+
+
+def load_database(league_id=None):
+    """Played matches from the feature store with each one's season and date."""
+    from database import get_connection
+    from ml.feature_store import feature_matrix
+    from serialization import tuple_cursor
+
+    conn = get_connection()
+    try:
+        ids, X, y = feature_matrix(conn, league_id=league_id, played=True)
+        cur = tuple_cursor(conn)
+        cur.execute("SELECT id, season_id, match_date FROM matches WHERE id = ANY(%s)", (ids.tolist(),))
+        info = {r[0]: (r[1], r[2].toordinal()) for r in cur.fetchall()}
+    finally:
+        conn.close()
+    seasons = np.array([info[i][0] for i in ids.tolist()], dtype=np.int64)
+    days = np.array([info[i][1] for i in ids.tolist()], dtype=np.int64)
+    return X, y.astype(np.int64), seasons, days
+
+
+def load_dataset(path):
+    """A dataset written by ml.dataset (memory-mapped)."""
+    from ml.dataset import open_array, open_dataset
+    _, X, y, days, meta = open_dataset(path)
+    if not os.path.exists(os.path.join(path, "season_ids.npy")):
+        raise SystemExit("Dataset predates season_ids.npy; re-extract it with `python -m ml.dataset`")
+    return X, y.astype(np.int64), open_array(path, "season_ids", meta), days
+
+
+def load_synthetic(n_matches, matches_per_season=380, seed=0):
+    from ml.backtest import load_synthetic as synthetic_matches
+    X, y, weeks = synthetic_matches(n_matches, seed=seed)
+    return X, y, np.arange(n_matches) // matches_per_season, weeks * 7
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Season-blocked hyperparameter search for the ensemble members")
+    parser.add_argument("--model", choices=MODELS + ("both",), default="both")
+    parser.add_argument("--trials", type=int, default=24, help="Configurations per model (including the defaults)")
+    parser.add_argument("--league-id", type=int, default=None)
+    parser.add_argument("--synthetic", type=int, default=None, metavar="N", help="Use N synthetic matches instead of the database")
+    parser.add_argument("--dataset", default=None, help="Use a dataset directory written by ml.dataset")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--member-jobs", type=int, default=1, help="Cores per model fit inside each worker")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--publish", action="store_true", help="Train and publish the ensemble with the winners")
+    parser.add_argument("--json", default=None, help="Also write every trial and the summary to this file")
+    args = parser.parse_args()
+    if args.publish and args.synthetic:
+        parser.error("--publish needs real data (the database or --dataset)")
+    if args.dataset and args.league_id:
+        parser.error("--league-id does not apply to --dataset; extract one league with ml.dataset --league-id")
+
+    if args.synthetic:
+        X, y, seasons, days = load_synthetic(args.synthetic)
+    elif args.dataset:
+        X, y, seasons, days = load_dataset(args.dataset)
+    else:
+        X, y, seasons, days = load_database(args.league_id)
+    models = MODELS if args.model == "both" else (args.model,)
+    results, summary = search(X, y, seasons, days, models, args.trials, args.workers,
+                              args.member_jobs, args.dataset, args.seed)
+
+    for m, r in results.items():
+        print(f"{m}: best trial {r['best']['trial']} log-loss {r['best']['log_loss']:.5f} "
+              f"(defaults {r['defaults_log_loss']}) {r['best']['params']}")
+    print(json.dumps(summary, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"summary": summary, "results": results}, f, indent=2)
+
+    if args.publish:
+        from database import get_connection
+        from ml import registry
+        from ml.train import latest_hyperparameters, train_artifact
+
+        hyperparameters = latest_hyperparameters()
+        hyperparameters.update({m: r["best"]["params"] for m, r in results.items()})
+        tuning = {**{k: summary[k] for k in ("cv", "trials", "stopped_early")},
+                  "folds": len(summary["folds"]),
+                  "log_loss": {m: r["best"]["log_loss"] for m, r in results.items()}}
+        conn = None if args.dataset else get_connection()
+        try:
+            version = train_artifact(conn, args.league_id, dataset=args.dataset,
+                                     hyperparameters=hyperparameters, tuning=tuning)
+        finally:
+            if conn:
+                conn.close()
+        print(f"Published {registry.DEFAULT_NAME} version {version}")
+
+
+if __name__ == "__main__":
+    main()
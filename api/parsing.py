@@ -0,0 +1,20 @@
+"""
+Parsing of scraped FBref values, shared by the sync routes and offline tools
+(ml.dataset) without importing the FastAPI routers.
+"""
+
+
+def safe_num(val):
+    """Safely convert FBref values to a number, returning None for non-numeric."""
+    if val is None:
+        return None
+    s = str(val).strip().replace(",", "").replace("%", "").replace("N/A", "").replace("nan", "")
+    if not s:
+        return None
+    try:
+        return int(s)
+    except ValueError:
+        try:
+            return float(s)
+        except ValueError:
+            return None
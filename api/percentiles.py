@@ -0,0 +1,188 @@
+"""
+Vectorized percentile engine for player stats.
+
+A league-season of player_stats is loaded once into NumPy arrays (one
+players x stats matrix, JSONB decoded column by column). Counting stats are
+normalized per 90 minutes, then every player's percentile for every stat is
+computed within their league/position group in one vectorized pass per group.
+
+Results are cached per league-season together with a cheap fingerprint
+(row count + latest scraped_at); a sync that changes the league-season
+changes the fingerprint, and only then is it recomputed.
+"""
+import threading
+from collections import OrderedDict
+import numpy as np
+import orjson
+from parsing import safe_num
+from serialization import tuple_cursor
+
+MIN_90S = 5.0          # players below this many 90s are left out of the reference pool
+MAX_CACHED_SEASONS = 32
+
+# standard_stats keys that are identity/meta, not stats
+_SKIP_KEYS = {"player", "nationality", "nation", "position", "pos", "team", "squad",
+              "born", "birth_year", "matches", "ranker", "rk"}
+# Numeric keys that are already rates or playing-time totals: never divided by 90s
+_RAW_KEYS = {"age", "games", "games_starts", "minutes", "minutes_90s", "mp", "starts", "min", "90s"}
+
+_cache = OrderedDict()  # (league_id, season_id) -> SeasonPercentiles
+_cache_lock = threading.Lock()
+
+
+def _is_rate(key):
+    return key in _RAW_KEYS or "per90" in key or "pct" in key or key.endswith("avg")
+
+
+def position_group(position):
+    """Primary FBref position ('FW,MF' -> 'FW'); empty positions share one group."""
+    return (position or "").split(",")[0].strip().upper()[:2] or "NA"
+
+
+def percentile_ranks(X):
+    """
+    For every entry, the percent of non-NaN values in its column that are <= it.
+    Ties share the highest rank; NaN entries stay NaN. Fully vectorized over
+    the (players x stats) matrix.
+    """
+    n = X.shape[0]
+    order = np.argsort(X, axis=0, kind="stable")       # NaNs sort last
+    s = np.take_along_axis(X, order, axis=0)
+    last_of_run = np.ones(s.shape, dtype=bool)
+    last_of_run[:-1] = s[:-1] != s[1:]
+    run_end = np.where(last_of_run, np.arange(n)[:, None], n)
+    run_end = np.minimum.accumulate(run_end[::-1], axis=0)[::-1]
+    valid = np.count_nonzero(~np.isnan(X), axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct_sorted = (run_end + 1) * (100.0 / valid)
+    pct = np.empty_like(pct_sorted)
+    np.put_along_axis(pct, order, pct_sorted, axis=0)
+    pct[np.isnan(X)] = np.nan
+    return pct
+
+
+class SeasonPercentiles:
+    """Per-90 values and within-group percentiles for one league-season."""
+
+    def __init__(self, fingerprint, ids, names, teams, positions, minutes_90s, keys, values):
+        self.fingerprint = fingerprint
+        self.ids = ids
+        self.names = names
+        self.teams = teams
+        self.groups = np.array([position_group(p) for p in positions])
+        self.keys = keys
+        self.index = {pid: i for i, pid in enumerate(ids.tolist())}
+
+        per90 = values.copy()
+        count_cols = np.array([not _is_rate(k) for k in keys], dtype=bool)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            per90[:, count_cols] = values[:, count_cols] / minutes_90s[:, None]
+        per90[~np.isfinite(per90)] = np.nan
+        self.values = values
+        self.per90 = per90
+        self.per90_cols = count_cols
+
+        self.eligible = minutes_90s >= MIN_90S
+        self.pct = np.full(values.shape, np.nan)
+        for group in np.unique(self.groups):
+            rows = np.flatnonzero((self.groups == group) & self.eligible)
+            if rows.size:
+                self.pct[rows] = percentile_ranks(per90[rows])
+        self.pool_sizes = {g: int(np.count_nonzero((self.groups == g) & self.eligible))
+                           for g in np.unique(self.groups)}
+
+    def _stats(self, i):
+        out = {}
+        for j, key in enumerate(self.keys):
+            pct = self.pct[i, j]
+            if np.isnan(pct):
+                continue
+            out[key] = {
+                "value": None if np.isnan(self.values[i, j]) else float(self.values[i, j]),
+                "per90": bool(self.per90_cols[j]),
+                "normalized": float(round(self.per90[i, j], 4)),
+                "percentile": float(round(pct, 1)),
+            }
+        return out
+
+    def player(self, player_id):
+        i = self.index.get(player_id)
+        if i is None:
+            return None
+        group = str(self.groups[i])
+        return {
+            "player_id": player_id,
+            "player_name": self.names[i],
+            "team": self.teams[i],
+            "position_group": group,
+            "pool_size": self.pool_sizes.get(group, 0),
+            "eligible": bool(self.eligible[i]),
+            "stats": self._stats(i),
+        }
+
+    def players(self, group=None):
+        rows = np.flatnonzero(self.eligible & ((self.groups == group) if group else True))
+        return [self.player(int(self.ids[i])) for i in rows]
+
+
+def _fingerprint(cur, league_id, season_id):
+    cur.execute("""
+        SELECT COUNT(*), MAX(ps.scraped_at)
+        FROM player_stats ps
+        JOIN teams t ON t.id = ps.team_id
+        WHERE t.league_id = %s AND ps.season_id = %s
+    """, (league_id, season_id))
+    count, latest = cur.fetchone()
+    return count, latest
+
+
+def _load(cur, league_id, season_id, fingerprint):
+    cur.execute("""
+        SELECT ps.id, ps.player_name, t.name, ps.position, ps.minutes_90s::float8, ps.standard_stats
+        FROM player_stats ps
+        JOIN teams t ON t.id = ps.team_id
+        WHERE t.league_id = %s AND ps.season_id = %s
+        ORDER BY ps.id
+    """, (league_id, season_id))
+    rows = cur.fetchall()
+    ids, names, teams, positions, m90, blobs = zip(*rows) if rows else ((),) * 6
+    blobs = [orjson.loads(b) if b else {} for b in blobs]
+    n = len(blobs)
+
+    # Decode the JSONB blobs column-wise: one float array per numeric key
+    all_keys = sorted({k for b in blobs for k in b} - _SKIP_KEYS)
+    columns, keys = [], []
+    for key in all_keys:
+        col = np.array([safe_num(b.get(key)) if isinstance(b.get(key), (str, int, float)) else None
+                        for b in blobs], dtype=float)
+        present = sum(1 for b in blobs if b.get(key) not in (None, ""))
+        if present and np.count_nonzero(~np.isnan(col)) >= present / 2:
+            columns.append(col)
+            keys.append(key)
+    values = np.column_stack(columns) if columns else np.empty((n, 0))
+    return SeasonPercentiles(
+        fingerprint,
+        np.array(ids, dtype=np.int64),
+        list(names), list(teams), list(positions),
+        np.array([v if v is not None else np.nan for v in m90], dtype=float),
+        keys, values,
+    )
+
+
+def season_percentiles(conn, league_id, season_id):
+    """Cached SeasonPercentiles for a league-season, recomputed only if its data changed."""
+    cur = tuple_cursor(conn)
+    fingerprint = _fingerprint(cur, league_id, season_id)
+    key = (league_id, season_id)
+    with _cache_lock:
+        table = _cache.get(key)
+        if table is not None and table.fingerprint == fingerprint:
+            _cache.move_to_end(key)
+            return table
+    table = _load(cur, league_id, season_id, fingerprint)
+    with _cache_lock:
+        _cache[key] = table
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_CACHED_SEASONS:
+            _cache.popitem(last=False)
+    return table
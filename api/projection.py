@@ -0,0 +1,57 @@
+"""
+`fields=` projection for list endpoints, pushed down into SQL.
+
+A field is either a plain column name ("goals") or a dotted path into a JSONB
+column ("standard_stats.xg"). Only the requested columns are selected, and
+dotted paths are rebuilt server-side into a reduced blob with
+jsonb_build_object, so unrequested JSONB keys never leave the database.
+"""
+from fastapi import HTTPException
+
+# jsonb_build_object takes at most 100 arguments (50 key/value pairs)
+MAX_KEYS_PER_BLOB = 50
+
+
+def select_fields(fields, columns, jsonb_columns):
+    """
+    Build a SELECT list for a comma-separated `fields` value.
+
+    columns:       {output name: SQL expression} of selectable scalar columns
+    jsonb_columns: {output name: SQL expression} of JSONB columns
+    Returns (select_sql, params); params belong before any WHERE parameters.
+    """
+    scalars = []
+    blobs = {}  # column -> list of key paths, or None for the whole blob
+    for name in (f.strip() for f in fields.split(",")):
+        if not name:
+            continue
+        head, _, path = name.partition(".")
+        if head in jsonb_columns:
+            if not path:
+                blobs[head] = None
+            elif blobs.get(head, []) is not None:
+                blobs.setdefault(head, []).append(path)
+        elif name in columns:
+            scalars.append(name)
+        else:
+            raise HTTPException(status_code=400, detail=f"Unknown field '{name}'")
+    if not scalars and not blobs:
+        raise HTTPException(status_code=400, detail="fields must name at least one column")
+
+    parts, params = [], []
+    for name in dict.fromkeys(scalars):
+        parts.append(f"{columns[name]} AS {name}")
+    for col, paths in blobs.items():
+        expr = jsonb_columns[col]
+        if paths is None:
+            parts.append(f"{expr} AS {col}")
+            continue
+        paths = list(dict.fromkeys(paths))
+        if len(paths) > MAX_KEYS_PER_BLOB:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_KEYS_PER_BLOB} keys per JSONB column")
+        pairs = []
+        for path in paths:
+            pairs.append(f"%s, {expr} #> %s")
+            params += [path, path.split(".")]
+        parts.append(f"jsonb_build_object({', '.join(pairs)}) AS {col}")
+    return ", ".join(parts), params
@@ -0,0 +1,142 @@
+"""
+Elo and Poisson attack/defence ratings over played matches.
+
+Results are applied one match date at a time as NumPy batches: every match
+on a date is rated from the ratings going into that date, and all updates are
+scattered back at once (np.add.at), so a date costs a handful of array ops
+however many matches it holds.
+
+After a sync only results not yet in team_ratings are applied: the league is
+replayed from the earliest such result, seeded with each team's last stored
+rating before it.
+"""
+import numpy as np
+from psycopg2.extras import execute_values
+from serialization import tuple_cursor
+
+ELO_START = 1500.0
+ELO_K = 20.0
+ELO_HOME_ADVANTAGE = 60.0
+
+# Poisson model: log(expected goals) = BASE + HOME (home side only) + attack - opponent defence
+POISSON_BASE = np.log(1.35)
+POISSON_HOME = 0.2
+POISSON_STEP = 0.05  # gradient step on the log-likelihood per result
+
+
+def _dirty_from(cur, league_id):
+    """Date of the earliest result that is missing or stale in team_ratings (on either
+    team's row), or whose rated match has since been deleted or lost its result."""
+    cur.execute("""
+        SELECT MIN(d) FROM (
+            SELECT LEAST(m.match_date, r.match_date) AS d
+            FROM matches m
+            CROSS JOIN LATERAL (VALUES (m.home_team_id, m.home_score, m.away_score),
+                                       (m.away_team_id, m.away_score, m.home_score))
+                 AS side(team_id, gf, ga)
+            LEFT JOIN team_ratings r ON r.match_id = m.id AND r.team_id = side.team_id
+            WHERE m.league_id = %s AND m.match_date IS NOT NULL
+              AND m.home_score IS NOT NULL AND m.away_score IS NOT NULL
+              AND (r.match_id IS NULL
+                   OR r.match_date    IS DISTINCT FROM m.match_date
+                   OR r.goals_for     IS DISTINCT FROM side.gf
+                   OR r.goals_against IS DISTINCT FROM side.ga)
+            UNION ALL
+            SELECT r.match_date
+            FROM team_ratings r
+            LEFT JOIN matches m ON m.id = r.match_id
+            WHERE r.league_id = %s
+              AND (m.id IS NULL OR m.league_id <> r.league_id OR m.match_date IS NULL
+                   OR m.home_score IS NULL OR m.away_score IS NULL)
+        ) dirty
+    """, (league_id, league_id))
+    return cur.fetchone()[0]
+
+
+def elo_expected(home_elo, away_elo):
+    return 1.0 / (1.0 + 10.0 ** ((away_elo - home_elo - ELO_HOME_ADVANTAGE) / 400.0))
+
+
+def _apply_batch(elo, attack, defence, h, a, hg, ag):
+    """Rate one match date: h/a are team indices, hg/ag goals (arrays of equal length)."""
+    # Elo with a goal-difference multiplier
+    score = np.where(hg > ag, 1.0, np.where(hg == ag, 0.5, 0.0))
+    margin = np.log1p(np.abs(hg - ag)) + 1.0
+    delta = ELO_K * margin * (score - elo_expected(elo[h], elo[a]))
+
+    # Poisson: one gradient step on each side's log-likelihood
+    lam_h = np.exp(POISSON_BASE + POISSON_HOME + attack[h] - defence[a])
+    lam_a = np.exp(POISSON_BASE + attack[a] - defence[h])
+    err_h = POISSON_STEP * (hg - lam_h)
+    err_a = POISSON_STEP * (ag - lam_a)
+
+    np.add.at(elo, h, delta)
+    np.add.at(elo, a, -delta)
+    np.add.at(attack, h, err_h)
+    np.add.at(attack, a, err_a)
+    np.add.at(defence, a, -err_h)
+    np.add.at(defence, h, -err_a)
+
+
+def update_ratings(cur, league_id, since=None):
+    """Apply results not yet rated for a league, replaying at least from `since`
+    (a deleted match takes its rows with it). Returns the number of matches (re)applied."""
+    cur = tuple_cursor(cur.connection)
+    from_date = _dirty_from(cur, league_id)
+    if since is not None:
+        from_date = since if from_date is None else min(from_date, since)
+    if from_date is None:
+        return 0
+
+    cur.execute("""
+        SELECT DISTINCT ON (team_id) team_id, elo, attack, defence
+        FROM team_ratings
+        WHERE league_id = %s AND match_date < %s
+        ORDER BY team_id, match_date DESC, match_id DESC
+    """, (league_id, from_date))
+    seed = cur.fetchall()
+    cur.execute("""
+        SELECT id, match_date, season_id, home_team_id, away_team_id, home_score, away_score
+        FROM matches
+        WHERE league_id = %s AND match_date >= %s
+          AND home_score IS NOT NULL AND away_score IS NOT NULL
+        ORDER BY match_date, id
+    """, (league_id, from_date))
+    matches = cur.fetchall()
+    cur.execute("DELETE FROM team_ratings WHERE league_id = %s AND match_date >= %s", (league_id, from_date))
+    if not matches:
+        return 0
+
+    match_ids, dates, seasons, home, away, hg, ag = (list(c) for c in zip(*matches))
+    teams = sorted({r[0] for r in seed} | set(home) | set(away))
+    index = {t: i for i, t in enumerate(teams)}
+    elo = np.full(len(teams), ELO_START)
+    attack = np.zeros(len(teams))
+    defence = np.zeros(len(teams))
+    for team_id, e, att, dfn in seed:
+        i = index[team_id]
+        elo[i], attack[i], defence[i] = e, att, dfn
+
+    h = np.array([index[t] for t in home])
+    a = np.array([index[t] for t in away])
+    hg = np.array(hg, dtype=float)
+    ag = np.array(ag, dtype=float)
+    # Row ranges sharing a match date
+    cuts = [i for i in range(1, len(dates)) if dates[i] != dates[i - 1]]
+    starts, ends = [0] + cuts, cuts + [len(dates)]
+
+    rows = []
+    for s, e in zip(starts, ends):
+        _apply_batch(elo, attack, defence, h[s:e], a[s:e], hg[s:e], ag[s:e])
+        for k in range(s, e):
+            hi, ai = h[k], a[k]
+            common = (match_ids[k], dates[k], league_id, seasons[k])
+            rows.append((home[k], *common, float(elo[hi]), float(attack[hi]), float(defence[hi]), int(hg[k]), int(ag[k])))
+            rows.append((away[k], *common, float(elo[ai]), float(attack[ai]), float(defence[ai]), int(ag[k]), int(hg[k])))
+
+    execute_values(cur, """
+        INSERT INTO team_ratings
+            (team_id, match_id, match_date, league_id, season_id, elo, attack, defence, goals_for, goals_against)
+        VALUES %s
+    """, rows, page_size=1000)
+    return len(matches)
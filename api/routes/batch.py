@@ -0,0 +1,152 @@
+"""
+Batch read endpoint: run several GETs against the existing read routes in one
+HTTP round trip.
+
+Each sub-query is dispatched in-process through the ASGI app, so it gets the
+exact same routing, validation and serialization as a direct call, and runs
+concurrently with its siblings on pooled DB connections.
+"""
+import asyncio
+import logging
+import re
+import time
+from urllib.parse import urlencode
+import orjson
+from fastapi import APIRouter, HTTPException, Request, Response
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from database import POOL_SIZE
+from serialization import dumps
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+MAX_SUBQUERIES = 20
+
+# Only side-effect-free JSON routes may be batched: exact paths, {id} is a
+# numeric path parameter. Anything else (/simulate, writes) is rejected.
+_READ_ROUTES = (
+    "/api/leagues",
+    "/api/leagues/{id}",
+    "/api/leagues/{id}/overview",
+    "/api/teams",
+    "/api/teams/compare",
+    "/api/teams/{id}",
+    "/api/teams/{id}/head-to-head/{id}",
+    "/api/matches",
+    "/api/matches/{id}",
+    "/api/standings",
+    "/api/standings/seasons",
+    "/api/standings/history",
+    "/api/squad-stats",
+    "/api/players",
+    "/api/players/top-scorers",
+    "/api/players/leaderboard",
+    "/api/players/percentiles",
+    "/api/ratings",
+    "/api/ratings/history",
+    "/api/sync/status",
+    "/api/health",
+)
+_READ_PATTERNS = [re.compile(re.escape(r).replace(re.escape("{id}"), r"\d+")) for r in _READ_ROUTES]
+
+
+def _allowed(path):
+    return any(p.fullmatch(path) for p in _READ_PATTERNS)
+
+
+class SubQuery(BaseModel):
+    id: Optional[str] = None
+    path: str
+    params: Dict[str, Any] = {}
+
+
+class BatchPayload(BaseModel):
+    requests: List[SubQuery]
+
+
+async def _dispatch(app, sub, limiter):
+    """Run one GET through the app and capture status, body and wall time."""
+    path = sub.path.split("?", 1)[0]
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": urlencode(sub.params, doseq=True).encode(),
+        "headers": [(b"accept", b"application/json")],
+        "client": None,
+        "server": None,
+    }
+    status = 500
+    content_type = b""
+    chunks = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status, content_type
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            content_type = dict(message.get("headers", [])).get(b"content-type", b"")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    async with limiter:
+        started = time.perf_counter()
+        try:
+            await app(scope, receive, send)
+        except Exception:
+            # The app has already sent its 500; keep the other sub-queries going
+            logger.exception("Batched GET %s failed", path)
+            status, content_type, chunks = 500, b"application/json", [b'{"detail":"Internal Server Error"}']
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+    body = b"".join(chunks)
+    if not body:
+        body = None
+    elif content_type.startswith(b"application/json"):
+        body = orjson.Fragment(body)
+    else:
+        body = body.decode("utf-8", "replace")
+    return {
+        "id": sub.id or sub.path,
+        "status": status,
+        "elapsed_ms": round(elapsed_ms, 2),
+        "body": body,
+    }
+
+
+@router.post("")
+async def batch(payload: BatchPayload, request: Request):
+    """
+    Body: {"requests": [{"id": "table", "path": "/api/standings", "params": {"league_id": 1}}, ...]}
+    Returns every sub-result (status, body, elapsed_ms) in request order.
+    """
+    subs = payload.requests
+    if not subs:
+        raise HTTPException(status_code=400, detail="requests must not be empty")
+    if len(subs) > MAX_SUBQUERIES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SUBQUERIES} sub-queries per batch")
+    for sub in subs:
+        path = sub.path.split("?", 1)[0]
+        if not _allowed(path):
+            raise HTTPException(status_code=400, detail=f"Path not allowed in a batch: {sub.path}")
+
+    # Never hold more connections than the pool keeps warm
+    limiter = asyncio.Semaphore(POOL_SIZE)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(_dispatch(request.app, sub, limiter) for sub in subs))
+    total_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    server_timing = ", ".join(f"q{i};dur={r['elapsed_ms']}" for i, r in enumerate(results))
+    return Response(
+        content=dumps({"elapsed_ms": total_ms, "results": results}),
+        media_type="application/json",
+        headers={"Server-Timing": f"total;dur={total_ms}, {server_timing}"},
+    )
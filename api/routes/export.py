@@ -0,0 +1,294 @@
+"""
+Columnar bulk export of whole league/season extracts as Arrow IPC or Parquet.
+
+Rows are read from a named (server-side) cursor in fixed-size chunks and
+written out one record batch at a time, so memory stays flat however large
+the extract is. JSONB stat blobs are flattened into one column per key
+("standard_stats.xg", ...): numeric keys become float64, the rest strings.
+"""
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from psycopg2.extensions import cursor as TupleCursor
+from typing import Optional
+from database import get_connection
+from parsing import safe_num
+from routes.sync import safe_text
+
+router = APIRouter()
+
+CHUNK_ROWS = 5000
+
+_MEDIA_TYPES = {
+    "arrow":   "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Per dataset: FROM/JOIN clause, typed scalar columns, JSONB columns to flatten,
+# and the expressions used for the league/season filters.
+_DATASETS = {
+    "matches": {
+        "from": """
+            FROM matches m
+            JOIN teams ht ON ht.id = m.home_team_id
+            JOIN teams at ON at.id = m.away_team_id
+            JOIN leagues l ON l.id = m.league_id
+            JOIN seasons s ON s.id = m.season_id
+        """,
+        "columns": [
+            ("m.id",           "id",           pa.int32()),
+            ("l.name",         "league",       pa.string()),
+            ("s.name",         "season",       pa.string()),
+            ("m.gameweek",     "gameweek",     pa.int32()),
+            ("m.match_date",   "match_date",   pa.date32()),
+            ("m.start_time",   "start_time",   pa.time64("us")),
+            ("m.home_team_id", "home_team_id", pa.int32()),
+            ("ht.name",        "home_team",    pa.string()),
+            ("m.away_team_id", "away_team_id", pa.int32()),
+            ("at.name",        "away_team",    pa.string()),
+            ("m.home_score",   "home_score",   pa.int32()),
+            ("m.away_score",   "away_score",   pa.int32()),
+            ("m.is_played",    "is_played",    pa.bool_()),
+            ("m.attendance",   "attendance",   pa.int32()),
+            ("m.venue",        "venue",        pa.string()),
+            ("m.referee",      "referee",      pa.string()),
+            ("m.round",        "round",        pa.string()),
+        ],
+        "jsonb": [],
+        "league": "m.league_id",
+        "season": "m.season_id",
+        "order": "m.match_date, m.id",
+    },
+    "player_stats": {
+        "from": """
+            FROM player_stats ps
+            LEFT JOIN teams t ON t.id = ps.team_id
+            LEFT JOIN leagues l ON l.id = t.league_id
+            JOIN seasons s ON s.id = ps.season_id
+        """,
+        "columns": [
+            ("ps.id",                 "id",           pa.int32()),
+            ("ps.player_name",        "player_name",  pa.string()),
+            ("ps.nationality",        "nationality",  pa.string()),
+            ("ps.position",           "position",     pa.string()),
+            ("ps.team_id",            "team_id",      pa.int32()),
+            ("t.name",                "team",         pa.string()),
+            ("l.name",                "league",       pa.string()),
+            ("s.name",                "season",       pa.string()),
+            ("ps.age",                "age",          pa.int32()),
+            ("ps.birth_year",         "birth_year",   pa.int32()),
+            ("ps.games",              "games",        pa.int32()),
+            ("ps.games_starts",       "games_starts", pa.int32()),
+            ("ps.minutes",            "minutes",      pa.int32()),
+            ("ps.minutes_90s::float8", "minutes_90s", pa.float64()),
+            ("ps.goals",              "goals",        pa.int32()),
+            ("ps.assists",            "assists",      pa.int32()),
+        ],
+        "jsonb": ["ps.standard_stats"],
+        "league": "t.league_id",
+        "season": "ps.season_id",
+        "order": "ps.id",
+    },
+    "team_squad_stats": {
+        "from": """
+            FROM team_squad_stats ts
+            JOIN teams t ON t.id = ts.team_id
+            JOIN leagues l ON l.id = ts.league_id
+            JOIN seasons s ON s.id = ts.season_id
+        """,
+        "columns": [
+            ("ts.id",                  "id",           pa.int32()),
+            ("ts.team_id",             "team_id",      pa.int32()),
+            ("t.name",                 "team",         pa.string()),
+            ("l.name",                 "league",       pa.string()),
+            ("s.name",                 "season",       pa.string()),
+            ("ts.split",               "split",        pa.string()),
+            ("ts.players_used",        "players_used", pa.int32()),
+            ("ts.avg_age::float8",     "avg_age",      pa.float64()),
+            ("ts.possession::float8",  "possession",   pa.float64()),
+            ("ts.games",               "games",        pa.int32()),
+            ("ts.games_starts",        "games_starts", pa.int32()),
+            ("ts.minutes",             "minutes",      pa.int32()),
+            ("ts.minutes_90s::float8", "minutes_90s",  pa.float64()),
+            ("ts.goals",               "goals",        pa.int32()),
+            ("ts.assists",             "assists",      pa.int32()),
+        ],
+        "jsonb": ["ts.standard_stats", "ts.goalkeeping", "ts.shooting", "ts.playing_time", "ts.misc_stats"],
+        "league": "ts.league_id",
+        "season": "ts.season_id",
+        "order": "ts.id",
+    },
+    "league_standings": {
+        "from": """
+            FROM league_standings ls
+            JOIN teams t ON t.id = ls.team_id
+            JOIN leagues l ON l.id = ls.league_id
+            JOIN seasons s ON s.id = ls.season_id
+        """,
+        "columns": [
+            ("ls.id",                 "id",            pa.int32()),
+            ("ls.team_id",            "team_id",       pa.int32()),
+            ("t.name",                "team",          pa.string()),
+            ("l.name",                "league",        pa.string()),
+            ("s.name",                "season",        pa.string()),
+            ("ls.rank",               "rank",          pa.int32()),
+            ("ls.games",              "games",         pa.int32()),
+            ("ls.wins",               "wins",          pa.int32()),
+            ("ls.ties",               "ties",          pa.int32()),
+            ("ls.losses",             "losses",        pa.int32()),
+            ("ls.goals_for",          "goals_for",     pa.int32()),
+            ("ls.goals_against",      "goals_against", pa.int32()),
+            ("ls.goal_diff",          "goal_diff",     pa.int32()),
+            ("ls.points",             "points",        pa.int32()),
+            ("ls.points_avg::float8", "points_avg",    pa.float64()),
+        ],
+        "jsonb": ["ls.home_away_split"],
+        "league": "ls.league_id",
+        "season": "ls.season_id",
+        "order": "ls.league_id, ls.season_id, ls.rank",
+    },
+}
+
+
+def _where(spec, league_id, season_id):
+    clause, params = " WHERE 1=1", []
+    if league_id:
+        clause += f" AND {spec['league']} = %s"; params.append(league_id)
+    if season_id:
+        clause += f" AND {spec['season']} = %s"; params.append(season_id)
+    return clause, params
+
+
+def _jsonb_keys(cur, spec, col, where, params):
+    """All keys of a JSONB column in the extract, with whether every value is numeric."""
+    cur.execute(f"""
+        SELECT e.key,
+               bool_and(
+                   jsonb_typeof(e.value) IN ('number', 'null')
+                   OR (jsonb_typeof(e.value) = 'string'
+                       AND translate(e.value #>> '{{}}', ',%%', '') ~ '^(-?[0-9]*\\.?[0-9]+)?$')
+               ) AS is_numeric
+        {spec['from']}
+        CROSS JOIN LATERAL jsonb_each(
+            CASE WHEN jsonb_typeof({col}) = 'object' THEN {col} ELSE '{{}}'::jsonb END
+        ) e
+        {where}
+        GROUP BY e.key
+        ORDER BY e.key
+    """, params)
+    return [(r["key"], r["is_numeric"]) for r in cur.fetchall()]
+
+
+def _flat_value(v, is_numeric):
+    if is_numeric:
+        return safe_num(v)
+    if v is None:
+        return None
+    return safe_text(v) if isinstance(v, dict) else str(v)
+
+
+def _record_batch(rows, schema, n_scalar, flat_keys):
+    columns = list(zip(*rows))
+    arrays = [pa.array(columns[i], type=schema.field(i).type) for i in range(n_scalar)]
+    for j, keys in enumerate(flat_keys):
+        blobs = [b if isinstance(b, dict) else {} for b in columns[n_scalar + j]]
+        for key, is_numeric in keys:
+            arrays.append(pa.array(
+                [_flat_value(b.get(key), is_numeric) for b in blobs],
+                type=pa.float64() if is_numeric else pa.string(),
+            ))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to the response generator."""
+    def __init__(self):
+        self._chunks = []
+        self._pos = 0
+        self.closed = False
+
+    def write(self, data):
+        b = bytes(data)
+        self._chunks.append(b)
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self):
+        return self._pos
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        out = b"".join(self._chunks)
+        self._chunks.clear()
+        return out
+
+
+def _stream(conn, dataset, spec, where, params, schema, flat_keys, fmt):
+    """Generator: server-side cursor -> record batches -> Arrow/Parquet bytes."""
+    select = ", ".join(expr for expr, _, _ in spec["columns"])
+    if spec["jsonb"]:
+        select += ", " + ", ".join(spec["jsonb"])
+    sink = _ChunkSink()
+    out = pa.PythonFile(sink, mode="w")
+    writer = pq.ParquetWriter(out, schema) if fmt == "parquet" else pa.ipc.new_stream(out, schema)
+    try:
+        cur = conn.cursor(name=f"export_{dataset}", cursor_factory=TupleCursor)
+        cur.itersize = CHUNK_ROWS
+        cur.execute(f"SELECT {select} {spec['from']} {where} ORDER BY {spec['order']}", params)
+        while True:
+            rows = cur.fetchmany(CHUNK_ROWS)
+            if not rows:
+                break
+            batch = _record_batch(rows, schema, len(spec["columns"]), flat_keys)
+            if fmt == "parquet":
+                writer.write_table(pa.Table.from_batches([batch]))
+            else:
+                writer.write_batch(batch)
+            yield sink.drain()
+        cur.close()
+        writer.close()
+        yield sink.drain()
+    finally:
+        conn.close()
+
+
+@router.get("/{dataset}")
+def export_dataset(
+    dataset: str,
+    league_id: Optional[int] = None,
+    season_id: Optional[int] = None,
+    format: str = "arrow",  # 'arrow' (IPC stream) or 'parquet'
+):
+    spec = _DATASETS.get(dataset)
+    if not spec:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset '{dataset}'. Use one of: {', '.join(_DATASETS)}")
+    if format not in _MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format must be 'arrow' or 'parquet'")
+
+    where, params = _where(spec, league_id, season_id)
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        flat_keys = [_jsonb_keys(cur, spec, col, where, params) for col in spec["jsonb"]]
+    except Exception:
+        conn.close()
+        raise
+
+    fields = [pa.field(name, typ) for _, name, typ in spec["columns"]]
+    for col, keys in zip(spec["jsonb"], flat_keys):
+        prefix = col.split(".", 1)[1]
+        fields += [pa.field(f"{prefix}.{k}", pa.float64() if num else pa.string()) for k, num in keys]
+    schema = pa.schema(fields)
+
+    filename = f"{dataset}_{league_id or 'all'}_{season_id or 'all'}.{format}"
+    return StreamingResponse(
+        _stream(conn, dataset, spec, where, params, schema, flat_keys, format),
+        media_type=_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
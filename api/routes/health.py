@@ -1,4 +1,7 @@
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+import metrics
+import database
 from database import get_connection
 
 router = APIRouter()
@@ -6,8 +9,26 @@ router = APIRouter()
 @router.get("/health")
 def health_check():
     try:
+        # A pooled connection may be reused without contacting the server; ask it
         conn = get_connection()
-        conn.close()
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1")
+            cur.fetchone()
+        finally:
+            conn.close()
         return {"status": "healthy", "version": "1.0.0", "database": "connected"}
     except Exception as e:
         return {"status": "unhealthy", "error": str(e)}
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Per-route request metrics in Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/metrics/queries")
+def slow_queries():
+    """Slowest SQL statements seen since startup, with the route that ran them."""
+    return {"threshold": database.QUERY_WARN_THRESHOLD, "statements": metrics.slow_statements()}
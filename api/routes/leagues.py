@@ -1,16 +1,21 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Response
+from typing import Optional
 from database import get_connection
+import league_overview
+import season_simulator
+from serialization import dumps, rows_response, tuple_cursor
 
 router = APIRouter()
 
 @router.get("")
-def list_leagues():
+def list_leagues(accept: Optional[str] = Header(None)):
     conn = get_connection()
-    cur = conn.cursor()
+    cur = tuple_cursor(conn)
     cur.execute("SELECT * FROM leagues ORDER BY name")
     rows = cur.fetchall()
+    response = rows_response(cur, rows, accept)
     conn.close()
-    return rows
+    return response
 
 @router.get("/{league_id}")
 def get_league(league_id: int):
@@ -23,6 +28,59 @@ def get_league(league_id: int):
         raise HTTPException(status_code=404, detail="League not found")
     return row
 
+@router.get("/{league_id}/overview")
+def get_league_overview(league_id: int, season_id: Optional[int] = None):
+    """
+    Precomputed overview for a league-season (current season if omitted), with
+    upcoming fixtures as of today. Served from memory or a primary-key read;
+    never built here (syncs rebuild it).
+    """
+    document = league_overview.cached(league_id, season_id)
+    if document is None:
+        conn = get_connection()
+        try:
+            resolved = season_id or league_overview.current_season(conn, league_id)
+            document = league_overview.read_overview(conn, league_id, resolved) if resolved else None
+        finally:
+            conn.close()
+        if document is None:
+            raise HTTPException(status_code=404, detail="Overview not found")
+        league_overview.remember(league_id, season_id, document)
+    return Response(content=document, media_type="application/json")
+
+@router.get("/{league_id}/simulate")
+def simulate_league(
+    league_id: int,
+    season_id: Optional[int] = None,
+    simulations: int = season_simulator.DEFAULT_SIMULATIONS,
+    workers: int = 1,
+):
+    """
+    Monte Carlo finishing-position probabilities from the remaining fixtures
+    (latest season with matches if season_id is omitted). `workers` > 1 shards
+    the simulations across a process pool. Cached until the next result sync.
+    """
+    if not 1 <= simulations <= season_simulator.MAX_SIMULATIONS:
+        raise HTTPException(status_code=400, detail=f"simulations must be between 1 and {season_simulator.MAX_SIMULATIONS}")
+    conn = get_connection()
+    try:
+        if not season_id:
+            cur = conn.cursor()
+            cur.execute("""
+                SELECT m.season_id FROM matches m
+                JOIN seasons s ON s.id = m.season_id
+                WHERE m.league_id = %s
+                ORDER BY s.name DESC LIMIT 1
+            """, (league_id,))
+            row = cur.fetchone()
+            season_id = row["season_id"] if row else None
+        result = season_simulator.simulate_season(conn, league_id, season_id, simulations, workers) if season_id else None
+    finally:
+        conn.close()
+    if result is None:
+        raise HTTPException(status_code=404, detail="No matches for this league-season")
+    return Response(content=dumps(result), media_type="application/json")
+
 @router.post("")
 def create_league(name: str, country: str = None, fbref_id: int = None):
     conn = get_connection()
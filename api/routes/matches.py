@@ -1,6 +1,10 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException
 from typing import Optional
 from database import get_connection
+from serialization import rows_response, tuple_cursor
+import league_overview
+from derived_data import (invalidate_predictions, refresh_features, refresh_overview,
+                          refresh_ratings, refresh_snapshots)
 
 router = APIRouter()
 
@@ -12,10 +16,11 @@ def list_matches(
     date_from: Optional[str] = None,
     date_to: Optional[str] = None,
     limit: int = 50,
-    offset: int = 0
+    offset: int = 0,
+    accept: Optional[str] = Header(None),
 ):
     conn = get_connection()
-    cur = conn.cursor()
+    cur = tuple_cursor(conn)
     query = """
         SELECT m.id, m.match_date, m.gameweek, m.start_time, m.score_raw,
                m.home_score, m.away_score, m.attendance, m.venue, m.referee, m.round,
@@ -44,8 +49,9 @@ def list_matches(
     params += [limit, offset]
     cur.execute(query, params)
     rows = cur.fetchall()
+    response = rows_response(cur, rows, accept)
     conn.close()
-    return rows
+    return response
 
 @router.get("/{match_id}")
 def get_match(match_id: int):
@@ -67,29 +73,53 @@ def get_match(match_id: int):
         raise HTTPException(status_code=404, detail="Match not found")
     return row
 
+def _refresh(cur, match, deleted=False):
+    """Refresh everything derived from `match`'s result, in savepoints as in sync: a failure
+    there keeps the edit. A deleted match took its feature and rating rows with it, so
+    both teams are replayed from its date explicitly."""
+    results = [(match["home_team_id"], match["away_team_id"], match["gameweek"])]
+    since = match["match_date"] if deleted else None
+    stale = [(match["home_team_id"], since), (match["away_team_id"], since)] if since else ()
+    refresh_snapshots(cur, match["league_id"], match["season_id"], results)
+    refresh_features(cur, match["league_id"], match["season_id"], stale)
+    refresh_ratings(cur, match["league_id"], since)
+    refresh_overview(cur, match["league_id"], match["season_id"])
+    return results
+
+
 @router.put("/{match_id}")
 def update_match_result(match_id: int, home_score: int, away_score: int, score_raw: str = None):
     conn = get_connection()
     cur = conn.cursor()
-    cur.execute("""
-        UPDATE matches SET home_score=%s, away_score=%s, score_raw=%s
-        WHERE id=%s RETURNING *
-    """, (home_score, away_score, score_raw, match_id))
-    row = cur.fetchone()
-    conn.commit()
-    conn.close()
-    if not row:
-        raise HTTPException(status_code=404, detail="Match not found")
+    try:
+        cur.execute("""
+            UPDATE matches SET home_score=%s, away_score=%s, score_raw=%s, is_played=%s
+            WHERE id=%s RETURNING *
+        """, (home_score, away_score, score_raw, home_score is not None and away_score is not None, match_id))
+        row = cur.fetchone()
+        if not row:
+            raise HTTPException(status_code=404, detail="Match not found")
+        results = _refresh(cur, row)
+        conn.commit()
+    finally:
+        conn.close()
+    invalidate_predictions(results)
+    league_overview.forget(row["league_id"], row["season_id"])
     return row
 
 @router.delete("/{match_id}")
 def delete_match(match_id: int):
     conn = get_connection()
     cur = conn.cursor()
-    cur.execute("DELETE FROM matches WHERE id=%s RETURNING id", (match_id,))
-    row = cur.fetchone()
-    conn.commit()
-    conn.close()
-    if not row:
-        raise HTTPException(status_code=404, detail="Match not found")
+    try:
+        cur.execute("DELETE FROM matches WHERE id=%s RETURNING *", (match_id,))
+        row = cur.fetchone()
+        if not row:
+            raise HTTPException(status_code=404, detail="Match not found")
+        results = _refresh(cur, row, deleted=True)
+        conn.commit()
+    finally:
+        conn.close()
+    invalidate_predictions(results)
+    league_overview.forget(row["league_id"], row["season_id"])
     return {"deleted": match_id}
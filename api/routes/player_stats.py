@@ -1,9 +1,35 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Header, HTTPException, Response
 from typing import Optional
 from database import get_connection
+from percentiles import position_group, season_percentiles
+from projection import select_fields
+from serialization import dumps, rows_response, tuple_cursor
 
 router = APIRouter()
 
+_PLAYER_DEFAULT_SELECT = """
+    ps.id, ps.player_name, ps.nationality, ps.position,
+    ps.age, ps.games, ps.games_starts, ps.minutes, ps.minutes_90s,
+    ps.goals, ps.assists, ps.standard_stats,
+    t.name AS team, l.name AS league, s.name AS season
+"""
+
+# Columns selectable through `fields=` (output name -> SQL expression)
+_PLAYER_COLUMNS = {
+    "id": "ps.id", "player_name": "ps.player_name", "nationality": "ps.nationality",
+    "position": "ps.position", "age": "ps.age", "birth_year": "ps.birth_year",
+    "games": "ps.games", "games_starts": "ps.games_starts", "minutes": "ps.minutes",
+    "minutes_90s": "ps.minutes_90s", "goals": "ps.goals", "assists": "ps.assists",
+    "team_id": "ps.team_id", "season_id": "ps.season_id",
+    "team": "t.name", "league": "l.name", "season": "s.name",
+}
+_PLAYER_JSONB = {"standard_stats": "ps.standard_stats"}
+
+# standard_stats keys promoted to indexed generated columns (db/06_player_stat_columns.sql)
+_HOT_STATS = ("xg", "npxg", "xg_assist", "progressive_carries", "progressive_passes", "progressive_passes_received")
+# Stats that are plain player_stats columns
+_COLUMN_STATS = ("goals", "assists", "games", "games_starts", "minutes")
+
 @router.get("")
 def get_players(
     season_id: Optional[int] = None,
@@ -14,22 +40,28 @@ def get_players(
     search: Optional[str] = None,
     sort_by: str = "goals",
     limit: int = 50,
-    offset: int = 0
+    offset: int = 0,
+    fields: Optional[str] = None,
+    accept: Optional[str] = Header(None),
 ):
+    """
+    `fields` limits the response to the listed columns and JSONB keys,
+    e.g. fields=player_name,team,goals,standard_stats.xg,standard_stats.npxg
+    """
+    if fields:
+        select, params = select_fields(fields, _PLAYER_COLUMNS, _PLAYER_JSONB)
+    else:
+        select, params = _PLAYER_DEFAULT_SELECT, []
     conn = get_connection()
-    cur = conn.cursor()
-    query = """
-        SELECT ps.id, ps.player_name, ps.nationality, ps.position,
-               ps.age, ps.games, ps.games_starts, ps.minutes, ps.minutes_90s,
-               ps.goals, ps.assists, ps.standard_stats,
-               t.name AS team, l.name AS league, s.name AS season
+    cur = tuple_cursor(conn)
+    query = f"""
+        SELECT {select}
         FROM player_stats ps
         LEFT JOIN teams t ON t.id = ps.team_id
         LEFT JOIN leagues l ON l.id = t.league_id
         JOIN seasons s ON s.id = ps.season_id
         WHERE 1=1
     """
-    params = []
     if season_id:
         query += " AND ps.season_id = %s"; params.append(season_id)
     if team_id:
@@ -50,13 +82,19 @@ def get_players(
 
     cur.execute(query, params)
     rows = cur.fetchall()
+    response = rows_response(cur, rows, accept)
     conn.close()
-    return rows
+    return response
 
 @router.get("/top-scorers")
-def top_scorers(season_id: Optional[int] = None, league_id: Optional[int] = None, limit: int = 20):
+def top_scorers(
+    season_id: Optional[int] = None,
+    league_id: Optional[int] = None,
+    limit: int = 20,
+    accept: Optional[str] = Header(None),
+):
     conn = get_connection()
-    cur = conn.cursor()
+    cur = tuple_cursor(conn)
     query = """
         SELECT ps.player_name, ps.nationality, ps.position, ps.goals, ps.assists,
                ps.games, ps.minutes_90s, t.name AS team, l.name AS league, s.name AS season
@@ -75,5 +113,92 @@ def top_scorers(season_id: Optional[int] = None, league_id: Optional[int] = None
     params.append(limit)
     cur.execute(query, params)
     rows = cur.fetchall()
+    response = rows_response(cur, rows, accept)
+    conn.close()
+    return response
+
+@router.get("/leaderboard")
+def stat_leaderboard(
+    stat: str,
+    per90: bool = False,
+    season_id: Optional[int] = None,
+    league_id: Optional[int] = None,
+    position: Optional[str] = None,
+    min_minutes: Optional[int] = None,
+    limit: int = 20,
+    accept: Optional[str] = Header(None),
+):
+    """
+    Rank players by any standard_stats key (or goals/assists/games/minutes),
+    optionally per 90 minutes. Hot keys read their generated column so the
+    top-N comes straight off an index; other keys are parsed from JSONB in SQL.
+    min_minutes defaults to 450 for per-90 boards so cameo appearances don't dominate.
+    """
+    value_params = []
+    if stat in _COLUMN_STATS:
+        value = f"ps.{stat}"
+    elif stat in _HOT_STATS:
+        value = f"ps.stat_{stat}"
+    else:
+        value = "fbref_num(ps.standard_stats -> %s)"
+        value_params = [stat]
+    if per90:
+        value = f"({value} / NULLIF(ps.minutes_90s, 0)::double precision)"
+    if min_minutes is None:
+        min_minutes = 450 if per90 else 0
+
+    query = f"""
+        SELECT ps.id, ps.player_name, ps.nationality, ps.position,
+               ps.minutes, ps.minutes_90s,
+               t.name AS team, l.name AS league, s.name AS season,
+               {value} AS value
+        FROM player_stats ps
+        LEFT JOIN teams t ON t.id = ps.team_id
+        LEFT JOIN leagues l ON l.id = t.league_id
+        JOIN seasons s ON s.id = ps.season_id
+        WHERE {value} IS NOT NULL
+    """
+    # The value expression appears in SELECT, WHERE and ORDER BY
+    params = value_params * 2
+    if season_id:
+        query += " AND ps.season_id = %s"; params.append(season_id)
+    if league_id:
+        query += " AND t.league_id = %s"; params.append(league_id)
+    if position:
+        query += " AND ps.position ILIKE %s"; params.append(f"%{position}%")
+    if min_minutes:
+        query += " AND ps.minutes >= %s"; params.append(min_minutes)
+    query += f" ORDER BY {value} DESC NULLS LAST LIMIT %s"
+    params += value_params + [limit]
+
+    conn = get_connection()
+    cur = tuple_cursor(conn)
+    cur.execute(query, params)
+    rows = cur.fetchall()
+    response = rows_response(cur, rows, accept)
+    conn.close()
+    return response
+
+@router.get("/percentiles")
+def player_percentiles(
+    league_id: int,
+    season_id: int,
+    player_id: Optional[int] = None,
+    position: Optional[str] = None,
+):
+    """
+    Per-90 percentile of every numeric standard_stats key, relative to players
+    in the same league, season and position group (GK/DF/MF/FW). Only players
+    with at least percentiles.MIN_90S full matches form the reference pool.
+    """
+    conn = get_connection()
+    table = season_percentiles(conn, league_id, season_id)
     conn.close()
-    return rows
+    if player_id is not None:
+        player = table.player(player_id)
+        if player is None:
+            raise HTTPException(status_code=404, detail="Player not found in this league-season")
+        return Response(content=dumps(player), media_type="application/json")
+    group = position_group(position) if position else None
+    content = {"stats": table.keys, "players": table.players(group)}
+    return Response(content=dumps(content), media_type="application/json")
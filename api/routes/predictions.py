@@ -1,37 +1,103 @@
-# Enhanced ML-Based Prediction Engine
+from fastapi import APIRouter, HTTPException, Response
+from typing import Optional
+from database import get_connection
+from ml import prediction_cache, registry
+from ml.predictor import OUTCOMES, ModelUnavailable, activate, loaded_model, predict_matches
+from serialization import dumps
 
-## Overview
-This module implements an enhanced prediction engine using machine learning models and advanced feature engineering techniques to provide robust match outcome predictions for football games.
+router = APIRouter()
 
-## Implementation Details
+_FIXTURE_SELECT = """
+    SELECT m.id AS match_id, m.match_date, m.start_time, m.gameweek, l.name AS league,
+           m.home_team_id, ht.name AS home_team, m.away_team_id, at.name AS away_team, m.is_played
+    FROM matches m
+    JOIN leagues l ON l.id = m.league_id
+    JOIN teams ht ON ht.id = m.home_team_id
+    JOIN teams at ON at.id = m.away_team_id
+"""
 
-1. **Feature Engineering**:  
-   Utilize advanced methods to extract and create features from raw data, including player statistics, match history, and other relevant factors.
 
-2. **Machine Learning Models**:  
-   Integrate various ML algorithms, such as:
-   - Logistic Regression
-   - Random Forest
-   - Gradient Boosting Machines
-   - Neural Networks
+def _scored(conn, fixtures):
+    """Attach W/D/L probabilities to fixture rows, scoring them all in one batch."""
+    try:
+        version, proba = predict_matches(conn, [(f["match_id"], f["home_team_id"], f["away_team_id"]) for f in fixtures])
+    except ModelUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    for f in fixtures:
+        f["model_version"] = version
+        row = proba.get(f["match_id"])
+        if row is None:
+            f["probabilities"] = None
+            f["prediction"] = None
+        else:
+            f["probabilities"] = {k: round(float(p), 4) for k, p in zip(OUTCOMES, row)}
+            f["prediction"] = OUTCOMES[int(row.argmax())]
+    return fixtures
 
-3. **Training and Evaluation**:  
-   - Train models using historical match data, cross-validate using k-fold techniques, and evaluate performance based on accuracy, F1 score, and ROC-AUC.
 
-4. **Prediction Interface**:  
-   - Create a user-friendly API interface for making predictions on upcoming matches based on the processed data and trained model. 
+@router.get("/upcoming")
+def predict_upcoming(league_id: Optional[int] = None, days: Optional[int] = None, limit: int = 100):
+    """
+    Win/draw/loss probabilities for upcoming fixtures (optionally one league,
+    within `days` from today), scored as a single batch.
+    """
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        # Range on match_date + is_played filter is served by idx_matches_upcoming
+        query = _FIXTURE_SELECT + " WHERE m.match_date >= CURRENT_DATE AND m.is_played = false"
+        params = []
+        if league_id:
+            query += " AND m.league_id = %s"; params.append(league_id)
+        if days:
+            query += " AND m.match_date < CURRENT_DATE + %s"; params.append(days)
+        query += " ORDER BY m.match_date, m.start_time LIMIT %s"
+        params.append(limit)
+        cur.execute(query, params)
+        fixtures = _scored(conn, cur.fetchall())
+    finally:
+        conn.close()
+    return Response(content=dumps(fixtures), media_type="application/json")
 
-## Example Usage
-```python
-from predictions import PredictionEngine
 
-# Initialize the prediction engine
-engine = PredictionEngine()
+@router.get("/match/{match_id}")
+def predict_match(match_id: int):
+    conn = get_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute(_FIXTURE_SELECT + " WHERE m.id = %s", (match_id,))
+        row = cur.fetchone()
+        if not row:
+            raise HTTPException(status_code=404, detail="Match not found")
+        fixture = _scored(conn, [row])[0]
+    finally:
+        conn.close()
+    return Response(content=dumps(fixture), media_type="application/json")
 
-# Load the trained model
-engine.load_model('path_to_model')
 
-# Make a prediction
-predictions = engine.predict(match_data)
-print(predictions)
-```
\ No newline at end of file
+@router.get("/model")
+def model_info():
+    """Published artifact versions and the metadata of the one serving requests (if loaded yet)."""
+    active = loaded_model()
+    return {
+        "versions": registry.list_versions(),
+        "active": active.metadata if active else None,
+    }
+
+
+@router.post("/model/activate")
+def activate_model(version: Optional[str] = None):
+    """Hot-swap to an artifact version (default: latest); in-flight requests finish on the old one."""
+    if version and version not in registry.list_versions():
+        raise HTTPException(status_code=404, detail=f"Model version {version} not found")
+    try:
+        active = activate(version)
+    except ModelUnavailable as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"activated": active.version, "metadata": active.metadata}
+
+
+@router.get("/cache")
+def cache_stats():
+    """Prediction cache hit/miss counters and size."""
+    return prediction_cache.stats()
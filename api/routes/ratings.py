@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Header
+from typing import Optional
+from database import get_connection
+from serialization import rows_response, tuple_cursor
+
+router = APIRouter()
+
+@router.get("")
+def current_ratings(league_id: Optional[int] = None, accept: Optional[str] = Header(None)):
+    """Latest Elo and Poisson attack/defence rating per team, strongest first."""
+    query = """
+        SELECT team_id, team, league, elo, attack, defence, as_of
+        FROM (
+            SELECT DISTINCT ON (r.team_id)
+                   r.team_id, t.name AS team, l.name AS league,
+                   r.elo, r.attack, r.defence, r.match_date AS as_of
+            FROM team_ratings r
+            JOIN teams t ON t.id = r.team_id
+            JOIN leagues l ON l.id = r.league_id
+            WHERE 1=1
+    """
+    params = []
+    if league_id:
+        query += " AND r.league_id = %s"; params.append(league_id)
+    query += """
+            ORDER BY r.team_id, r.match_date DESC, r.match_id DESC
+        ) latest
+        ORDER BY elo DESC
+    """
+    conn = get_connection()
+    cur = tuple_cursor(conn)
+    cur.execute(query, params)
+    rows = cur.fetchall()
+    response = rows_response(cur, rows, accept)
+    conn.close()
+    return response
+
+@router.get("/history")
+def rating_history(team_id: int, season_id: Optional[int] = None, accept: Optional[str] = Header(None)):
+    """A team's ratings after each played match."""
+    query = """
+        SELECT r.match_id, r.match_date, s.name AS season,
+               r.elo, r.attack, r.defence, r.goals_for, r.goals_against
+        FROM team_ratings r
+        JOIN seasons s ON s.id = r.season_id
+        WHERE r.team_id = %s
+    """
+    params = [team_id]
+    if season_id:
+        query += " AND r.season_id = %s"; params.append(season_id)
+    query += " ORDER BY r.match_date, r.match_id"
+    conn = get_connection()
+    cur = tuple_cursor(conn)
+    cur.execute(query, params)
+    rows = cur.fetchall()
+    response = rows_response(cur, rows, accept)
+    conn.close()
+    return response
@@ -1,27 +1,48 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Header
 from typing import Optional
-from database import get_connection
+from projection import select_fields
+from streaming import stream_rows
 
 router = APIRouter()
 
+# Columns selectable through `fields=` (output name -> SQL expression)
+_SQUAD_COLUMNS = {
+    name: f"ts.{name}" for name in (
+        "id", "team_id", "league_id", "season_id", "split", "players_used", "avg_age",
+        "possession", "games", "games_starts", "minutes", "minutes_90s", "goals",
+        "assists", "scraped_at",
+    )
+}
+_SQUAD_COLUMNS.update({"team": "t.name", "league": "l.name", "season": "s.name"})
+_SQUAD_JSONB = {
+    name: f"ts.{name}" for name in ("standard_stats", "goalkeeping", "shooting", "playing_time", "misc_stats")
+}
+
 @router.get("")
 def get_squad_stats(
     team_id: Optional[int] = None,
     league_id: Optional[int] = None,
     season_id: Optional[int] = None,
-    split: Optional[str] = None  # 'for' or 'against'
+    split: Optional[str] = None,  # 'for' or 'against'
+    fields: Optional[str] = None,
+    accept: Optional[str] = Header(None),
 ):
-    conn = get_connection()
-    cur = conn.cursor()
-    query = """
-        SELECT ts.*, t.name AS team, l.name AS league, s.name AS season
+    """
+    `fields` limits the response to the listed columns and JSONB keys,
+    e.g. fields=team,split,possession,shooting.sot_pct,goalkeeping.gk_save_pct
+    """
+    if fields:
+        select, params = select_fields(fields, _SQUAD_COLUMNS, _SQUAD_JSONB)
+    else:
+        select, params = "ts.*, t.name AS team, l.name AS league, s.name AS season", []
+    query = f"""
+        SELECT {select}
         FROM team_squad_stats ts
         JOIN teams t ON t.id = ts.team_id
         JOIN leagues l ON l.id = ts.league_id
         JOIN seasons s ON s.id = ts.season_id
         WHERE 1=1
     """
-    params = []
     if team_id:
         query += " AND ts.team_id = %s"; params.append(team_id)
     if league_id:
@@ -31,7 +52,4 @@ def get_squad_stats(
     if split:
         query += " AND ts.split = %s"; params.append(split)
     query += " ORDER BY t.name, ts.split"
-    cur.execute(query, params)
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    return stream_rows(query, params, name="squad_stats", accept=accept)
@@ -1,6 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Header, HTTPException
 from typing import Optional
 from database import get_connection
+from serialization import rows_response, tuple_cursor
+from streaming import stream_rows
+from standings_snapshots import rebuild_snapshots
 
 router = APIRouter()
 
@@ -53,10 +56,106 @@ def get_standings_seasons(league_id: Optional[int] = None):
     return result
 
 
-@router.get("")
-def get_standings(league_id: Optional[int] = None, season_id: Optional[int] = None):
+@router.get("/history")
+def get_position_history(
+    season_id: int,
+    league_id: Optional[int] = None,
+    team_id: Optional[int] = None,
+    accept: Optional[str] = Header(None),
+):
+    """
+    Position-over-time from the per-gameweek snapshots: one entry per team per
+    gameweek, for a whole league-season or a single team.
+    """
+    if not league_id and not team_id:
+        raise HTTPException(status_code=400, detail="league_id or team_id is required")
+    conn = get_connection()
+    cur = tuple_cursor(conn)
+    query = """
+        SELECT ss.gameweek, ss.team_id, t.name AS team, ss.rank, ss.points,
+               ss.goals_for - ss.goals_against AS goal_diff
+        FROM standings_snapshots ss
+        JOIN teams t ON t.id = ss.team_id
+        WHERE ss.season_id = %s
+    """
+    params = [season_id]
+    if league_id:
+        query += " AND ss.league_id = %s"; params.append(league_id)
+    if team_id:
+        query += " AND ss.team_id = %s"; params.append(team_id)
+    query += " ORDER BY t.name, ss.gameweek"
+    cur.execute(query, params)
+    rows = cur.fetchall()
+    response = rows_response(cur, rows, accept)
+    conn.close()
+    return response
+
+
+@router.post("/snapshots/rebuild")
+def rebuild_standings_snapshots(league_id: int, season_id: int, from_gameweek: int = 1):
+    """Backfill or repair snapshots for a league-season (normally done by sync)."""
     conn = get_connection()
     cur = conn.cursor()
+    try:
+        written = rebuild_snapshots(cur, league_id, season_id, from_gameweek)
+        conn.commit()
+        return {"success": True, "gameweeks_written": written}
+    except Exception as e:
+        conn.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        conn.close()
+
+
+def _get_standings_as_of(league_id, season_id, as_of, accept=None):
+    """Table as of gameweek `as_of` (the latest snapshot at or before it)."""
+    conn = get_connection()
+    cur = tuple_cursor(conn)
+    query = """
+        SELECT ss.rank,
+               t.name  AS team,
+               l.name  AS league,
+               l.id    AS league_id,
+               s.name  AS season,
+               s.id    AS season_id,
+               ss.gameweek,
+               ss.games, ss.wins, ss.ties, ss.losses,
+               ss.goals_for, ss.goals_against,
+               ss.goals_for - ss.goals_against AS goal_diff,
+               ss.points,
+               ROUND(ss.points::numeric / NULLIF(ss.games, 0), 2) AS points_avg
+        FROM standings_snapshots ss
+        JOIN teams   t ON t.id = ss.team_id
+        JOIN leagues l ON l.id = ss.league_id
+        JOIN seasons s ON s.id = ss.season_id
+        WHERE ss.gameweek = (
+            SELECT MAX(x.gameweek) FROM standings_snapshots x
+            WHERE x.league_id = ss.league_id AND x.season_id = ss.season_id
+              AND x.gameweek <= %s
+        )
+    """
+    params = [as_of]
+    if league_id:
+        query += " AND ss.league_id = %s"; params.append(league_id)
+    if season_id:
+        query += " AND ss.season_id = %s"; params.append(season_id)
+    query += " ORDER BY ss.league_id, ss.season_id DESC, ss.rank"
+    cur.execute(query, params)
+    rows = cur.fetchall()
+    response = rows_response(cur, rows, accept)
+    conn.close()
+    return response
+
+
+@router.get("")
+def get_standings(
+    league_id: Optional[int] = None,
+    season_id: Optional[int] = None,
+    as_of: Optional[int] = None,  # gameweek number
+    accept: Optional[str] = Header(None),
+):
+    if as_of is not None:
+        return _get_standings_as_of(league_id, season_id, as_of, accept)
 
     # Subquery: find the latest season_id per league (used to mark is_current)
     query = """
@@ -90,7 +189,13 @@ def get_standings(league_id: Optional[int] = None, season_id: Optional[int] = No
     if season_id:
         query += " AND ls.season_id = %s"; params.append(season_id)
     query += " ORDER BY ls.league_id, ls.season_id DESC, ls.rank"
+    if not params:
+        # Every table of every league and season: stream instead of materializing
+        return stream_rows(query, params, name="standings", accept=accept)
+    conn = get_connection()
+    cur = tuple_cursor(conn)
     cur.execute(query, params)
     rows = cur.fetchall()
+    response = rows_response(cur, rows, accept)
     conn.close()
-    return rows
+    return response
@@ -1,25 +1,22 @@
+import heapq
 import json
 import re
-from fastapi import APIRouter, HTTPException
+from itertools import groupby
+import psycopg2.errors
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
 from typing import List, Optional, Any
 from database import get_connection
-
-def safe_num(val):
-    """Safely convert FBref values to a number, returning None for non-numeric."""
-    if val is None:
-        return None
-    s = str(val).strip().replace(",", "").replace("%", "").replace("N/A", "").replace("nan", "")
-    if not s:
-        return None
-    try:
-        return int(s)
-    except ValueError:
-        try:
-            return float(s)
-        except ValueError:
-            return None
-
+from parsing import safe_num
+from serialization import dumps
+from streaming import Release, iter_rows, server_cursor
+import league_overview
+from derived_data import (invalidate_predictions, refresh_features, refresh_overview,
+                          refresh_ratings, refresh_snapshots)
+import sync_timing
+from sync_timing import phase
 
 def safe_text(val):
     """Extract plain text from a value that may be a dict/link object or plain string."""
@@ -255,33 +252,36 @@ def get_or_create_league(cur, name):
     clean = name.strip()
     if clean.isdigit():
         raise ValueError(f"Invalid league name '{clean}'")
-    cur.execute("SELECT id FROM leagues WHERE name ILIKE %s LIMIT 1", (clean,))
-    row = cur.fetchone()
-    if row:
-        return row["id"]
-    normalized = clean.title()
-    cur.execute("INSERT INTO leagues (name) VALUES (%s) RETURNING id", (normalized,))
-    return cur.fetchone()["id"]
+    with phase("resolve"):
+        cur.execute("SELECT id FROM leagues WHERE name ILIKE %s LIMIT 1", (clean,))
+        row = cur.fetchone()
+        if row:
+            return row["id"]
+        normalized = clean.title()
+        cur.execute("INSERT INTO leagues (name) VALUES (%s) RETURNING id", (normalized,))
+        return cur.fetchone()["id"]
 
 
 def get_or_create_season(cur, name):
     clean = name.strip()
-    cur.execute("SELECT id FROM seasons WHERE name ILIKE %s LIMIT 1", (clean,))
-    row = cur.fetchone()
-    if row:
-        return row["id"]
-    cur.execute("INSERT INTO seasons (name) VALUES (%s) RETURNING id", (clean,))
-    return cur.fetchone()["id"]
+    with phase("resolve"):
+        cur.execute("SELECT id FROM seasons WHERE name ILIKE %s LIMIT 1", (clean,))
+        row = cur.fetchone()
+        if row:
+            return row["id"]
+        cur.execute("INSERT INTO seasons (name) VALUES (%s) RETURNING id", (clean,))
+        return cur.fetchone()["id"]
 
 
 def get_or_create_team(cur, name, league_id):
     clean = safe_text(name) or name.strip()
-    cur.execute("SELECT id FROM teams WHERE name ILIKE %s AND league_id = %s LIMIT 1", (clean, league_id))
-    row = cur.fetchone()
-    if row:
-        return row["id"]
-    cur.execute("INSERT INTO teams (name, league_id) VALUES (%s, %s) RETURNING id", (clean, league_id))
-    return cur.fetchone()["id"]
+    with phase("resolve"):
+        cur.execute("SELECT id FROM teams WHERE name ILIKE %s AND league_id = %s LIMIT 1", (clean, league_id))
+        row = cur.fetchone()
+        if row:
+            return row["id"]
+        cur.execute("INSERT INTO teams (name, league_id) VALUES (%s, %s) RETURNING id", (clean, league_id))
+        return cur.fetchone()["id"]
 
 
 def parse_score(score_raw):
@@ -308,14 +308,84 @@ def parse_date(raw):
     return s[:10]
 
 
+# Percentiles and the weekly trend in /status cover this many weeks of timed syncs
+SYNC_TIMING_WEEKS = 8
+
+
+def _tagged(cur, source):
+    for r in iter_rows(cur):
+        yield r["league"], source, r
+
+
+def _iter_sync_status(release, log_cur, live_cur, timing_cur):
+    """Merge the league-ordered cursors and emit one league object at a time.
+    Without timing_cur (no db/09 timing columns) the entries have no "timings"."""
+    try:
+        yield b'{"success": true, "leagues": ['
+        sources = [_tagged(log_cur, 0), _tagged(live_cur, 1)]
+        if timing_cur is not None:
+            sources.append(_tagged(timing_cur, 2))
+        merged = heapq.merge(*sources, key=lambda item: item[:2])
+        sep = b""
+        for lg, items in groupby(merged, key=lambda item: item[0]):
+            entry = {"league": lg, "season": None, "log": [], "live": {}}
+            if timing_cur is not None:
+                entry["timings"] = None
+            for _, source, r in items:
+                if source == 0:
+                    if not entry["log"]:
+                        entry["season"] = r["season"]
+                    entry["log"].append({
+                        "type": r["page_type"],
+                        "rows": r["rows"],
+                        "last_sync": r["last_sync"].isoformat() if r["last_sync"] else None
+                    })
+                elif source == 1:
+                    entry["live"] = {
+                        "fixtures": r["fixtures"],
+                        "home_away_rows": r["home_away_rows"],
+                        "standings_rows": r["standings_rows"]
+                    }
+                else:
+                    entry["timings"] = {
+                        "last": r["last"],
+                        "phases_ms": r["phases_ms"] or {},
+                        "rows_per_sec": r["rows_per_sec"] or {},
+                        "weekly": r["weekly"] or [],
+                    }
+            yield sep + dumps(entry)
+            sep = b","
+        yield b"]}"
+    finally:
+        release()
+
+
+def _has_timing_columns(cur):
+    """Whether db/09 (scrape_log duration_ms/phases/tables) has been applied."""
+    cur.execute("""
+        SELECT COUNT(*) AS n FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'scrape_log'
+          AND column_name IN ('duration_ms', 'phases', 'tables')
+    """)
+    return cur.fetchone()["n"] == 3
+
+
 @router.get("/status")
 def sync_status():
-    """Return per-league sync history from scrape_log + live row counts from DB."""
+    """Return per-league sync history from scrape_log + live row counts from DB.
+
+    All queries run on server-side cursors ordered by league name (byte order,
+    so Python string comparison agrees) and are merged into the response as it streams.
+    Timings give the latest timed sync, p50/p95 per phase and p50/p5 rows/sec per
+    table type over the last SYNC_TIMING_WEEKS weeks, and weekly p50/p95 durations;
+    they are left out when scrape_log has no timing columns.
+    """
     conn = get_connection()
-    cur = conn.cursor()
+    timing_cur = None
     try:
+        timed = _has_timing_columns(conn.cursor())
         # Per-league: last sync time and total rows inserted
-        cur.execute("""
+        log_cur = server_cursor(conn, "sync_status_log", """
             SELECT
                 l.name            AS league,
                 s.name            AS season,
@@ -326,12 +396,11 @@ def sync_status():
             JOIN leagues  l ON l.id = sl.league_id
             JOIN seasons  s ON s.id = sl.season_id
             GROUP BY l.name, s.name, sl.page_type
-            ORDER BY l.name, sl.page_type
+            ORDER BY l.name COLLATE "C", sl.page_type
         """)
-        log_rows = cur.fetchall()
 
         # Live counts per league from key tables
-        cur.execute("""
+        live_cur = server_cursor(conn, "sync_status_live", """
             SELECT l.name AS league,
                 COUNT(DISTINCT m.id)   AS fixtures,
                 COUNT(DISTINCT tvs.id) AS home_away_rows,
@@ -341,41 +410,82 @@ def sync_status():
             LEFT JOIN team_venue_stats tvs ON tvs.league_id = l.id
             LEFT JOIN league_standings st  ON st.league_id  = l.id
             GROUP BY l.name
-            ORDER BY l.name
+            ORDER BY l.name COLLATE "C"
         """)
-        live_rows = cur.fetchall()
-
-        # Build structured response
-        by_league = {}
-        for r in log_rows:
-            lg = r["league"]
-            if lg not in by_league:
-                by_league[lg] = {"league": lg, "season": r["season"], "log": [], "live": {}}
-            by_league[lg]["log"].append({
-                "type": r["page_type"],
-                "rows": r["rows"],
-                "last_sync": r["last_sync"].isoformat() if r["last_sync"] else None
-            })
 
-        for r in live_rows:
-            lg = r["league"]
-            if lg not in by_league:
-                by_league[lg] = {"league": lg, "season": None, "log": [], "live": {}}
-            by_league[lg]["live"] = {
-                "fixtures": r["fixtures"],
-                "home_away_rows": r["home_away_rows"],
-                "standings_rows": r["standings_rows"]
-            }
-
-        return {"success": True, "leagues": list(by_league.values())}
+        # Phase timings per league (rows written by log_scrape with a SyncTimer)
+        if timed:
+            timing_cur = server_cursor(conn, "sync_status_timings", """
+                WITH timed AS (
+                    SELECT league_id, scraped_at, duration_ms, phases, tables
+                    FROM scrape_log
+                    WHERE duration_ms IS NOT NULL
+                      AND scraped_at >= NOW() - make_interval(weeks => %s)
+                ),
+                last AS (
+                    SELECT DISTINCT ON (league_id) league_id,
+                           jsonb_build_object('at', scraped_at, 'type', page_type, 'duration_ms', duration_ms,
+                                              'phases', phases, 'tables', tables) AS last
+                    FROM scrape_log
+                    WHERE duration_ms IS NOT NULL
+                    ORDER BY league_id, scraped_at DESC
+                ),
+                phase_pct AS (
+                    SELECT league_id, jsonb_object_agg(phase, jsonb_build_object('p50', p50, 'p95', p95)) AS phases_ms
+                    FROM (
+                        SELECT t.league_id, p.key AS phase,
+                               round(percentile_cont(0.5)  WITHIN GROUP (ORDER BY p.value::float)::numeric, 2) AS p50,
+                               round(percentile_cont(0.95) WITHIN GROUP (ORDER BY p.value::float)::numeric, 2) AS p95
+                        FROM timed t CROSS JOIN LATERAL jsonb_each_text(t.phases) p
+                        GROUP BY t.league_id, p.key
+                    ) x
+                    GROUP BY league_id
+                ),
+                table_pct AS (
+                    SELECT league_id, jsonb_object_agg(table_type, jsonb_build_object('p50', p50, 'p5', p5)) AS rows_per_sec
+                    FROM (
+                        SELECT t.league_id, tb.key AS table_type,
+                               round(percentile_cont(0.5)  WITHIN GROUP (ORDER BY (tb.value->>'rows_per_sec')::float)::numeric, 1) AS p50,
+                               round(percentile_cont(0.05) WITHIN GROUP (ORDER BY (tb.value->>'rows_per_sec')::float)::numeric, 1) AS p5
+                        FROM timed t CROSS JOIN LATERAL jsonb_each(t.tables) tb
+                        WHERE tb.value->>'rows_per_sec' IS NOT NULL
+                        GROUP BY t.league_id, tb.key
+                    ) x
+                    GROUP BY league_id
+                ),
+                weekly AS (
+                    SELECT league_id,
+                           jsonb_agg(jsonb_build_object('week', week, 'syncs', syncs, 'p50_ms', p50, 'p95_ms', p95)
+                                     ORDER BY week) AS weekly
+                    FROM (
+                        SELECT league_id, date_trunc('week', scraped_at)::date AS week, COUNT(*) AS syncs,
+                               round(percentile_cont(0.5)  WITHIN GROUP (ORDER BY duration_ms)::numeric, 2) AS p50,
+                               round(percentile_cont(0.95) WITHIN GROUP (ORDER BY duration_ms)::numeric, 2) AS p95
+                        FROM timed
+                        GROUP BY league_id, week
+                    ) x
+                    GROUP BY league_id
+                )
+                SELECT l.name AS league, last.last, phase_pct.phases_ms, table_pct.rows_per_sec, weekly.weekly
+                FROM last
+                JOIN leagues l ON l.id = last.league_id
+                LEFT JOIN phase_pct USING (league_id)
+                LEFT JOIN table_pct USING (league_id)
+                LEFT JOIN weekly    USING (league_id)
+                ORDER BY l.name COLLATE "C"
+            """, (SYNC_TIMING_WEEKS,))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
         conn.close()
+        raise HTTPException(status_code=500, detail=str(e))
+    # Released by the body's finally, or by the background task if the body never runs
+    release = Release(conn, *(cur for cur in (log_cur, live_cur, timing_cur) if cur is not None))
+    return StreamingResponse(_iter_sync_status(release, log_cur, live_cur, timing_cur),
+                             media_type="application/json", background=BackgroundTask(release))
 
 
 @router.post("/all")
-def sync_all(payload: SyncPayload):
+def sync_all(payload: SyncPayload, request: Request):
+    timer, token = sync_timing.start(request.scope.get("received_at"))
     conn = get_connection()
     cur = conn.cursor()
     try:
@@ -387,36 +497,47 @@ def sync_all(payload: SyncPayload):
         standings_list = []
         ha_split_list  = []  # Home/Away split table (Table 2 on FBref stats pages)
         if payload.tables:
-            for t in payload.tables:
-                ttype = detect_table_type(t)
-                if ttype == "standings":
-                    standings_list.extend(tables_to_standings([t]))
-                elif ttype == "fixtures":
-                    fixtures_list.extend(tables_to_fixtures([t]))
-                elif ttype == "player_stats":
-                    players_list.extend(tables_to_player_stats([t]))
-                elif ttype == "standings_home_away":
-                    ha_split_list.extend(tables_to_home_away_stats([t]))
-                else:
-                    stats_list.extend(tables_to_squad_stats([t]))
-        fx  = _insert_fixtures(cur, league_id, season_id, payload.league, fixtures_list)
-        st  = _insert_squad_stats(cur, league_id, season_id, stats_list)
-        pl  = _insert_player_stats(cur, season_id, payload.league, players_list)
-        sd  = _insert_standings(cur, league_id, season_id, standings_list)
-        ha  = _insert_home_away_stats(cur, league_id, season_id, ha_split_list)
+            with phase("parse"):
+                for t in payload.tables:
+                    ttype = detect_table_type(t)
+                    if ttype == "standings":
+                        standings_list.extend(tables_to_standings([t]))
+                    elif ttype == "fixtures":
+                        fixtures_list.extend(tables_to_fixtures([t]))
+                    elif ttype == "player_stats":
+                        players_list.extend(tables_to_player_stats([t]))
+                    elif ttype == "standings_home_away":
+                        ha_split_list.extend(tables_to_home_away_stats([t]))
+                    else:
+                        stats_list.extend(tables_to_squad_stats([t]))
+        results = []
+        fx  = timer.write("fixtures", _insert_fixtures, cur, league_id, season_id, payload.league, fixtures_list, results)
+        st  = timer.write("squad_stats", _insert_squad_stats, cur, league_id, season_id, stats_list)
+        pl  = timer.write("player_stats", _insert_player_stats, cur, season_id, payload.league, players_list)
+        sd  = timer.write("standings", _insert_standings, cur, league_id, season_id, standings_list)
+        ha  = timer.write("standings_home_away", _insert_home_away_stats, cur, league_id, season_id, ha_split_list)
+        gw  = refresh_snapshots(cur, league_id, season_id, results)
+        ft  = refresh_features(cur, league_id, season_id)
+        rt  = refresh_ratings(cur, league_id)
+        refresh_overview(cur, league_id, season_id)
+        with phase("commit"):
+            conn.commit()
+        invalidate_predictions(results)
+        league_overview.forget(league_id, season_id)
+        log_scrape(cur, league_id, season_id, "sync_all", fx + st + pl + sd + ha, 0, timer)
         conn.commit()
-        log_scrape(cur, league_id, season_id, "sync_all", fx + st + pl + sd + ha, 0)
-        conn.commit()
-        return {"success": True, "fixtures_inserted": fx, "stats_inserted": st, "players_inserted": pl, "standings_inserted": sd, "home_away_inserted": ha}
+        return {"success": True, "fixtures_inserted": fx, "stats_inserted": st, "players_inserted": pl, "standings_inserted": sd, "home_away_inserted": ha, "snapshots_rebuilt": gw, "features_updated": ft, "ratings_applied": rt, "refresh_failed": timer.failed}
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         conn.close()
+        sync_timing.stop(token)
 
 
 @router.post("/fixtures")
-def sync_fixtures(payload: SyncPayload):
+def sync_fixtures(payload: SyncPayload, request: Request):
+    timer, token = sync_timing.start(request.scope.get("received_at"))
     conn = get_connection()
     cur = conn.cursor()
     try:
@@ -424,19 +545,32 @@ def sync_fixtures(payload: SyncPayload):
         season_id = get_or_create_season(cur, payload.season)
         rows = payload.fixtures or []
         if payload.tables:
-            rows.extend(tables_to_fixtures(payload.tables))
-        inserted = _insert_fixtures(cur, league_id, season_id, payload.league, rows)
+            with phase("parse"):
+                rows.extend(tables_to_fixtures(payload.tables))
+        results = []
+        inserted = timer.write("fixtures", _insert_fixtures, cur, league_id, season_id, payload.league, rows, results)
+        gw = refresh_snapshots(cur, league_id, season_id, results)
+        ft = refresh_features(cur, league_id, season_id)
+        rt = refresh_ratings(cur, league_id)
+        refresh_overview(cur, league_id, season_id)
+        with phase("commit"):
+            conn.commit()
+        invalidate_predictions(results)
+        league_overview.forget(league_id, season_id)
+        log_scrape(cur, league_id, season_id, "sync_fixtures", inserted, 0, timer)
         conn.commit()
-        return {"success": True, "matches_inserted": inserted}
+        return {"success": True, "matches_inserted": inserted, "snapshots_rebuilt": gw, "features_updated": ft, "ratings_applied": rt, "refresh_failed": timer.failed}
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         conn.close()
+        sync_timing.stop(token)
 
 
 @router.post("/stats")
-def sync_stats(payload: SyncPayload):
+def sync_stats(payload: SyncPayload, request: Request):
+    timer, token = sync_timing.start(request.scope.get("received_at"))
     conn = get_connection()
     cur = conn.cursor()
     try:
@@ -444,34 +578,53 @@ def sync_stats(payload: SyncPayload):
         season_id = get_or_create_season(cur, payload.season)
         rows = payload.stats or []
         if payload.tables:
-            rows.extend(tables_to_squad_stats(payload.tables))
-        inserted = _insert_squad_stats(cur, league_id, season_id, rows)
+            with phase("parse"):
+                rows.extend(tables_to_squad_stats(payload.tables))
+        inserted = timer.write("squad_stats", _insert_squad_stats, cur, league_id, season_id, rows)
+        refresh_overview(cur, league_id, season_id)
+        with phase("commit"):
+            conn.commit()
+        league_overview.forget(league_id, season_id)
+        log_scrape(cur, league_id, season_id, "sync_stats", inserted, 0, timer)
         conn.commit()
-        return {"success": True, "stats_inserted": inserted}
+        return {"success": True, "stats_inserted": inserted, "refresh_failed": timer.failed}
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         conn.close()
+        sync_timing.stop(token)
 
 
 @router.post("/player-stats")
-def sync_player_stats(payload: SyncPayload):
+def sync_player_stats(payload: SyncPayload, request: Request):
+    timer, token = sync_timing.start(request.scope.get("received_at"))
     conn = get_connection()
     cur = conn.cursor()
     try:
         season_id = get_or_create_season(cur, payload.season)
         rows = payload.player_stats or payload.playerStats or []
         if payload.tables:
-            rows.extend(tables_to_player_stats(payload.tables))
-        inserted = _insert_player_stats(cur, season_id, payload.league, rows)
+            with phase("parse"):
+                rows.extend(tables_to_player_stats(payload.tables))
+        inserted = timer.write("player_stats", _insert_player_stats, cur, season_id, payload.league, rows)
+        cur.execute("SELECT id FROM leagues WHERE name ILIKE %s LIMIT 1", (f"%{payload.league}%",))
+        lg = cur.fetchone()
+        if lg:
+            refresh_overview(cur, lg["id"], season_id)
+        with phase("commit"):
+            conn.commit()
+        if lg:
+            league_overview.forget(lg["id"], season_id)
+        log_scrape(cur, lg["id"] if lg else None, season_id, "sync_player_stats", inserted, 0, timer)
         conn.commit()
-        return {"success": True, "players_inserted": inserted}
+        return {"success": True, "players_inserted": inserted, "refresh_failed": timer.failed}
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         conn.close()
+        sync_timing.stop(token)
 
 
 def tables_to_standings(tables):
@@ -501,7 +654,9 @@ def tables_to_standings(tables):
     return result
 
 
-def _insert_fixtures(cur, league_id, season_id, league_name, fixtures):
+def _insert_fixtures(cur, league_id, season_id, league_name, fixtures, results):
+    """Upsert fixtures; (home_team_id, away_team_id, gameweek) of every row whose
+    result was added, changed or cleared is appended to `results`."""
     count = 0
     for f in fixtures:
         home = str(f.get("home_team", "")).strip()
@@ -512,32 +667,51 @@ def _insert_fixtures(cur, league_id, season_id, league_name, fixtures):
         away_id = get_or_create_team(cur, away, league_id)
         home_score, away_score = parse_score(f.get("score"))
         match_date = parse_date(f.get("date"))
+        # "old" reads the row as it was before the upsert (same snapshot), so the
+        # extension resending a whole season only reports the results that moved
         cur.execute("""
-            INSERT INTO matches (league_id, season_id, home_team_id, away_team_id,
-                gameweek, dayofweek, match_date, start_time, home_score, away_score, score_raw,
-                attendance, venue, referee, round)
-            VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-            ON CONFLICT (home_team_id, away_team_id, match_date) DO UPDATE SET
-                -- Fix corrupt rows that had league_id/season_id=None from old imports
-                league_id=COALESCE(matches.league_id, EXCLUDED.league_id),
-                season_id=COALESCE(matches.season_id, EXCLUDED.season_id),
-                home_score=EXCLUDED.home_score,
-                away_score=EXCLUDED.away_score,
-                score_raw=EXCLUDED.score_raw,
-                attendance=EXCLUDED.attendance,
-                venue=EXCLUDED.venue,
-                referee=EXCLUDED.referee,
-                is_played=EXCLUDED.home_score IS NOT NULL,
-                updated_at=NOW()
+            WITH old AS (
+                SELECT TRUE AS found, home_score, away_score FROM matches
+                WHERE home_team_id = %s AND away_team_id = %s AND match_date = %s
+            ), upsert AS (
+                INSERT INTO matches (league_id, season_id, home_team_id, away_team_id,
+                    gameweek, dayofweek, match_date, start_time, home_score, away_score, is_played,
+                    score_raw, attendance, venue, referee, round)
+                VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+                ON CONFLICT (home_team_id, away_team_id, match_date) DO UPDATE SET
+                    -- Fix corrupt rows that had league_id/season_id=None from old imports
+                    league_id=COALESCE(matches.league_id, EXCLUDED.league_id),
+                    season_id=COALESCE(matches.season_id, EXCLUDED.season_id),
+                    home_score=EXCLUDED.home_score,
+                    away_score=EXCLUDED.away_score,
+                    score_raw=EXCLUDED.score_raw,
+                    attendance=EXCLUDED.attendance,
+                    venue=EXCLUDED.venue,
+                    referee=EXCLUDED.referee,
+                    is_played=EXCLUDED.is_played,
+                    updated_at=NOW()
+                RETURNING gameweek, home_score, away_score
+            )
+            SELECT u.gameweek,
+                   CASE WHEN o.found THEN u.home_score IS DISTINCT FROM o.home_score
+                                          OR u.away_score IS DISTINCT FROM o.away_score
+                        ELSE u.home_score IS NOT NULL END AS result_changed
+            FROM upsert u LEFT JOIN old o ON TRUE
         """, (
+            home_id, away_id, match_date,
             league_id, season_id, home_id, away_id,
             safe_num(f.get("gameweek")),    safe_num(f.get("dayofweek")),
             match_date,                     safe_text(f.get("start_time", "")) or None,
-            home_score, away_score,         safe_text(f.get("score", "")),
+            home_score, away_score,
+            home_score is not None and away_score is not None,
+            safe_text(f.get("score", "")),
             safe_num(f.get("attendance")),  safe_text(f.get("venue", "")),
             safe_text(f.get("referee", "")), safe_text(f.get("round", ""))
         ))
+        row = cur.fetchone()
         count += 1
+        if row["result_changed"]:
+            results.append((home_id, away_id, row["gameweek"]))
     return count
 
 
@@ -623,8 +797,9 @@ def _insert_player_stats(cur, season_id, league_name, players):
         team_name = str(p.get("team", "")).strip()
         team_id = None
         if team_name:
-            cur.execute("SELECT id FROM leagues WHERE name ILIKE %s LIMIT 1", (f"%{league_name}%",))
-            lg = cur.fetchone()
+            with phase("resolve"):
+                cur.execute("SELECT id FROM leagues WHERE name ILIKE %s LIMIT 1", (f"%{league_name}%",))
+                lg = cur.fetchone()
             if lg:
                 team_id = get_or_create_team(cur, team_name, lg["id"])
         cur.execute("""
@@ -705,11 +880,28 @@ def _update_standings_home_away(cur, league_id, season_id, rows):
               AND  LOWER(t.name) LIKE LOWER(%s)
         """, (split_json, league_id, season_id, f"%{team_name}%"))
 
-def log_scrape(cur, league_id, season_id, page_type, inserted, updated):
+def log_scrape(cur, league_id, season_id, page_type, inserted, updated, timer=None):
+    """Record the sync in scrape_log. Never fails the sync: the INSERT runs in a
+    savepoint, and without db/09 (no timing columns) the untimed row is written."""
+    cur.execute("SAVEPOINT sp_scrape_log")
     try:
+        if timer is not None:
+            duration_ms, phases, tables = timer.summary()
+            try:
+                cur.execute("""
+                    INSERT INTO scrape_log (league_id, season_id, page_type, rows_inserted, rows_updated,
+                                            duration_ms, phases, tables)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                """, (league_id, season_id, page_type, inserted, updated,
+                      duration_ms, json.dumps(phases), json.dumps(tables)))
+                cur.execute("RELEASE SAVEPOINT sp_scrape_log")
+                return
+            except psycopg2.errors.UndefinedColumn:
+                cur.execute("ROLLBACK TO SAVEPOINT sp_scrape_log")
         cur.execute("""
             INSERT INTO scrape_log (league_id, season_id, page_type, rows_inserted, rows_updated)
             VALUES (%s, %s, %s, %s, %s)
         """, (league_id, season_id, page_type, inserted, updated))
+        cur.execute("RELEASE SAVEPOINT sp_scrape_log")
     except Exception:
-        pass
+        cur.execute("ROLLBACK TO SAVEPOINT sp_scrape_log")
@@ -1,20 +1,61 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Response
 from typing import Optional
 from database import get_connection
+from serialization import dumps, rows_response, tuple_cursor
+from streaming import stream_rows
+from team_matrix import team_matrix
 
 router = APIRouter()
 
 @router.get("")
-def list_teams(league_id: Optional[int] = None):
+def list_teams(league_id: Optional[int] = None, accept: Optional[str] = Header(None)):
+    if league_id:
+        return stream_rows("SELECT t.*, l.name AS league FROM teams t JOIN leagues l ON l.id=t.league_id WHERE t.league_id=%s ORDER BY t.name", (league_id,), name="list_teams", accept=accept)
+    return stream_rows("SELECT t.*, l.name AS league FROM teams t JOIN leagues l ON l.id=t.league_id ORDER BY l.name, t.name", name="list_teams", accept=accept)
+
+@router.get("/compare")
+def compare_teams(team_ids: str, season_id: int, stats: Optional[str] = None):
+    """
+    Side-by-side squad profile for a comma-separated list of team ids.
+    Each stat carries its raw value, a 0-1 value normalized across the team's
+    league-season, and its rank there (1 = highest). `stats` restricts the
+    output to the listed stat names, e.g. stats=for.goals,against.goals,home.points
+    """
+    try:
+        ids = list(dict.fromkeys(int(t) for t in team_ids.split(",") if t.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="team_ids must be comma-separated integers")
+    if not ids:
+        raise HTTPException(status_code=400, detail="team_ids must not be empty")
+    wanted = [s.strip() for s in stats.split(",") if s.strip()] if stats else None
+
     conn = get_connection()
     cur = conn.cursor()
-    if league_id:
-        cur.execute("SELECT t.*, l.name AS league FROM teams t JOIN leagues l ON l.id=t.league_id WHERE t.league_id=%s ORDER BY t.name", (league_id,))
-    else:
-        cur.execute("SELECT t.*, l.name AS league FROM teams t JOIN leagues l ON l.id=t.league_id ORDER BY l.name, t.name")
+    cur.execute("SELECT id, name, league_id FROM teams WHERE id = ANY(%s)", (ids,))
     rows = cur.fetchall()
+    leagues = {row["id"]: row["league_id"] for row in rows}
+    names = {row["id"]: row["name"] for row in rows}
+    missing = [t for t in ids if t not in leagues]
+    if missing:
+        conn.close()
+        raise HTTPException(status_code=404, detail=f"Teams not found: {missing}")
+    matrices = {lid: team_matrix(conn, lid, season_id) for lid in set(leagues.values())}
     conn.close()
-    return rows
+
+    if wanted:
+        known = set().union(*(m.stat_index for m in matrices.values()))
+        unknown = [s for s in wanted if s not in known]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown stats: {unknown}")
+    teams = []
+    for tid in ids:
+        matrix = matrices[leagues[tid]]
+        entry = matrix.team(tid, [s for s in wanted if s in matrix.stat_index] if wanted else None)
+        if entry is None:
+            entry = {"team_id": tid, "team": names[tid], "stats": {}}
+        entry["league_id"] = leagues[tid]
+        teams.append(entry)
+    return Response(content=dumps({"season_id": season_id, "teams": teams}), media_type="application/json")
 
 @router.get("/{team_id}")
 def get_team(team_id: int):
@@ -28,9 +69,9 @@ def get_team(team_id: int):
     return row
 
 @router.get("/{team_id}/head-to-head/{opponent_id}")
-def head_to_head(team_id: int, opponent_id: int):
+def head_to_head(team_id: int, opponent_id: int, accept: Optional[str] = Header(None)):
     conn = get_connection()
-    cur = conn.cursor()
+    cur = tuple_cursor(conn)
     cur.execute("""
         SELECT m.match_date, m.gameweek, s.name AS season, l.name AS league,
                ht.name AS home_team, m.home_score, m.away_score, at.name AS away_team,
@@ -45,8 +86,9 @@ def head_to_head(team_id: int, opponent_id: int):
         ORDER BY m.match_date DESC
     """, (team_id, opponent_id, opponent_id, team_id))
     rows = cur.fetchall()
+    response = rows_response(cur, rows, accept)
     conn.close()
-    return rows
+    return response
 
 @router.delete("/{team_id}")
 def delete_team(team_id: int):
@@ -0,0 +1,194 @@
+"""
+Monte Carlo season simulator: plays out a league-season's remaining fixtures
+(no result yet) many times and counts where every team finishes.
+
+Team strengths come from the season's played matches: attack and defence
+multipliers relative to the league's average home/away scoring, shrunk toward
+average while a team has few games. Each simulation draws every remaining
+fixture's goals from Poisson distributions, so a whole shard of simulations is
+a few (simulations x fixtures) NumPy arrays; points and goals are summed per
+team with one matrix product against the fixture/team incidence matrix.
+
+Shards can run on a process pool. Results are cached per league-season until
+its matches change (a result sync touches matches.updated_at).
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import numpy as np
+from serialization import tuple_cursor
+
+DEFAULT_SIMULATIONS = 20000
+MAX_SIMULATIONS = 200000
+SIM_CHUNK = 2000
+SHRINK_GAMES = 5           # pseudo-games of league-average form added to every team
+SIM_WORKERS = int(os.getenv("SIM_WORKERS", os.cpu_count() or 1))
+
+_pool = None
+_pool_lock = threading.Lock()
+_cache = {}  # (league_id, season_id, simulations) -> (fingerprint, result)
+_cache_lock = threading.Lock()
+
+
+def _fingerprint(cur, league_id, season_id):
+    cur.execute("""
+        SELECT COUNT(*), COUNT(*) FILTER (WHERE home_score IS NOT NULL AND away_score IS NOT NULL),
+               MAX(updated_at)
+        FROM matches WHERE league_id = %s AND season_id = %s
+    """, (league_id, season_id))
+    return cur.fetchone()
+
+
+def _load(cur, league_id, season_id):
+    cur.execute("""
+        SELECT m.home_team_id, m.away_team_id, m.home_score, m.away_score,
+               m.home_score IS NOT NULL AND m.away_score IS NOT NULL
+        FROM matches m
+        WHERE m.league_id = %s AND m.season_id = %s
+    """, (league_id, season_id))
+    rows = cur.fetchall()
+    team_ids = sorted({r[0] for r in rows} | {r[1] for r in rows})
+    cur.execute("SELECT id, name FROM teams WHERE id = ANY(%s)", (team_ids,))
+    names = dict(cur.fetchall())
+    index = {t: i for i, t in enumerate(team_ids)}
+    played = [(index[h], index[a], hs, as_) for h, a, hs, as_, done in rows if done]
+    remaining = [(index[h], index[a]) for h, a, _, _, done in rows if not done]
+    return team_ids, [names.get(t) for t in team_ids], played, remaining
+
+
+def _table_and_strengths(n_teams, played):
+    """Current points/goals per team and Poisson rates for home and away sides."""
+    points = np.zeros(n_teams)
+    gf = np.zeros(n_teams)
+    ga = np.zeros(n_teams)
+    home_games = np.zeros(n_teams)
+    away_games = np.zeros(n_teams)
+    home_gf = np.zeros(n_teams)
+    home_ga = np.zeros(n_teams)
+    away_gf = np.zeros(n_teams)
+    away_ga = np.zeros(n_teams)
+    if played:
+        h, a, hs, as_ = (np.array(c) for c in zip(*played))
+        hs = hs.astype(float)
+        as_ = as_.astype(float)
+        np.add.at(points, h, np.where(hs > as_, 3, np.where(hs == as_, 1, 0)))
+        np.add.at(points, a, np.where(as_ > hs, 3, np.where(hs == as_, 1, 0)))
+        np.add.at(gf, h, hs); np.add.at(ga, h, as_)
+        np.add.at(gf, a, as_); np.add.at(ga, a, hs)
+        np.add.at(home_games, h, 1); np.add.at(away_games, a, 1)
+        np.add.at(home_gf, h, hs); np.add.at(home_ga, h, as_)
+        np.add.at(away_gf, a, as_); np.add.at(away_ga, a, hs)
+        avg_home = max(hs.mean(), 0.1)
+        avg_away = max(as_.mean(), 0.1)
+    else:
+        avg_home, avg_away = 1.5, 1.2
+
+    k = SHRINK_GAMES
+    # Multipliers relative to the league average at each venue, shrunk toward 1
+    attack_home = (home_gf + k * avg_home) / ((home_games + k) * avg_home)
+    defence_home = (home_ga + k * avg_away) / ((home_games + k) * avg_away)
+    attack_away = (away_gf + k * avg_away) / ((away_games + k) * avg_away)
+    defence_away = (away_ga + k * avg_home) / ((away_games + k) * avg_home)
+    strengths = (avg_home, avg_away, attack_home, defence_home, attack_away, defence_away)
+    return points, gf, ga, strengths
+
+
+def simulate_shard(n_teams, points, gf, ga, home, away, lam_home, lam_away, simulations, seed):
+    """Finishing-position counts [team, position] over `simulations` seasons."""
+    rng = np.random.default_rng(seed)
+    n_fix = len(home)
+    # Fixture x team incidence matrices
+    H = np.zeros((n_fix, n_teams)); H[np.arange(n_fix), home] = 1
+    A = np.zeros((n_fix, n_teams)); A[np.arange(n_fix), away] = 1
+    positions = np.arange(n_teams)
+    counts = np.zeros(n_teams * n_teams, dtype=np.int64)
+
+    # Bounded chunks keep the (simulations x fixtures) arrays small early in a season
+    for start in range(0, simulations, SIM_CHUNK):
+        size = min(SIM_CHUNK, simulations - start)
+        hg = rng.poisson(lam_home, size=(size, n_fix)).astype(float)
+        ag = rng.poisson(lam_away, size=(size, n_fix)).astype(float)
+        home_pts = np.where(hg > ag, 3.0, np.where(hg == ag, 1.0, 0.0))
+        away_pts = np.where(ag > hg, 3.0, np.where(hg == ag, 1.0, 0.0))
+        sim_points = points + home_pts @ H + away_pts @ A
+        sim_gf = gf + hg @ H + ag @ A
+        sim_ga = ga + ag @ H + hg @ A
+
+        # Order by points, goal difference, goals for, then a random draw
+        key = (sim_points * 1e6 + (sim_gf - sim_ga + 1000) * 1e3 + sim_gf
+               + rng.random((size, n_teams)))
+        order = np.argsort(-key, axis=1)              # order[s, pos] = team
+        counts += np.bincount((order * n_teams + positions).ravel(), minlength=n_teams * n_teams)
+    return counts.reshape(n_teams, n_teams)
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=SIM_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool():
+    """Stop the worker processes (on app shutdown); the next multi-worker run starts a new pool."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _run(team_ids, names, played, remaining, simulations, workers):
+    n = len(team_ids)
+    points, gf, ga, (avg_home, avg_away, att_h, def_h, att_a, def_a) = _table_and_strengths(n, played)
+    home = np.array([h for h, _ in remaining], dtype=np.int64)
+    away = np.array([a for _, a in remaining], dtype=np.int64)
+    lam_home = avg_home * att_h[home] * def_a[away]
+    lam_away = avg_away * att_a[away] * def_h[home]
+
+    args = (n, points, gf, ga, home, away, lam_home, lam_away)
+    seeds = np.random.SeedSequence().spawn(max(1, workers))
+    shards = np.array_split(np.arange(simulations), len(seeds))
+    if workers > 1:
+        pool = _get_pool()
+        futures = [pool.submit(simulate_shard, *args, len(s), seed) for s, seed in zip(shards, seeds) if len(s)]
+        counts = sum(f.result() for f in futures)
+    else:
+        counts = simulate_shard(*args, simulations, seeds[0])
+
+    probs = counts / simulations
+    expected = (probs * np.arange(1, n + 1)).sum(axis=1)
+    teams = []
+    for i in np.argsort(expected):
+        teams.append({
+            "team_id": team_ids[i],
+            "team": names[i],
+            "points": int(points[i]),
+            "expected_position": round(float(expected[i]), 2),
+            "position_probabilities": [round(float(p), 5) for p in probs[i]],
+        })
+    return {"simulations": simulations, "remaining_fixtures": len(remaining), "teams": teams}
+
+
+def simulate_season(conn, league_id, season_id, simulations=DEFAULT_SIMULATIONS, workers=1):
+    """Finishing-position distribution per team; cached until the league-season's matches change."""
+    cur = tuple_cursor(conn)
+    fingerprint = _fingerprint(cur, league_id, season_id)
+    key = (league_id, season_id, simulations)
+    with _cache_lock:
+        entry = _cache.get(key)
+    if entry and entry[0] == fingerprint:
+        return entry[1]
+    team_ids, names, played, remaining = _load(cur, league_id, season_id)
+    if not team_ids:
+        return None
+    result = _run(team_ids, names, played, remaining, simulations, min(workers, SIM_WORKERS))
+    result.update({"league_id": league_id, "season_id": season_id})
+    with _cache_lock:
+        # Drop this league-season's results for other simulation counts; they are stale too
+        for k in [k for k, v in _cache.items() if k[:2] == key[:2] and v[0] != fingerprint]:
+            del _cache[k]
+        _cache[key] = (fingerprint, result)
+    return result
@@ -0,0 +1,206 @@
+"""
+Fast response serialization for read endpoints.
+
+Routes fetch plain tuple rows instead of RealDictCursor dicts, column names
+are resolved once per query from cursor.description, and the result is
+encoded straight to bytes with orjson. JSON/JSONB columns are never decoded
+for JSON output: the cursor hands them back as text and they are spliced
+into the output as-is.
+
+List endpoints also honour the Accept header:
+  application/json                     (default)
+  application/msgpack                  same records as JSON, binary: one map per
+                                       row back to back (decode with an Unpacker /
+                                       decodeMulti), whether streamed or not
+  application/vnd.apache.arrow.stream  columnar, typed from the column OIDs
+Compression is left to the GZip middleware in main.py (size-threshold based).
+"""
+from decimal import Decimal
+import msgpack
+import orjson
+import psycopg2.extensions
+import pyarrow as pa
+from fastapi import Response
+
+JSON_MEDIA = "application/json"
+MSGPACK_MEDIA = "application/msgpack"
+ARROW_MEDIA = "application/vnd.apache.arrow.stream"
+
+_FORMATS = {
+    JSON_MEDIA: "json",
+    MSGPACK_MEDIA: "msgpack",
+    "application/x-msgpack": "msgpack",
+    ARROW_MEDIA: "arrow",
+}
+MEDIA_TYPES = {"json": JSON_MEDIA, "msgpack": MSGPACK_MEDIA, "arrow": ARROW_MEDIA}
+
+_JSON_OIDS = (114, 3802)  # json, jsonb
+_NUMERIC_OID = 1700
+
+# Postgres type OID -> Arrow type; anything else is sent as a string
+_ARROW_TYPES = {
+    16:   pa.bool_(),
+    20:   pa.int64(),
+    21:   pa.int16(),
+    23:   pa.int32(),
+    700:  pa.float32(),
+    701:  pa.float64(),
+    1700: pa.float64(),
+    1082: pa.date32(),
+    1083: pa.time64("us"),
+    1114: pa.timestamp("us"),
+    1184: pa.timestamp("us", tz="UTC"),
+}
+
+# Arrow IPC end-of-stream marker (continuation token + zero length)
+_ARROW_EOS = b"\xff\xff\xff\xff\x00\x00\x00\x00"
+
+# Per-cursor typecaster: leave JSON/JSONB values as the raw text Postgres sent
+_RAW_JSON = psycopg2.extensions.new_type(_JSON_OIDS, "RAW_JSON", lambda value, cur: value)
+
+
+def _default(o):
+    # Match FastAPI's jsonable_encoder for NUMERIC columns
+    if isinstance(o, Decimal):
+        return int(o) if o.as_tuple().exponent >= 0 else float(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _msgpack_default(o):
+    if isinstance(o, Decimal):
+        return _default(o)
+    if hasattr(o, "isoformat"):
+        return o.isoformat()
+    raise TypeError(f"Object of type {type(o).__name__} is not MessagePack serializable")
+
+
+def dumps(obj):
+    return orjson.dumps(obj, default=_default)
+
+
+def negotiate(accept):
+    """Pick 'json', 'msgpack' or 'arrow' from an Accept header (q-values honoured)."""
+    if not isinstance(accept, str) or not accept:
+        return "json"
+    candidates = []
+    for i, part in enumerate(accept.split(",")):
+        media, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for p in params:
+            if p.startswith("q="):
+                try:
+                    q = float(p[2:])
+                except ValueError:
+                    q = 0.0
+        if media.lower() in _FORMATS and q > 0:
+            candidates.append((-q, i, _FORMATS[media.lower()]))
+    return min(candidates)[2] if candidates else "json"
+
+
+def tuple_cursor(conn, name=None):
+    """Plain tuple cursor (optionally server-side) with JSON/JSONB left undecoded."""
+    cur = conn.cursor(name=name, cursor_factory=psycopg2.extensions.cursor) if name \
+        else conn.cursor(cursor_factory=psycopg2.extensions.cursor)
+    psycopg2.extensions.register_type(_RAW_JSON, cur)
+    return cur
+
+
+class RowEncoder:
+    """Column layout of one query, resolved once from cursor.description."""
+
+    def __init__(self, description):
+        self.names = [d[0] for d in description]
+        self.oids = [d[1] for d in description]
+        self.raw_json = [i for i, oid in enumerate(self.oids) if oid in _JSON_OIDS]
+
+    def records(self, rows, decode_json=False):
+        names, raw_json = self.names, self.raw_json
+        if not raw_json:
+            return [dict(zip(names, r)) for r in rows]
+        wrap = orjson.loads if decode_json else orjson.Fragment
+        out = []
+        for r in rows:
+            r = list(r)
+            for i in raw_json:
+                if r[i] is not None:
+                    r[i] = wrap(r[i])
+            out.append(dict(zip(names, r)))
+        return out
+
+    def encode(self, rows):
+        return dumps(self.records(rows))
+
+    def encode_msgpack(self, rows):
+        """One MessagePack map per row; a streamed response is these chunks concatenated."""
+        packer = msgpack.Packer(default=_msgpack_default)
+        return b"".join(packer.pack(r) for r in self.records(rows, decode_json=True))
+
+    def arrow_schema(self):
+        return pa.schema([
+            pa.field(name, _ARROW_TYPES.get(oid, pa.string()))
+            for name, oid in zip(self.names, self.oids)
+        ])
+
+    def record_batch(self, rows, schema):
+        columns = list(zip(*rows)) if rows else [()] * len(self.names)
+        arrays = []
+        for values, oid, field in zip(columns, self.oids, schema):
+            if oid == _NUMERIC_OID:
+                values = [None if v is None else float(v) for v in values]
+            elif oid not in _ARROW_TYPES:
+                values = [v if v is None or isinstance(v, str) else str(v) for v in values]
+            arrays.append(pa.array(values, type=field.type))
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    def encode_arrow(self, rows):
+        schema = self.arrow_schema()
+        return (schema.serialize().to_pybytes()
+                + self.record_batch(rows, schema).serialize().to_pybytes()
+                + _ARROW_EOS)
+
+
+def rows_response(cur, rows, accept=None):
+    """Response for a fetched list of tuple rows from `cur`, in the negotiated format."""
+    fmt = negotiate(accept)
+    encoder = RowEncoder(cur.description)
+    if fmt == "msgpack":
+        body = encoder.encode_msgpack(rows)
+    elif fmt == "arrow":
+        body = encoder.encode_arrow(rows)
+    else:
+        body = encoder.encode(rows)
+    return Response(content=body, media_type=MEDIA_TYPES[fmt], headers={"Vary": "Accept"})
+
+
+def iter_encoded(cur, fmt, chunk_size):
+    """
+    Encode a server-side cursor chunk by chunk. JSON yields one array, Arrow
+    one record batch per chunk, MessagePack one map per row (the same framing
+    as rows_response).
+    """
+    encoder = None
+    schema = None
+    sep = b""
+    if fmt == "json":
+        yield b"["
+    while True:
+        rows = cur.fetchmany(chunk_size)
+        if encoder is None:
+            # A named cursor only has a description after its first fetch
+            encoder = RowEncoder(cur.description)
+            if fmt == "arrow":
+                schema = encoder.arrow_schema()
+                yield schema.serialize().to_pybytes()
+        if not rows:
+            break
+        if fmt == "msgpack":
+            yield encoder.encode_msgpack(rows)
+        elif fmt == "arrow":
+            yield encoder.record_batch(rows, schema).serialize().to_pybytes()
+        else:
+            yield sep + encoder.encode(rows)[1:-1]
+            sep = b","
+    if fmt == "json":
+        yield b"]"
+    elif fmt == "arrow":
+        yield _ARROW_EOS
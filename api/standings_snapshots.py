@@ -0,0 +1,134 @@
+"""
+Per-gameweek standings snapshots ("table as of gameweek N").
+
+Snapshots are cumulative tables stored in standings_snapshots, one row per
+team per gameweek. They are rebuilt incrementally: a sync only replays the
+results from the earliest gameweek it touched, starting from the stored
+table of the gameweek before it.
+"""
+from psycopg2.extras import execute_values
+
+
+# Played matches of a league-season with an effective gameweek: FBref's
+# gameweek when present, otherwise the week number since the season's first match.
+_PLAYED_MATCHES_SQL = """
+    SELECT * FROM (
+        SELECT m.home_team_id, m.away_team_id, m.home_score, m.away_score,
+               COALESCE(m.gameweek, (m.match_date - f.first_date) / 7 + 1) AS gw
+        FROM matches m
+        CROSS JOIN (
+            SELECT MIN(match_date) AS first_date
+            FROM matches WHERE league_id = %s AND season_id = %s
+        ) f
+        WHERE m.league_id = %s AND m.season_id = %s
+          AND m.home_score IS NOT NULL AND m.away_score IS NOT NULL
+    ) played
+    WHERE gw >= %s
+    ORDER BY gw
+"""
+
+_COUNTERS = ("games", "wins", "ties", "losses", "goals_for", "goals_against", "points")
+
+
+def _league_teams(cur, league_id, season_id):
+    """Every team with a fixture in the league-season, so unplayed teams still rank."""
+    cur.execute("""
+        SELECT t.id, t.name FROM teams t
+        WHERE t.id IN (
+            SELECT home_team_id FROM matches WHERE league_id = %s AND season_id = %s
+            UNION
+            SELECT away_team_id FROM matches WHERE league_id = %s AND season_id = %s
+        )
+    """, (league_id, season_id, league_id, season_id))
+    return {r["id"]: r["name"] for r in cur.fetchall()}
+
+
+def _base_table(cur, league_id, season_id, before_gameweek, teams):
+    """Cumulative table as stored for the last gameweek before `before_gameweek`."""
+    table = {tid: dict.fromkeys(_COUNTERS, 0) for tid in teams}
+    cur.execute("""
+        SELECT team_id, games, wins, ties, losses, goals_for, goals_against, points
+        FROM standings_snapshots
+        WHERE league_id = %s AND season_id = %s
+          AND gameweek = (
+              SELECT MAX(gameweek) FROM standings_snapshots
+              WHERE league_id = %s AND season_id = %s AND gameweek < %s
+          )
+    """, (league_id, season_id, league_id, season_id, before_gameweek))
+    for r in cur.fetchall():
+        if r["team_id"] in table:
+            table[r["team_id"]] = {k: r[k] for k in _COUNTERS}
+    return table
+
+
+def _apply_result(table, home_id, away_id, home_score, away_score):
+    home, away = table[home_id], table[away_id]
+    home["games"] += 1
+    away["games"] += 1
+    home["goals_for"] += home_score
+    home["goals_against"] += away_score
+    away["goals_for"] += away_score
+    away["goals_against"] += home_score
+    if home_score > away_score:
+        home["wins"] += 1; home["points"] += 3; away["losses"] += 1
+    elif home_score < away_score:
+        away["wins"] += 1; away["points"] += 3; home["losses"] += 1
+    else:
+        home["ties"] += 1; away["ties"] += 1
+        home["points"] += 1; away["points"] += 1
+
+
+def _ranked(table, teams):
+    """Order by points, goal difference, goals scored, then name."""
+    return sorted(
+        table.items(),
+        key=lambda kv: (
+            -kv[1]["points"],
+            -(kv[1]["goals_for"] - kv[1]["goals_against"]),
+            -kv[1]["goals_for"],
+            teams.get(kv[0], ""),
+        ),
+    )
+
+
+def rebuild_snapshots(cur, league_id, season_id, from_gameweek=1):
+    """
+    Recompute snapshots for every gameweek >= from_gameweek of a league-season.
+    Earlier gameweeks are left untouched and seed the cumulative table.
+    Returns the number of gameweek snapshots written.
+    """
+    from_gameweek = max(int(from_gameweek or 1), 1)
+    teams = _league_teams(cur, league_id, season_id)
+    if not teams:
+        return 0
+    table = _base_table(cur, league_id, season_id, from_gameweek, teams)
+
+    cur.execute(_PLAYED_MATCHES_SQL, (league_id, season_id, league_id, season_id, from_gameweek))
+    matches = cur.fetchall()
+
+    cur.execute("""
+        DELETE FROM standings_snapshots
+        WHERE league_id = %s AND season_id = %s AND gameweek >= %s
+    """, (league_id, season_id, from_gameweek))
+
+    rows = []
+    written = 0
+    i = 0
+    while i < len(matches):
+        gw = matches[i]["gw"]
+        while i < len(matches) and matches[i]["gw"] == gw:
+            m = matches[i]
+            _apply_result(table, m["home_team_id"], m["away_team_id"], m["home_score"], m["away_score"])
+            i += 1
+        for rank, (team_id, c) in enumerate(_ranked(table, teams), start=1):
+            rows.append((league_id, season_id, gw, team_id, rank) + tuple(c[k] for k in _COUNTERS))
+        written += 1
+
+    if rows:
+        execute_values(cur, """
+            INSERT INTO standings_snapshots
+                (league_id, season_id, gameweek, team_id, rank,
+                 games, wins, ties, losses, goals_for, goals_against, points)
+            VALUES %s
+        """, rows, page_size=1000)
+    return written
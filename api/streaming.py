@@ -0,0 +1,88 @@
+"""
+Chunked response streaming from named (server-side) cursors.
+
+For list endpoints whose result size is unbounded: rows are fetched from the
+database CHUNK_ROWS at a time and written to the response as they arrive, so
+peak memory is one chunk and the first bytes go out before the last row is read.
+"""
+import threading
+import psycopg2
+from fastapi.responses import StreamingResponse
+from database import get_connection
+from serialization import MEDIA_TYPES, iter_encoded, negotiate, tuple_cursor
+
+CHUNK_ROWS = 500
+
+
+def server_cursor(conn, name, query, params=(), chunk_size=CHUNK_ROWS):
+    """Open a named cursor and DECLARE the query; rows are only fetched on demand."""
+    cur = conn.cursor(name=name)
+    cur.itersize = chunk_size
+    cur.execute(query, params)
+    return cur
+
+
+class Release:
+    """Close a stream's cursors and hand its connection back, exactly once.
+
+    Called from both the body generator's finally and the response's
+    background task: a generator that is never iterated (the client went away
+    before the body started) never runs its finally.
+    """
+
+    def __init__(self, conn, *cursors):
+        self.conn = conn
+        self.cursors = cursors
+        self._done = False
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            if self._done:
+                return
+            self._done = True
+        for cur in self.cursors:
+            try:
+                cur.close()
+            except psycopg2.Error:
+                pass
+        self.conn.close()
+
+
+def iter_rows(cur, chunk_size=CHUNK_ROWS):
+    while True:
+        rows = cur.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield from rows
+
+
+def _iter_response(conn, cur, fmt, chunk_size):
+    try:
+        yield from iter_encoded(cur, fmt, chunk_size)
+        cur.close()
+    finally:
+        conn.close()
+
+
+def stream_rows(query, params=(), name="stream", accept=None, chunk_size=CHUNK_ROWS):
+    """
+    Run `query` on a server-side cursor and stream its rows in the format
+    negotiated from `accept` (JSON array by default).
+    The cursor is declared before the response starts, so SQL errors still
+    surface as a normal error response rather than a truncated body.
+    """
+    fmt = negotiate(accept)
+    conn = get_connection()
+    try:
+        cur = tuple_cursor(conn, name)
+        cur.itersize = chunk_size
+        cur.execute(query, params)
+    except Exception:
+        conn.close()
+        raise
+    return StreamingResponse(
+        _iter_response(conn, cur, fmt, chunk_size),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Vary": "Accept"},
+    )
@@ -0,0 +1,91 @@
+"""
+Per-phase timing of sync requests, recorded on scrape_log.
+
+A SyncTimer is made current for one sync request (start/stop); code anywhere
+below it (entity resolution in get_or_create_*, the derived-data refreshes in
+derived_data.in_savepoint) wraps its work in phase(name) without the timer
+being passed down. Phases are exclusive: time spent in a nested phase is charged to it and
+not to the enclosing one, so "insert" is the upserts alone, without the team
+lookups done row by row inside the insert loops.
+
+"validate" is the time from the request arriving (stamped on the ASGI scope
+by MetricsMiddleware) to the endpoint starting: reading the body, JSON
+decoding and pydantic validation of the SyncPayload.
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+
+_current = contextvars.ContextVar("sync_timer", default=None)
+
+
+class SyncTimer:
+    def __init__(self, received_at=None):
+        self.started = received_at or time.perf_counter()
+        self.phases = {}   # phase -> seconds
+        self.tables = {}   # table type -> [rows, seconds]
+        self._stack = []   # [phase, started, nested seconds]
+        self.failed = []   # phases whose work failed and was rolled back
+        if received_at:
+            self.phases["validate"] = time.perf_counter() - received_at
+
+    @contextmanager
+    def phase(self, name):
+        frame = [name, time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - frame[1]
+            self.phases[name] = self.phases.get(name, 0.0) + elapsed - frame[2]
+            if self._stack:
+                self._stack[-1][2] += elapsed
+
+    def write(self, table_type, fn, *args):
+        """Run an _insert_* function as an "insert" phase; its return value is the rows written."""
+        started = time.perf_counter()
+        with self.phase("insert"):
+            rows = fn(*args)
+        entry = self.tables.setdefault(table_type, [0, 0.0])
+        entry[0] += rows
+        entry[1] += time.perf_counter() - started
+        return rows
+
+    def summary(self):
+        """(duration ms, {phase: ms}, {table type: {rows, ms, rows_per_sec}}) for scrape_log."""
+        duration = (time.perf_counter() - self.started) * 1000
+        phases = {name: round(s * 1000, 2) for name, s in self.phases.items()}
+        tables = {
+            name: {"rows": rows, "ms": round(s * 1000, 2), "rows_per_sec": round(rows / s, 1) if s > 0 else None}
+            for name, (rows, s) in self.tables.items() if rows
+        }
+        return round(duration, 2), phases, tables
+
+
+def start(received_at=None):
+    """Make a new SyncTimer current for this sync request; returns (timer, token) for stop()."""
+    timer = SyncTimer(received_at)
+    return timer, _current.set(timer)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+@contextmanager
+def phase(name):
+    """Charge the enclosed work to `name` on the current timer; a no-op outside a sync."""
+    timer = _current.get()
+    if timer is None:
+        yield
+        return
+    with timer.phase(name):
+        yield
+
+
+def fail(name):
+    """Note on the current timer that phase `name` failed and was rolled back."""
+    timer = _current.get()
+    if timer is not None:
+        timer.failed.append(name)
@@ -0,0 +1,154 @@
+"""
+Per league-season team x stat matrix for squad comparisons.
+
+Every numeric value from team_squad_stats (scalar columns and the five JSONB
+category blobs, for both the 'for' and 'against' splits) and team_venue_stats
+(home/away) is flattened into one float matrix with a column per stat, e.g.
+"for.goals", "against.shots_on_target", "home.points". Min-max normalized
+values and ranks are precomputed over the whole league-season.
+
+Matrices are cached in memory alongside a fingerprint of the source rows
+(count + latest scrape time), so they are only rebuilt after a sync.
+"""
+import threading
+from collections import OrderedDict
+import numpy as np
+import orjson
+from parsing import safe_num
+from serialization import tuple_cursor
+
+MAX_CACHED_SEASONS = 32
+
+_SQUAD_SCALARS = ("players_used", "avg_age", "possession", "games", "games_starts",
+                  "minutes", "minutes_90s", "goals", "assists")
+_SQUAD_BLOBS = ("standard_stats", "goalkeeping", "shooting", "playing_time", "misc_stats")
+_VENUE_SCALARS = ("games", "wins", "draws", "losses", "goals_for", "goals_against", "goal_diff", "points")
+# Identity keys that appear inside the FBref blobs
+_SKIP_KEYS = {"team", "squad", "players_used", "ranker"}
+
+_cache = OrderedDict()  # (league_id, season_id) -> TeamMatrix
+_cache_lock = threading.Lock()
+
+
+class TeamMatrix:
+    """Raw values, 0-1 normalized values and ranks (1 = highest) for one league-season."""
+
+    def __init__(self, fingerprint, team_ids, team_names, stats, values):
+        self.fingerprint = fingerprint
+        self.team_ids = team_ids
+        self.team_names = team_names
+        self.stats = stats
+        self.stat_index = {s: j for j, s in enumerate(stats)}
+        self.row_index = {tid: i for i, tid in enumerate(team_ids)}
+        self.values = values
+
+        if values.shape[0]:
+            lo, hi = np.nanmin(values, axis=0), np.nanmax(values, axis=0)
+        else:
+            lo = hi = np.full(values.shape[1], np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            span = np.where(hi > lo, hi - lo, np.nan)
+            normalized = (values - lo) / span
+        # A stat where every team is level normalizes to 1.0
+        normalized = np.where(np.isnan(span) & ~np.isnan(values), 1.0, normalized)
+        self.normalized = normalized
+        # rank = 1 + number of teams with a strictly higher value (NaN never counts)
+        self.ranks = 1 + (values[None, :, :] > values[:, None, :]).sum(axis=1)
+        self.counts = np.count_nonzero(~np.isnan(values), axis=0)
+
+    def team(self, team_id, stats=None):
+        i = self.row_index.get(team_id)
+        if i is None:
+            return None
+        cols = [self.stat_index[s] for s in stats] if stats else range(len(self.stats))
+        out = {}
+        for j in cols:
+            v = self.values[i, j]
+            if np.isnan(v):
+                continue
+            out[self.stats[j]] = {
+                "value": float(v),
+                "normalized": float(round(self.normalized[i, j], 4)),
+                "rank": int(self.ranks[i, j]),
+                "of": int(self.counts[j]),
+            }
+        return {"team_id": team_id, "team": self.team_names[i], "stats": out}
+
+
+def _fingerprint(cur, league_id, season_id):
+    cur.execute("""
+        SELECT COUNT(*), MAX(scraped_at) FROM team_squad_stats WHERE league_id = %s AND season_id = %s
+        UNION ALL
+        SELECT COUNT(*), MAX(updated_at) FROM team_venue_stats WHERE league_id = %s AND season_id = %s
+    """, (league_id, season_id, league_id, season_id))
+    return tuple(cur.fetchall())
+
+
+def _load(cur, league_id, season_id, fingerprint):
+    columns = {}  # stat -> {team_id: value}
+    names = {}
+
+    def put(stat, team_id, value):
+        if value is not None:
+            columns.setdefault(stat, {})[team_id] = float(value)
+
+    cur.execute(f"""
+        SELECT ts.team_id, t.name, ts.split, {", ".join("ts." + c for c in _SQUAD_SCALARS)},
+               {", ".join("ts." + b for b in _SQUAD_BLOBS)}
+        FROM team_squad_stats ts
+        JOIN teams t ON t.id = ts.team_id
+        WHERE ts.league_id = %s AND ts.season_id = %s
+    """, (league_id, season_id))
+    for row in cur.fetchall():
+        team_id, name, split = row[:3]
+        names[team_id] = name
+        scalars = row[3:3 + len(_SQUAD_SCALARS)]
+        for col, v in zip(_SQUAD_SCALARS, scalars):
+            put(f"{split}.{col}", team_id, v)
+        for blob in row[3 + len(_SQUAD_SCALARS):]:
+            for key, v in (orjson.loads(blob) if blob else {}).items():
+                stat = f"{split}.{key}"
+                if key in _SKIP_KEYS or team_id in columns.get(stat, ()):
+                    continue
+                if isinstance(v, (str, int, float)) and not isinstance(v, bool):
+                    put(stat, team_id, safe_num(v))
+
+    cur.execute(f"""
+        SELECT tv.team_id, t.name, tv.venue, {", ".join("tv." + c for c in _VENUE_SCALARS)}
+        FROM team_venue_stats tv
+        JOIN teams t ON t.id = tv.team_id
+        WHERE tv.league_id = %s AND tv.season_id = %s
+    """, (league_id, season_id))
+    for row in cur.fetchall():
+        team_id, name, venue = row[:3]
+        names[team_id] = name
+        for col, v in zip(_VENUE_SCALARS, row[3:]):
+            put(f"{venue}.{col}", team_id, v)
+
+    team_ids = sorted(names)
+    stats = sorted(columns)
+    values = np.full((len(team_ids), len(stats)), np.nan)
+    rows = {tid: i for i, tid in enumerate(team_ids)}
+    for j, stat in enumerate(stats):
+        for tid, v in columns[stat].items():
+            values[rows[tid], j] = v
+    return TeamMatrix(fingerprint, team_ids, [names[t] for t in team_ids], stats, values)
+
+
+def team_matrix(conn, league_id, season_id):
+    """Cached TeamMatrix for a league-season, rebuilt only if its source rows changed."""
+    cur = tuple_cursor(conn)
+    fingerprint = _fingerprint(cur, league_id, season_id)
+    key = (league_id, season_id)
+    with _cache_lock:
+        matrix = _cache.get(key)
+        if matrix is not None and matrix.fingerprint == fingerprint:
+            _cache.move_to_end(key)
+            return matrix
+    matrix = _load(cur, league_id, season_id, fingerprint)
+    with _cache_lock:
+        _cache[key] = matrix
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_CACHED_SEASONS:
+            _cache.popitem(last=False)
+    return matrix
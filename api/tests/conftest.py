@@ -0,0 +1,146 @@
+"""
+DB-backed test fixtures.
+
+Tests run against a throwaway database on a local PostgreSQL server, created
+once per session with every db/*.sql applied (the same setup as
+`python -m benchmark`). Point TEST_DATABASE_URL at any database on the
+server, e.g.
+
+    TEST_DATABASE_URL=postgresql://postgres@localhost:5432/postgres python -m pytest tests
+
+Without it the DB-backed tests are skipped.
+"""
+import os
+import sys
+from urllib.parse import urlparse
+import psycopg2.extras
+import pytest
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, API_DIR)
+
+TEST_DATABASE = "football_test"
+
+
+@pytest.fixture(scope="session")
+def test_dsn():
+    admin_dsn = os.getenv("TEST_DATABASE_URL")
+    if not admin_dsn:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    if urlparse(admin_dsn).path.lstrip("/") == TEST_DATABASE:
+        pytest.fail(f"TEST_DATABASE_URL must point at a database other than {TEST_DATABASE}")
+    import benchmark
+    import database
+    dsn, _ = benchmark.create_database(admin_dsn, TEST_DATABASE)
+    # database.py loads api/.env with override=True, so point it at the test database explicitly
+    database.DATABASE_URL = dsn
+    database.DB_SSLMODE = os.getenv("TEST_DB_SSLMODE", "prefer")
+    # Start empty: db/03 seeds the leagues table
+    c = database.get_connection()
+    _truncate(c)
+    c.close()
+    yield dsn
+    database.close_pool()
+    benchmark.drop_database(admin_dsn, TEST_DATABASE)
+
+
+def _reset_caches():
+    import league_overview
+    import percentiles
+    import season_simulator
+    import team_matrix
+    from ml import prediction_cache
+    with league_overview._cache_lock:
+        league_overview._cache.clear()
+    with percentiles._cache_lock:
+        percentiles._cache.clear()
+    with team_matrix._cache_lock:
+        team_matrix._cache.clear()
+    with season_simulator._cache_lock:
+        season_simulator._cache.clear()
+    with prediction_cache._lock:
+        prediction_cache._entries.clear()
+        prediction_cache._by_team.clear()
+
+
+def _truncate(c):
+    c.rollback()
+    cur = c.cursor()
+    cur.execute("SELECT tablename FROM pg_tables WHERE schemaname = 'public'")
+    tables = ", ".join(f'"{r["tablename"]}"' for r in cur.fetchall())
+    cur.execute(f"TRUNCATE {tables} RESTART IDENTITY CASCADE")
+    c.commit()
+
+
+@pytest.fixture
+def conn(test_dsn):
+    """A pooled app connection; every table is emptied after the test."""
+    from database import get_connection
+    c = get_connection()
+    yield c
+    _truncate(c)
+    c.close()
+    _reset_caches()
+
+
+@pytest.fixture
+def fresh(monkeypatch):
+    """Empty request metrics, so a test only sees its own requests."""
+    import metrics
+    monkeypatch.setattr(metrics, "_stats", {})
+    monkeypatch.setattr(metrics, "_slow_statements", {})
+
+
+@pytest.fixture
+def client(conn):
+    from fastapi.testclient import TestClient
+    import main
+    with TestClient(main.app) as c:
+        yield c
+
+
+class League:
+    """Builds a league-season row by row, as a fresh INSERT would leave it (is_played not set)."""
+
+    def __init__(self, cur, name="Test League", season="2025-2026"):
+        self.cur = cur
+        cur.execute("INSERT INTO leagues (name) VALUES (%s) RETURNING id", (name,))
+        self.league_id = cur.fetchone()["id"]
+        cur.execute("""
+            INSERT INTO seasons (name) VALUES (%s)
+            ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name RETURNING id
+        """, (season,))
+        self.season_id = cur.fetchone()["id"]
+        self.teams = {}
+
+    def team(self, name):
+        if name not in self.teams:
+            self.cur.execute("INSERT INTO teams (name, league_id) VALUES (%s, %s) RETURNING id",
+                             (name, self.league_id))
+            self.teams[name] = self.cur.fetchone()["id"]
+        return self.teams[name]
+
+    def match(self, home, away, match_date, home_score=None, away_score=None, gameweek=None):
+        self.cur.execute("""
+            INSERT INTO matches (league_id, season_id, home_team_id, away_team_id,
+                                 gameweek, match_date, home_score, away_score)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s) RETURNING id
+        """, (self.league_id, self.season_id, self.team(home), self.team(away),
+              gameweek, match_date, home_score, away_score))
+        return self.cur.fetchone()["id"]
+
+    def player(self, name, team, position="MF", minutes=900, goals=0, assists=0, **stats):
+        """A player_stats row; keyword arguments become standard_stats keys."""
+        self.cur.execute("""
+            INSERT INTO player_stats (player_name, position, team_id, season_id,
+                                      minutes, minutes_90s, goals, assists, standard_stats)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING id
+        """, (name, position, self.team(team), self.season_id, minutes, round(minutes / 90, 1),
+              goals, assists, psycopg2.extras.Json(stats)))
+        return self.cur.fetchone()["id"]
+
+
+@pytest.fixture
+def league(conn):
+    return League(conn.cursor())
+
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+from ml import backtest
+
+
+def test_folds_are_whole_gameweeks_after_enough_history(monkeypatch):
+    monkeypatch.setattr(backtest, "MIN_TRAIN_MATCHES", 4)
+    weeks = np.array([0, 0, 0, 1, 1, 2, 2, 2, 3, 5])
+    assert backtest._folds(weeks, None) == [(5, 8), (8, 9), (9, 10)]
+    assert backtest._folds(weeks, 2) == [(8, 9), (9, 10)]
+
+
+def test_scores():
+    y = np.array([0, 2])
+    perfect = backtest._scores(y, np.array([[1.0, 0, 0], [0, 0, 1.0]]))
+    assert perfect["accuracy"] == 1.0 and perfect["brier"] == 0.0 and perfect["log_loss"] < 1e-10
+    uniform = backtest._scores(y, np.full((2, 3), 1 / 3))
+    assert uniform["log_loss"] == pytest.approx(np.log(3))
+    assert uniform["brier"] == pytest.approx(2 / 3)
+
+
+def test_walk_forward_run(monkeypatch):
+    monkeypatch.setattr(backtest, "MIN_TRAIN_MATCHES", 240)
+    X, y, weeks = backtest.load_synthetic(300, n_features=4, matches_per_week=20)
+    results, summary = backtest.run(X, y, weeks, n_folds=2, workers=2)
+
+    assert [(r["fold"], r["train_matches"], r["test_matches"]) for r in results] == [(0, 260, 20), (1, 280, 20)]
+    assert summary["folds"] == 2 and summary["test_matches"] == 40
+    # Baseline accuracy is the share of home wins in the tested gameweeks
+    assert summary["baseline"]["accuracy"] == pytest.approx(np.mean(y[260:] == 0), abs=1e-4)
+    for side in ("model", "baseline"):
+        assert 0 <= summary[side]["accuracy"] <= 1 and summary[side]["log_loss"] > 0
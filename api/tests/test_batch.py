@@ -0,0 +1,29 @@
+from datetime import date
+from routes import leagues
+
+
+def _batch(client, *paths):
+    return client.post("/api/batch", json={"requests": [{"path": p} for p in paths]})
+
+
+def test_only_exact_read_routes(client, league):
+    league.match("A", "B", date(2025, 8, 16), 1, 0)
+    league.cur.connection.commit()
+    lid = league.league_id
+    response = _batch(client, "/api/leagues", f"/api/leagues/{lid}", f"/api/leagues/{lid}/overview")
+    assert response.status_code == 200
+    assert [r["status"] for r in response.json()["results"]] == [200, 200, 200]
+
+    for path in (f"/api/leagues/{lid}/simulate", "/api/leagues/abc", "/api/leaguesx", "/api/cleanup/preview"):
+        assert _batch(client, path).status_code == 400, path
+
+
+def test_failed_sub_query_does_not_leak_the_error(client, monkeypatch):
+    def broken():
+        raise RuntimeError("password=hunter2")
+
+    monkeypatch.setattr(leagues, "get_connection", broken)
+    result = _batch(client, "/api/leagues", "/api/health").json()["results"]
+    assert result[0]["status"] == 500
+    assert result[0]["body"] == {"detail": "Internal Server Error"}
+    assert result[1]["status"] == 200
@@ -0,0 +1,80 @@
+import psycopg2
+import pytest
+import database
+
+
+@pytest.fixture
+def pooled(test_dsn):
+    """A connection that has been handed out and returned, so it sits in the pool."""
+    c = database.get_connection()
+    c.close()
+    assert database._idle[-1] is c
+    return c
+
+
+def _terminate(test_dsn, c):
+    other = psycopg2.connect(test_dsn)
+    other.autocommit = True
+    other.cursor().execute("SELECT pg_terminate_backend(%s)", (c.info.backend_pid,))
+    other.close()
+
+
+def test_closed_connection_is_reused(pooled):
+    again = database.get_connection()
+    assert again is pooled
+    again.close()
+
+
+def test_second_close_is_a_no_op(pooled):
+    idle = len(database._idle)
+    pooled.close()
+    assert not pooled.closed
+    assert len(database._idle) == idle
+
+
+def test_aborted_transaction_is_rolled_back_before_reuse(pooled):
+    # Left aborted behind the pool's back
+    cur = psycopg2.extensions.connection.cursor(pooled)
+    with pytest.raises(psycopg2.Error):
+        cur.execute("SELECT 1 / 0")
+    c = database.get_connection()
+    assert c is pooled
+    cur = c.cursor()
+    cur.execute("SELECT 1 AS one")
+    assert cur.fetchone()["one"] == 1
+    c.close()
+
+
+def test_dead_connection_is_replaced(pooled, test_dsn, monkeypatch):
+    monkeypatch.setattr(database, "POOL_PING_AFTER_SECONDS", 0)
+    _terminate(test_dsn, pooled)
+    c = database.get_connection()
+    assert c is not pooled and pooled.closed
+    cur = c.cursor()
+    cur.execute("SELECT 1 AS one")
+    assert cur.fetchone()["one"] == 1
+    c.close()
+
+
+def test_health_asks_the_server(client, pooled, test_dsn, monkeypatch):
+    monkeypatch.setattr(database, "POOL_PING_AFTER_SECONDS", 1e9)
+    assert client.get("/api/health").json()["status"] == "healthy"
+    reused = database._idle[-1]
+    _terminate(test_dsn, reused)
+    assert client.get("/api/health").json()["status"] == "unhealthy"
+    assert reused.closed  # discarded, not pooled again
+    assert client.get("/api/health").json()["status"] == "healthy"
+
+
+def test_close_pool_disconnects_idle_connections(pooled):
+    database.close_pool()
+    assert database._idle == [] and pooled.closed
+
+
+def test_app_shutdown_closes_the_pool(test_dsn):
+    from fastapi.testclient import TestClient
+    import main
+    with TestClient(main.app) as client:
+        assert client.get("/api/health").json()["status"] == "healthy"
+        assert database._idle
+    assert database._idle == []
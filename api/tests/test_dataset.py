@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+from datetime import date, timedelta
+import numpy as np
+import psycopg2.extensions
+from ml import feature_store
+from ml.dataset import extract_dataset, open_dataset
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_training_cli_does_not_import_the_routers():
+    code = "import sys, ml.train; print(sorted(m for m in sys.modules if m.split('.')[0] in ('routes', 'main')))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=API_DIR, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def test_extracted_dataset_matches_feature_matrix(conn, league, tmp_path):
+    day = date(2025, 8, 16)
+    for i, (hs, as_) in enumerate([(2, 0), (1, 1), (0, 3), (2, 2), (None, None)]):
+        home, away = ("A", "B") if i % 2 == 0 else ("B", "A")
+        league.match(home, away, day + timedelta(days=7 * i), hs, as_)
+    feature_store.update_team_features(league.cur, league.league_id, league.season_id)
+    conn.commit()
+
+    meta = extract_dataset(conn, str(tmp_path), league_id=league.league_id, chunk_size=2)
+    assert meta["rows"] == 4 and meta["league_id"] == league.league_id
+    ids, X, y, days, _ = open_dataset(str(tmp_path))
+
+    expected_ids, expected_X, expected_y = feature_store.feature_matrix(conn, league_id=league.league_id, played=True)
+    assert list(ids) == list(expected_ids)
+    assert list(y) == list(expected_y)
+    np.testing.assert_allclose(X, expected_X.astype(np.float32), equal_nan=True)
+
+
+def test_extract_inside_an_open_transaction(conn, league, tmp_path):
+    league.match("A", "B", date(2025, 8, 16), 1, 0)
+    feature_store.update_team_features(league.cur, league.league_id, league.season_id)
+    # Left open by the caller: the isolation level can no longer be SET for it
+    assert conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    assert extract_dataset(conn, str(tmp_path))["rows"] == 1
+    assert conn.isolation_level == psycopg2.extensions.ISOLATION_LEVEL_DEFAULT and conn.readonly is None
+    cur = conn.cursor()
+    cur.execute("INSERT INTO seasons (name) VALUES ('2099-2100')")  # the pooled session is writable again
@@ -0,0 +1,51 @@
+import io
+import json
+from datetime import date
+import pyarrow as pa
+import pyarrow.parquet as pq
+from routes import export
+
+
+def _player(cur, league, name, goals, stats):
+    cur.execute("""
+        INSERT INTO player_stats (player_name, team_id, season_id, goals, minutes_90s, standard_stats)
+        VALUES (%s, %s, %s, %s, 10.5, %s)
+    """, (name, league.team("A"), league.season_id, goals, json.dumps(stats)))
+
+
+def test_matches_stream_in_record_batches(client, conn, league, monkeypatch):
+    monkeypatch.setattr(export, "CHUNK_ROWS", 2)
+    for day in range(1, 6):
+        league.match("A", "B", date(2025, 8, day), day, 0)
+    conn.commit()
+
+    response = client.get("/api/export/matches", params={"league_id": league.league_id})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    reader = pa.ipc.open_stream(response.content)
+    batches = list(reader)
+    assert [b.num_rows for b in batches] == [2, 2, 1]
+    table = pa.Table.from_batches(batches)
+    assert table.schema.field("match_date").type == pa.date32()
+    assert table.column("home_score").to_pylist() == [1, 2, 3, 4, 5]
+
+
+def test_player_stats_blobs_are_flattened_to_parquet(client, conn, league):
+    _player(league.cur, league, "Striker", 9, {"xg": "7.4", "npxg": 6.1, "foot": "left"})
+    _player(league.cur, league, "Keeper", 0, {"xg": None, "foot": "right"})
+    conn.commit()
+
+    response = client.get("/api/export/player_stats", params={"season_id": league.season_id, "format": "parquet"})
+    assert response.status_code == 200
+    assert 'filename="player_stats_all_' in response.headers["content-disposition"]
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.schema.field("standard_stats.xg").type == pa.float64()
+    assert table.schema.field("standard_stats.foot").type == pa.string()
+    rows = {r["player_name"]: r for r in table.to_pylist()}
+    assert rows["Striker"]["standard_stats.xg"] == 7.4 and rows["Striker"]["minutes_90s"] == 10.5
+    assert rows["Keeper"]["standard_stats.npxg"] is None and rows["Keeper"]["standard_stats.foot"] == "right"
+
+
+def test_unknown_dataset_or_format(client):
+    assert client.get("/api/export/nope").status_code == 404
+    assert client.get("/api/export/matches", params={"format": "csv"}).status_code == 400
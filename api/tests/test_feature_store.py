@@ -0,0 +1,89 @@
+import os
+from datetime import date, timedelta
+import pytest
+from ml import feature_store
+
+_COLUMNS = ("form_games", "form_points", "form_goals_for", "form_goals_against",
+            "venue_ppg", "venue_goals_for", "venue_goals_against", "rest_days", "goals_for", "goals_against")
+
+
+def _rows(cur):
+    cur.execute(f"""
+        SELECT team_id, match_id, {", ".join(_COLUMNS)}
+        FROM team_features ORDER BY team_id, match_date, match_id
+    """)
+    return [dict(r) for r in cur.fetchall()]
+
+
+def _features(cur, team_id, match_id):
+    cur.execute("SELECT * FROM team_features WHERE team_id = %s AND match_id = %s", (team_id, match_id))
+    return cur.fetchone()
+
+
+@pytest.fixture
+def season(league):
+    """A v B home and away, twice over, then an unplayed fixture: A's home results 2-0, 1-1."""
+    day = date(2025, 8, 16)
+    results = [("A", "B", 2, 0), ("B", "A", 1, 0), ("A", "B", 1, 1), ("B", "A", 3, 2), ("A", "B", None, None)]
+    ids = []
+    for i, (home, away, hs, as_) in enumerate(results):
+        ids.append(league.match(home, away, day + timedelta(days=7 * i), hs, as_))
+    return ids
+
+
+def test_venue_strength_uses_only_earlier_results(league, season):
+    cur = league.cur
+    assert feature_store.update_team_features(cur, league.league_id, league.season_id) == 10
+    a = league.teams["A"]
+
+    first_home = _features(cur, a, season[0])
+    assert first_home["is_home"] and first_home["venue_ppg"] is None and first_home["form_games"] == 0
+    assert first_home["goals_for"] == 2
+
+    second_home = _features(cur, a, season[2])
+    assert second_home["venue_ppg"] == 3 and second_home["venue_goals_for"] == 2
+    assert second_home["venue_goals_against"] == 0
+    assert second_home["form_games"] == 2 and second_home["rest_days"] == 7
+
+    fixture = _features(cur, a, season[4])
+    assert fixture["venue_ppg"] == 2 and fixture["venue_goals_for"] == 1.5
+    assert fixture["goals_for"] is None
+
+    # Away rows only see away results
+    second_away = _features(cur, a, season[3])
+    assert second_away["venue_ppg"] == 0 and second_away["venue_goals_against"] == 1
+
+
+def test_incremental_replay_matches_full_rebuild(league, season):
+    cur = league.cur
+    feature_store.update_team_features(cur, league.league_id, league.season_id)
+    assert feature_store.update_team_features(cur, league.league_id, league.season_id) == 0
+
+    # A later result changes: only matches from that date on are replayed, seeded from before it
+    cur.execute("UPDATE matches SET home_score = 0, away_score = 4 WHERE id = %s", (season[2],))
+    assert feature_store.update_team_features(cur, league.league_id, league.season_id) == 6
+    incremental = _rows(cur)
+
+    cur.execute("DELETE FROM team_features")
+    feature_store.update_team_features(cur, league.league_id, league.season_id)
+    assert _rows(cur) == incremental
+
+
+def test_venue_migration_matches_replay(league, season):
+    cur = league.cur
+    feature_store.update_team_features(cur, league.league_id, league.season_id)
+    replayed = _rows(cur)
+
+    cur.execute("UPDATE team_features SET venue_ppg = 9, venue_goals_for = 9, venue_goals_against = 9")
+    path = os.path.join(os.path.dirname(__file__), "..", "..", "db", "10_team_features_venue_asof.sql")
+    with open(path) as f:
+        cur.execute(f.read())
+    assert _rows(cur) == replayed
+
+
+def test_feature_matrix_labels(conn, league, season):
+    feature_store.update_team_features(league.cur, league.league_id, league.season_id)
+    ids, X, y = feature_store.feature_matrix(conn, league_id=league.league_id, played=True)
+    assert list(ids) == season[:4]
+    assert X.shape == (4, len(feature_store.FEATURE_NAMES))
+    assert list(y) == [feature_store.HOME_WIN, feature_store.HOME_WIN, feature_store.DRAW, feature_store.HOME_WIN]
@@ -0,0 +1,38 @@
+from conftest import League
+
+
+def _board(client, **params):
+    response = client.get("/api/players/leaderboard", params=params)
+    assert response.status_code == 200, response.text
+    return [(r["player_name"], r["value"]) for r in response.json()]
+
+
+def test_hot_cold_and_column_stats(client, league):
+    league.player("Ada", "A", goals=5, xg=4.0, tackles="12")
+    league.player("Bo", "B", goals=7, xg=6.5, tackles="1,204")  # FBref thousands separator
+    league.player("Cy", "B", goals=1, xg=None, tackles="n/a")
+    league.cur.connection.commit()
+
+    assert _board(client, stat="xg") == [("Bo", 6.5), ("Ada", 4.0)]       # generated column
+    assert _board(client, stat="tackles") == [("Bo", 1204), ("Ada", 12)]  # parsed from JSONB
+    assert _board(client, stat="goals", limit=2) == [("Bo", 7), ("Ada", 5)]
+
+
+def test_per90_skips_cameos_by_default(client, league):
+    league.player("Starter", "A", minutes=1800, xg=10.0)  # 0.5 per 90
+    league.player("Cameo", "A", minutes=90, xg=2.0)       # 2.0 per 90
+    league.cur.connection.commit()
+
+    assert _board(client, stat="xg", per90=True) == [("Starter", 0.5)]
+    assert _board(client, stat="xg", per90=True, min_minutes=1) == [("Cameo", 2.0), ("Starter", 0.5)]
+
+
+def test_filters_by_league_and_position(client, conn, league):
+    other = League(conn.cursor(), name="Other League")
+    league.player("Ada", "A", position="FW", shots=30)
+    league.player("Bo", "A", position="DF,MF", shots=10)
+    other.player("Cy", "Z", position="FW", shots=50)
+    conn.commit()
+
+    assert _board(client, stat="shots", league_id=league.league_id) == [("Ada", 30), ("Bo", 10)]
+    assert _board(client, stat="shots", position="FW") == [("Cy", 50), ("Ada", 30)]
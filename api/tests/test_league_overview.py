@@ -0,0 +1,63 @@
+import json
+from datetime import date, timedelta
+import league_overview
+
+
+def test_overview_splits_results_from_fixtures(conn, league):
+    today = date.today()
+    league.match("A", "B", today - timedelta(days=7), 2, 1)
+    league.match("B", "A", today + timedelta(days=7))
+
+    document = json.loads(league_overview.read_overview(conn, league.league_id, league.season_id))
+    assert [(m["home_team"], m["home_score"]) for m in document["recent_results"]] == [("A", 2)]
+    assert [(m["home_team"], m["home_score"]) for m in document["upcoming_fixtures"]] == [("B", None)]
+
+
+def test_upcoming_fixtures_are_not_frozen_into_the_stored_document(conn, league):
+    fixture = league.match("B", "A", date.today() + timedelta(days=1))
+    stored = league_overview.build_overview(league.cur, league.league_id, league.season_id)
+    assert "upcoming_fixtures" not in json.loads(stored)
+
+    # The day passes without a sync: the stored document is not rebuilt
+    league.cur.execute("UPDATE matches SET match_date = match_date - 2 WHERE id = %s", (fixture,))
+    document = json.loads(league_overview.read_overview(conn, league.league_id, league.season_id))
+    assert document["upcoming_fixtures"] == []
+
+
+def test_get_never_builds(client, conn, league):
+    league.match("A", "B", date.today() - timedelta(days=1), 1, 0)
+    conn.commit()
+    # No season_id and nothing stored: the current season is served, read-only
+    response = client.get(f"/api/leagues/{league.league_id}/overview")
+    assert response.status_code == 200
+    assert response.json()["season_id"] == league.season_id
+    assert len(response.json()["recent_results"]) == 1
+    cur = conn.cursor()
+    cur.execute("SELECT COUNT(*) AS n FROM league_overviews")
+    assert cur.fetchone()["n"] == 0
+    assert client.get("/api/leagues/999999/overview").status_code == 404
+
+
+def test_rolled_back_build_is_not_cached(conn, league):
+    conn.commit()
+    league_overview.build_overview(league.cur, league.league_id, league.season_id)
+    assert league_overview.cached(league.league_id, league.season_id) is None
+    conn.rollback()
+
+    cur = conn.cursor()
+    cur.execute("SELECT COUNT(*) AS n FROM league_overviews")
+    assert cur.fetchone()["n"] == 0
+
+
+def test_committed_rebuild_replaces_cached_copy(client, conn, league):
+    conn.commit()
+    path = f"/api/leagues/{league.league_id}/overview"
+    assert client.get(path, params={"season_id": league.season_id}).json()["recent_results"] == []
+
+    league.match("A", "B", date.today() - timedelta(days=1), 1, 0)
+    league_overview.build_overview(league.cur, league.league_id, league.season_id)
+    conn.commit()
+    # Readers keep the old copy until the writer forgets it after its commit
+    assert client.get(path, params={"season_id": league.season_id}).json()["recent_results"] == []
+    league_overview.forget(league.league_id, league.season_id)
+    assert len(client.get(path, params={"season_id": league.season_id}).json()["recent_results"]) == 1
@@ -0,0 +1,41 @@
+import re
+import metrics
+
+
+def _samples(text, name):
+    """{labels: value} of one metric's samples."""
+    return {m.group(1): float(m.group(2)) for m in re.finditer(rf"^{name}(\{{.*\}}) (\S+)$", text, re.M)}
+
+
+def test_exposition_format(client, fresh):
+    for _ in range(3):
+        assert client.get("/api/health").status_code == 200
+    client.get("/api/nowhere")
+    text = client.get("/api/metrics").text
+
+    for line in text.splitlines():
+        assert line.startswith("# ") or re.fullmatch(r'[a-z_]+\{([a-z]+="[^"]*",?)+\} [0-9.e+-]+', line), line
+    requests = _samples(text, "http_requests_total")
+    assert requests['{method="GET",route="/api/health",status="200"}'] == 3
+    assert requests['{method="GET",route="unmatched",status="404"}'] == 1
+
+    buckets = [v for k, v in _samples(text, "http_request_duration_seconds_bucket").items() if "/api/health" in k]
+    assert buckets == sorted(buckets) and buckets[-1] == 3  # cumulative, +Inf last
+    assert _samples(text, "http_request_duration_seconds_count")['{method="GET",route="/api/health"}'] == 3
+
+
+def test_label_values_are_escaped(fresh):
+    metrics._stats[("GET", 'a"b\\c\nd')] = metrics._RouteStats()
+    text = metrics.render()
+    assert 'route="a\\"b\\\\c\\nd"' in text
+    # The newline did not split a sample across lines
+    assert all(re.match(r"[a-z_]+\{", line) for line in text.splitlines() if not line.startswith("#"))
+
+
+def test_render_reads_a_snapshot(fresh):
+    metrics._stats[("GET", "/x")] = stats = metrics._RouteStats()
+    stats.count = 1
+    with metrics._lock:
+        copy = stats.copy()
+        stats.buckets[0] += 1
+    assert copy.buckets[0] == 0 and copy.count == 1
@@ -0,0 +1,32 @@
+import numpy as np
+from ml.ml_models import EnsembleModel
+from ml.predictor import outcome_probabilities
+
+
+def _data(labels, n=120, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.choice(labels, size=n)
+    X = rng.normal(size=(n, 4)) + y[:, None]
+    return X, y
+
+
+def test_ensemble_trains_without_a_class():
+    X, y = _data([0, 2])  # no draws: XGBoost alone rejects labels {0, 2}
+    model = EnsembleModel(n_jobs=2, member_n_jobs=1, rf_params={"n_estimators": 10},
+                          xgb_params={"n_estimators": 10})
+    model.train(X, y)
+    assert list(model.classes_) == [0, 1, 2]
+    proba = model.predict_proba(X[:5])
+    assert proba.shape == (5, 3)
+    assert np.allclose(proba[:, 1], 0) and np.allclose(proba.sum(axis=1), 1)
+    assert set(model.predict(X)) <= {0, 2}
+    np.testing.assert_allclose(outcome_probabilities(model, X[:5]), proba)
+
+
+def test_ensemble_averages_members_per_class():
+    X, y = _data([0, 1, 2])
+    model = EnsembleModel(n_jobs=1, member_n_jobs=1, weights=[1, 0], rf_params={"n_estimators": 10},
+                          xgb_params={"n_estimators": 10})
+    model.train(X, y)
+    # All the weight on the forest: its own probabilities come back
+    np.testing.assert_allclose(model.predict_proba(X[:5]), model.models[0].predict_proba(X[:5]))
@@ -0,0 +1,53 @@
+import numpy as np
+import percentiles
+from percentiles import percentile_ranks, position_group
+
+
+def test_ranks_share_ties_and_skip_nan():
+    X = np.array([[1.0, np.nan], [2.0, 5.0], [2.0, 3.0], [4.0, np.nan]])
+    pct = percentile_ranks(X)
+    np.testing.assert_allclose(pct[:, 0], [25, 75, 75, 100])
+    np.testing.assert_allclose(pct[:, 1], [np.nan, 100, 50, np.nan])
+
+
+def test_position_group():
+    assert position_group("fw,MF") == "FW"
+    assert position_group(None) == position_group("") == "NA"
+
+
+def _percentiles(client, league, **params):
+    response = client.get("/api/players/percentiles",
+                          params={"league_id": league.league_id, "season_id": league.season_id, **params})
+    return response
+
+
+def test_counting_stats_are_ranked_per_90_within_position(client, league):
+    # 900 minutes = 10 90s; 1800 = 20
+    striker = league.player("Ada", "A", position="FW", minutes=900, shots=20, pass_pct=70.0)    # 2.0 per 90
+    league.player("Bo", "A", position="FW", minutes=1800, shots=30, pass_pct=80.0)             # 1.5 per 90
+    league.player("Cy", "B", position="FW,MF", minutes=180, shots=50, pass_pct=90.0)           # too few 90s
+    defender = league.player("Di", "B", position="DF", minutes=900, shots=1, pass_pct=85.0)
+    league.cur.connection.commit()
+
+    ada = _percentiles(client, league, player_id=striker).json()
+    assert ada["position_group"] == "FW" and ada["pool_size"] == 2
+    assert ada["stats"]["shots"] == {"value": 20.0, "per90": True, "normalized": 2.0, "percentile": 100.0}
+    assert ada["stats"]["pass_pct"]["per90"] is False and ada["stats"]["pass_pct"]["percentile"] == 50.0
+    # Alone in its group
+    assert _percentiles(client, league, player_id=defender).json()["stats"]["shots"]["percentile"] == 100.0
+
+    board = _percentiles(client, league, position="FW").json()
+    assert [p["player_name"] for p in board["players"]] == ["Ada", "Bo"]
+    assert _percentiles(client, league, player_id=999).status_code == 404
+
+
+def test_recomputed_only_when_the_season_changes(conn, league):
+    league.player("Ada", "A", shots=20)
+    conn.commit()
+    first = percentiles.season_percentiles(conn, league.league_id, league.season_id)
+    assert percentiles.season_percentiles(conn, league.league_id, league.season_id) is first
+
+    league.player("Bo", "A", shots=10)
+    conn.commit()
+    second = percentiles.season_percentiles(conn, league.league_id, league.season_id)
+    assert second is not first and len(second.players()) == 2
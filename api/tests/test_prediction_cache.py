@@ -0,0 +1,97 @@
+import psycopg2
+import pytest
+from ml import prediction_cache
+
+VERSION = "0001"
+
+
+def _fixtures(scores):
+    """A v B and C v D on consecutive weekends with the given scores ("" = unplayed)."""
+    return [
+        {"home_team": "A", "away_team": "B", "date": "2025-08-16", "gameweek": "1", "score": scores[0]},
+        {"home_team": "C", "away_team": "D", "date": "2025-08-16", "gameweek": "1", "score": scores[1]},
+        {"home_team": "A", "away_team": "C", "date": "2025-08-23", "gameweek": "2", "score": ""},
+        {"home_team": "B", "away_team": "D", "date": "2025-08-23", "gameweek": "2", "score": ""},
+    ]
+
+
+def _sync(client, scores):
+    response = client.post("/api/sync/fixtures",
+                           json={"league": "Cache League", "season": "2025-2026", "fixtures": _fixtures(scores)})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _cache_upcoming(conn):
+    """Cache a prediction for each unplayed fixture; returns {(home, away): match_id}."""
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT m.id, m.home_team_id, m.away_team_id, ht.name AS home, at.name AS away
+        FROM matches m JOIN teams ht ON ht.id = m.home_team_id JOIN teams at ON at.id = m.away_team_id
+        WHERE m.home_score IS NULL
+    """)
+    rows = cur.fetchall()
+    conn.rollback()
+    prediction_cache.store(VERSION, {r["id"]: (r["home_team_id"], r["away_team_id"], (0.4, 0.3, 0.3)) for r in rows})
+    return {(r["home"], r["away"]): r["id"] for r in rows}
+
+
+def _cached(match_ids):
+    found, _ = prediction_cache.lookup(match_ids, VERSION)
+    return set(found)
+
+
+def test_resync_only_invalidates_changed_results(client, conn):
+    _sync(client, ["1–0", ""])
+    upcoming = _cache_upcoming(conn)
+    ids = list(upcoming.values())
+
+    # The extension resends the whole season: nothing changed, nothing dropped
+    _sync(client, ["1–0", ""])
+    assert _cached(ids) == set(ids)
+
+    # A corrected A v B score drops the fixtures involving A or B only
+    _sync(client, ["2–0", ""])
+    assert _cached(ids) == {upcoming[("C", "D")]}
+
+
+def test_invalidation_scoped_to_teams_with_new_results(client, conn):
+    _sync(client, ["", ""])
+    upcoming = _cache_upcoming(conn)
+    a_b, c_d = upcoming[("A", "B")], upcoming[("C", "D")]
+
+    _sync(client, ["", "0–0"])
+    assert _cached([a_b, c_d]) == {a_b}
+
+
+@pytest.fixture
+def committed_at_invalidation(monkeypatch, test_dsn):
+    """Records, for each invalidation, the scores another connection sees at that moment."""
+    seen = []
+    invalidate = prediction_cache.invalidate_teams
+
+    def spy(team_ids):
+        other = psycopg2.connect(test_dsn)
+        cur = other.cursor()
+        cur.execute("SELECT COUNT(*) FROM matches WHERE home_score IS NOT NULL")
+        seen.append(cur.fetchone()[0])
+        other.close()
+        return invalidate(team_ids)
+
+    monkeypatch.setattr(prediction_cache, "invalidate_teams", spy)
+    return seen
+
+
+def test_sync_invalidates_after_commit(client, conn, committed_at_invalidation):
+    _sync(client, ["", ""])
+    _sync(client, ["3–1", "0–2"])
+    assert committed_at_invalidation[-1] == 2
+
+
+def test_result_edit_invalidates_after_commit(client, conn, committed_at_invalidation):
+    _sync(client, ["", ""])
+    upcoming = _cache_upcoming(conn)
+    response = client.put(f"/api/matches/{upcoming[('A', 'B')]}", params={"home_score": 1, "away_score": 1})
+    assert response.status_code == 200, response.text
+    assert committed_at_invalidation[-1] == 1
+    assert _cached([upcoming[("A", "B")], upcoming[("C", "D")]]) == {upcoming[("C", "D")]}
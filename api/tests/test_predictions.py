@@ -0,0 +1,71 @@
+from datetime import date, timedelta
+import numpy as np
+import pytest
+from ml import feature_store, predictor, registry
+
+
+class ConstantModel:
+    """Stands in for a trained classifier: every fixture gets the same probabilities."""
+    classes_ = np.array([feature_store.HOME_WIN, feature_store.DRAW, feature_store.AWAY_WIN])
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        return np.tile([0.5, 0.3, 0.2], (X.shape[0], 1))
+
+
+@pytest.fixture
+def model(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(predictor, "_active", None)
+    registry.save(ConstantModel(), {"features": []})
+    return tmp_path
+
+
+def _upcoming(client, **params):
+    response = client.get("/api/predictions/upcoming", params=params)
+    assert response.status_code == 200, response.text
+    return [(f["home_team"], f["away_team"]) for f in response.json()]
+
+
+def test_only_unplayed_fixtures_from_today_on(client, conn, league, model):
+    today = date.today()
+    league.match("A", "B", today - timedelta(days=7), 1, 0)
+    league.match("A", "C", today - timedelta(days=1))          # postponed, never played
+    league.match("B", "C", today)
+    league.match("C", "A", today + timedelta(days=3))
+    league.match("B", "A", today + timedelta(days=30))
+    played_today = league.match("C", "B", today, 2, 2)
+    league.cur.execute("UPDATE matches SET is_played = (home_score IS NOT NULL)")
+    feature_store.update_team_features(league.cur, league.league_id, league.season_id)
+    conn.commit()
+
+    assert _upcoming(client) == [("B", "C"), ("C", "A"), ("B", "A")]
+    assert _upcoming(client, days=7) == [("B", "C"), ("C", "A")]
+    assert _upcoming(client, limit=1) == [("B", "C")]
+    assert _upcoming(client, league_id=league.league_id + 1) == []
+    assert client.get(f"/api/predictions/match/{played_today}").json()["is_played"] is True
+
+
+def test_fixtures_are_scored_in_one_batch(client, conn, league, model):
+    today = date.today()
+    for i, (home, away) in enumerate([("A", "B"), ("C", "D"), ("A", "C")]):
+        league.match(home, away, today + timedelta(days=i + 1))
+    feature_store.update_team_features(league.cur, league.league_id, league.season_id)
+    conn.commit()
+
+    response = client.get("/api/predictions/upcoming").json()
+    assert predictor.loaded_model().model.calls == 1
+    assert {f["model_version"] for f in response} == {"0001"}
+    assert response[0]["probabilities"] == {"home_win": 0.5, "draw": 0.3, "away_win": 0.2}
+    assert response[0]["prediction"] == "home_win"
+
+
+def test_no_model_is_a_503(client, league, tmp_path, monkeypatch):
+    monkeypatch.setattr(registry, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(predictor, "_active", None)
+    league.match("A", "B", date.today() + timedelta(days=1))
+    league.cur.connection.commit()
+    assert client.get("/api/predictions/upcoming").status_code == 503
@@ -0,0 +1,51 @@
+import pytest
+from fastapi import HTTPException
+from projection import MAX_KEYS_PER_BLOB, select_fields
+
+
+def _players(client, **params):
+    response = client.get("/api/players", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_only_requested_columns_and_keys_are_returned(client, league):
+    league.player("Ada", "A", goals=3, xg=2.4, npxg=1.9, shots=11)
+    league.cur.connection.commit()
+    [row] = _players(client, fields="player_name,team,goals,standard_stats.xg,standard_stats.npxg")
+    assert row == {"player_name": "Ada", "team": "A", "goals": 3,
+                   "standard_stats": {"xg": 2.4, "npxg": 1.9}}
+
+
+def test_whole_blob_wins_over_its_keys(client, league):
+    league.player("Ada", "A", xg=2.4, shots=11)
+    league.cur.connection.commit()
+    [row] = _players(client, fields="standard_stats.xg,standard_stats")
+    assert row == {"standard_stats": {"xg": 2.4, "shots": 11}}
+
+
+def test_squad_stats_projection_is_streamed(client, league):
+    league.cur.execute("""
+        INSERT INTO team_squad_stats (team_id, league_id, season_id, split, possession, shooting, goalkeeping)
+        VALUES (%s, %s, %s, 'for', 55.5, '{"sot_pct": 41.2, "shots": 300}', '{"gk_save_pct": 70.1}')
+    """, (league.team("A"), league.league_id, league.season_id))
+    league.cur.connection.commit()
+    response = client.get("/api/squad-stats", params={"fields": "team,possession,shooting.sot_pct,goalkeeping"})
+    assert response.status_code == 200, response.text
+    assert response.json() == [{"team": "A", "possession": 55.5, "shooting": {"sot_pct": 41.2},
+                                "goalkeeping": {"gk_save_pct": 70.1}}]
+
+
+@pytest.mark.parametrize("fields", ["password", "team; DROP TABLE teams", " , "])
+def test_bad_fields_are_rejected(fields):
+    with pytest.raises(HTTPException) as e:
+        select_fields(fields, {"team": "t.name"}, {"standard_stats": "ps.standard_stats"})
+    assert e.value.status_code == 400
+
+
+def test_key_paths_are_parameters():
+    keys = ",".join(f"standard_stats.k{i}" for i in range(MAX_KEYS_PER_BLOB))
+    select, params = select_fields(keys, {}, {"standard_stats": "ps.standard_stats"})
+    assert "k0" not in select and params[:2] == ["k0", ["k0"]]
+    with pytest.raises(HTTPException):
+        select_fields(keys + ",standard_stats.one_more", {}, {"standard_stats": "ps.standard_stats"})
@@ -0,0 +1,62 @@
+import logging
+import re
+import psycopg2.extras
+import database
+import metrics
+from database import statement_text, stop_tracking, track_queries
+
+
+def test_cursor_records_into_the_current_request(conn, league):
+    for name in ("A", "B", "C"):
+        league.team(name)
+    cur = conn.cursor()
+    cur.execute("SELECT 1")  # not tracked
+
+    stats, token = track_queries()
+    try:
+        cur.execute("SELECT id FROM teams")
+        cur.execute("SELECT id FROM teams")
+        cur.executemany("SELECT %s", [(1,), (2,), (3,)])
+    finally:
+        stop_tracking(token)
+    cur.execute("SELECT 1")
+
+    assert (stats.queries, stats.rows) == (5, 6)
+    assert stats.most_repeated() == ("SELECT %s", 3)
+    assert {s for s, *_ in stats.slowest()} == {"SELECT id FROM teams", "SELECT %s"}
+
+
+def test_execute_values_pages_are_shortened(conn):
+    cur = conn.cursor()
+    stats, token = track_queries()
+    try:
+        psycopg2.extras.execute_values(cur, "INSERT INTO seasons (name) VALUES %s", [("2030-2031",), ("2031-2032",)])
+    finally:
+        stop_tracking(token)
+    [(statement, executions, _, _)] = stats.slowest()
+    assert statement == "INSERT INTO seasons (name) VALUES ..." and executions == 1
+    assert statement_text("SELECT\n   1") == "SELECT 1"
+
+
+def test_server_timing_matches_the_query_count(client, fresh, league):
+    league.team("A")
+    league.cur.connection.commit()
+    response = client.get(f"/api/teams/{league.team('A')}")
+    timing = re.fullmatch(r'db;dur=([0-9.]+);desc="(\d+) queries"', response.headers["server-timing"])
+    assert timing, response.headers["server-timing"]
+    [stats] = metrics._stats.values()
+    assert int(timing.group(2)) == stats.db_queries >= 1
+    assert "server-timing" not in client.get("/api/nowhere").headers
+
+
+def test_n_plus_one_warning_and_slow_statements(client, fresh, caplog, monkeypatch):
+    monkeypatch.setattr(database, "QUERY_WARN_THRESHOLD", 0)
+    with caplog.at_level(logging.WARNING, logger="metrics"):
+        client.get("/api/leagues")
+    [record] = [r for r in caplog.records if r.name == "metrics"]
+    assert record.getMessage().startswith("GET /api/leagues ran 1 queries")
+
+    report = client.get("/api/metrics/queries").json()
+    assert report["threshold"] == 0
+    [entry] = [s for s in report["statements"] if s["route"] == "GET /api/leagues"]
+    assert entry["statement"].startswith("SELECT") and entry["executions"] == 1
@@ -0,0 +1,84 @@
+from datetime import date
+import ratings
+
+
+def _latest(cur, league_id):
+    cur.execute("""
+        SELECT DISTINCT ON (team_id) team_id, elo, match_id
+        FROM team_ratings WHERE league_id = %s
+        ORDER BY team_id, match_date DESC, match_id DESC
+    """, (league_id,))
+    return {r["team_id"]: r for r in cur.fetchall()}
+
+
+def test_fresh_results_are_rated(league):
+    cur = league.cur
+    league.match("A", "B", date(2025, 8, 16), 3, 0)
+    league.match("B", "A", date(2025, 8, 23), 1, 1)
+    league.match("A", "B", date(2025, 8, 30))  # fixture without a result
+
+    assert ratings.update_ratings(cur, league.league_id) == 2
+    latest = _latest(cur, league.league_id)
+    a, b = league.teams["A"], league.teams["B"]
+    assert latest[a]["elo"] > ratings.ELO_START > latest[b]["elo"]
+    assert latest[a]["elo"] + latest[b]["elo"] == ratings.ELO_START * 2
+
+    cur.execute("SELECT COUNT(*) AS n FROM team_ratings")
+    assert cur.fetchone()["n"] == 4
+
+
+def test_only_changed_results_are_replayed(league):
+    cur = league.cur
+    league.match("A", "B", date(2025, 8, 16), 2, 0)
+    second = league.match("B", "A", date(2025, 8, 23), 0, 0)
+    assert ratings.update_ratings(cur, league.league_id) == 2
+    assert ratings.update_ratings(cur, league.league_id) == 0
+
+    # A manual result edit re-applies that date onwards only
+    cur.execute("UPDATE matches SET home_score = 4, away_score = 0 WHERE id = %s", (second,))
+    assert ratings.update_ratings(cur, league.league_id) == 1
+    latest = _latest(cur, league.league_id)
+    assert latest[league.teams["B"]]["elo"] > ratings.ELO_START
+
+    # A result added to a fixture is picked up on the next update
+    league.match("A", "B", date(2025, 8, 30), 1, 0)
+    assert ratings.update_ratings(cur, league.league_id) == 1
+
+
+def test_cleared_result_is_unrated(league):
+    cur = league.cur
+    league.match("A", "B", date(2025, 8, 16), 2, 0)
+    second = league.match("B", "A", date(2025, 8, 23), 0, 1)
+    ratings.update_ratings(cur, league.league_id)
+
+    cur.execute("UPDATE matches SET home_score = NULL, away_score = NULL WHERE id = %s", (second,))
+    assert ratings.update_ratings(cur, league.league_id) == 0
+    cur.execute("SELECT COUNT(*) AS n FROM team_ratings WHERE match_id = %s", (second,))
+    assert cur.fetchone()["n"] == 0
+    assert ratings.update_ratings(cur, league.league_id) == 0
+
+
+def test_drift_on_the_away_row_is_replayed(league):
+    cur = league.cur
+    first = league.match("A", "B", date(2025, 8, 16), 2, 0)
+    ratings.update_ratings(cur, league.league_id)
+    cur.execute("UPDATE team_ratings SET goals_for = 5 WHERE match_id = %s AND team_id = %s",
+                (first, league.teams["B"]))
+    assert ratings.update_ratings(cur, league.league_id) == 1
+    cur.execute("SELECT goals_for FROM team_ratings WHERE match_id = %s AND team_id = %s",
+                (first, league.teams["B"]))
+    assert cur.fetchone()["goals_for"] == 0
+
+
+def test_explicit_replay_after_a_deleted_match(league):
+    cur = league.cur
+    first = league.match("A", "B", date(2025, 8, 16), 3, 0)
+    league.match("B", "A", date(2025, 8, 23), 1, 1)
+    ratings.update_ratings(cur, league.league_id)
+    cur.execute("DELETE FROM matches WHERE id = %s", (first,))  # its rows go with it
+    assert ratings.update_ratings(cur, league.league_id) == 0
+    assert ratings.update_ratings(cur, league.league_id, since=date(2025, 8, 16)) == 1
+    replayed = _latest(cur, league.league_id)
+    cur.execute("DELETE FROM team_ratings")
+    ratings.update_ratings(cur, league.league_id)
+    assert replayed == _latest(cur, league.league_id)  # as if the match never existed
@@ -0,0 +1,42 @@
+import os
+import pytest
+from ml import predictor, registry
+from test_predictions import ConstantModel
+
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(registry, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(predictor, "_active", None)
+    return tmp_path
+
+
+def test_versions_are_published_in_order(model_dir):
+    assert registry.load() is None and registry.latest_version() is None
+    assert registry.save(ConstantModel(), {"metrics": {"log_loss": 1.0}}) == "0001"
+    assert registry.save(ConstantModel(), {"metrics": {"log_loss": 0.9}}) == "0002"
+    os.makedirs(model_dir / registry.DEFAULT_NAME / ".staging-abandoned")
+
+    assert registry.list_versions() == ["0001", "0002"]
+    model, metadata = registry.load()
+    assert isinstance(model, ConstantModel)
+    assert metadata["version"] == "0002" and metadata["metrics"] == {"log_loss": 0.9}
+    assert metadata["model_class"] == "ConstantModel"
+    assert registry.load("0001")[1]["metrics"] == {"log_loss": 1.0}
+
+
+def test_model_is_loaded_on_first_use_and_hot_swapped(client, model_dir):
+    registry.save(ConstantModel(), {})
+    assert client.get("/api/predictions/model").json() == {"versions": ["0001"], "active": None}
+
+    first = predictor.active_model()
+    assert predictor.active_model() is first and first.version == "0001"
+
+    registry.save(ConstantModel(), {})
+    assert predictor.active_model() is first  # a new artifact is not picked up on its own
+    response = client.post("/api/predictions/model/activate")
+    assert response.json()["activated"] == "0002"
+    assert predictor.active_model().version == "0002"
+
+    assert client.post("/api/predictions/model/activate", params={"version": "0001"}).json()["activated"] == "0001"
+    assert client.post("/api/predictions/model/activate", params={"version": "0042"}).status_code == 404
@@ -0,0 +1,50 @@
+from datetime import date
+import pytest
+import season_simulator
+
+
+def test_scored_matches_count_as_played(conn, league):
+    league.match("A", "B", date(2025, 8, 16), 2, 0)
+    league.match("C", "D", date(2025, 8, 16), 1, 1)
+    league.match("B", "A", date(2025, 8, 23))
+    league.match("D", "C", date(2025, 8, 23))
+
+    result = season_simulator.simulate_season(conn, league.league_id, league.season_id, simulations=200)
+    assert result["remaining_fixtures"] == 2
+    points = {t["team"]: t["points"] for t in result["teams"]}
+    assert points == {"A": 3, "B": 0, "C": 1, "D": 1}
+    for team in result["teams"]:
+        assert abs(sum(team["position_probabilities"]) - 1) < 1e-9
+
+
+def test_finished_season_is_decided(conn, league):
+    league.match("A", "B", date(2025, 8, 16), 2, 0)
+    league.match("B", "C", date(2025, 8, 23), 3, 1)
+    league.match("C", "A", date(2025, 8, 30), 0, 0)
+
+    result = season_simulator.simulate_season(conn, league.league_id, league.season_id, simulations=100)
+    assert result["remaining_fixtures"] == 0
+    assert [t["team"] for t in result["teams"]] == ["A", "B", "C"]
+    assert [t["position_probabilities"][i] for i, t in enumerate(result["teams"])] == [1.0, 1.0, 1.0]
+
+
+def test_new_result_invalidates_cached_run(conn, league):
+    fixture = league.match("A", "B", date(2025, 8, 16))
+    first = season_simulator.simulate_season(conn, league.league_id, league.season_id, simulations=100)
+    assert first["remaining_fixtures"] == 1
+
+    league.cur.execute("UPDATE matches SET home_score = 1, away_score = 0 WHERE id = %s", (fixture,))
+    second = season_simulator.simulate_season(conn, league.league_id, league.season_id, simulations=100)
+    assert second["remaining_fixtures"] == 0
+    assert second["teams"][0]["team"] == "A"
+
+
+def test_app_shutdown_stops_the_worker_pool(test_dsn):
+    from fastapi.testclient import TestClient
+    import main
+    with TestClient(main.app):
+        pool = season_simulator._get_pool()
+        assert pool.submit(abs, -1).result() == 1
+    assert season_simulator._pool is None
+    with pytest.raises(RuntimeError):  # shut down
+        pool.submit(abs, -1)
@@ -0,0 +1,77 @@
+from decimal import Decimal
+import msgpack
+from serialization import dumps, rows_response, tuple_cursor
+
+MSGPACK = {"accept": "application/msgpack"}
+
+
+def _maps(body):
+    unpacker = msgpack.Unpacker(raw=False)
+    unpacker.feed(body)
+    return list(unpacker)
+
+
+def test_msgpack_framing_is_the_same_streamed_or_not(client, league):
+    league.team("A")
+    league.team("B")
+    league.cur.connection.commit()
+
+    buffered = client.get("/api/leagues", headers=MSGPACK)  # fetched, then encoded
+    streamed = client.get("/api/teams", headers=MSGPACK)    # server-side cursor
+    for response in (buffered, streamed):
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/msgpack"
+
+    assert [r["name"] for r in _maps(buffered.content)] == ["Test League"]
+    assert [r["name"] for r in _maps(streamed.content)] == ["A", "B"]
+    assert {r["league"] for r in _maps(streamed.content)} == {"Test League"}
+
+
+def test_json_columns_are_spliced_untouched(conn):
+    cur = tuple_cursor(conn)
+    cur.execute("""SELECT '{"b": 1.50, "a": [1]}'::jsonb AS blob, NULL::jsonb AS empty,
+                          2.50::numeric AS ratio, 3::numeric AS whole""")
+    body = rows_response(cur, cur.fetchall()).body
+    # Postgres' own text for the JSONB value, not a decode/re-encode of it (1.50 would become 1.5)
+    assert body == b'[{"blob":{"a": [1], "b": 1.50},"empty":null,"ratio":2.5,"whole":3}]'
+
+
+def test_numeric_encodes_like_jsonable_encoder():
+    assert dumps([Decimal("2"), Decimal("2.50"), Decimal("1E+1")]) == b"[2,2.5,10]"
+
+
+def test_negotiate_honours_q_values():
+    from serialization import negotiate
+    assert negotiate(None) == "json"
+    assert negotiate("text/html, */*") == "json"
+    assert negotiate("application/x-msgpack") == "msgpack"
+    assert negotiate("application/json;q=0.5, application/vnd.apache.arrow.stream") == "arrow"
+    assert negotiate("application/msgpack;q=0, application/json") == "json"
+    assert negotiate("application/msgpack;q=oops") == "json"
+
+
+def test_arrow_is_one_stream_streamed_or_not(client, league):
+    import pyarrow as pa
+    from serialization import ARROW_MEDIA
+    league.team("A")
+    league.team("B")
+    league.cur.connection.commit()
+
+    buffered = client.get("/api/leagues", headers={"accept": ARROW_MEDIA})
+    streamed = client.get("/api/teams", headers={"accept": ARROW_MEDIA})
+    for response in (buffered, streamed):
+        assert response.status_code == 200
+        assert response.headers["content-type"] == ARROW_MEDIA
+        assert "Accept" in response.headers["vary"]
+
+    assert pa.ipc.open_stream(buffered.content).read_all().column("name").to_pylist() == ["Test League"]
+    teams = pa.ipc.open_stream(streamed.content).read_all()
+    assert teams.column("name").to_pylist() == ["A", "B"]
+    assert teams.schema.field("id").type == pa.int32()
+
+
+def test_msgpack_decodes_json_columns(conn):
+    cur = tuple_cursor(conn)
+    cur.execute("""SELECT '{"goals": 2, "xg": [0.4, 1.1]}'::jsonb AS stats, 1.50::numeric AS ratio""")
+    response = rows_response(cur, cur.fetchall(), accept="application/msgpack")
+    assert _maps(response.body) == [{"stats": {"goals": 2, "xg": [0.4, 1.1]}, "ratio": 1.5}]
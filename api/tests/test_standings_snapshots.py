@@ -0,0 +1,124 @@
+import derived_data
+
+PAIRINGS = [(1, "A", "B"), (1, "C", "D"), (2, "A", "C"), (2, "B", "D"), (3, "A", "D"), (3, "B", "C")]
+
+
+def _sync(client, scores):
+    fixtures = [{"home_team": home, "away_team": away, "gameweek": str(gw),
+                 "date": f"2025-08-{16 + 7 * (gw - 1)}", "score": score}
+                for (gw, home, away), score in zip(PAIRINGS, scores)]
+    response = client.post("/api/sync/fixtures",
+                           json={"league": "Snapshot League", "season": "2025-2026", "fixtures": fixtures})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _open_transactions(conn):
+    """Other sessions left idle in a transaction, as a connection that was never closed is."""
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT COUNT(*) AS n FROM pg_stat_activity
+        WHERE datname = current_database() AND state = 'idle in transaction' AND pid <> pg_backend_pid()
+    """)
+    n = cur.fetchone()["n"]
+    conn.rollback()
+    return n
+
+
+def _table(conn, gameweek):
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT t.name, ss.points FROM standings_snapshots ss JOIN teams t ON t.id = ss.team_id
+        WHERE ss.gameweek = %s ORDER BY ss.rank
+    """, (gameweek,))
+    table = [(r["name"], r["points"]) for r in cur.fetchall()]
+    conn.rollback()
+    return table
+
+
+def test_resync_rebuilds_from_first_changed_gameweek(client, conn):
+    scores = ["1–0", "0–0", "2–2", "0–1", "", ""]
+    assert _sync(client, scores)["snapshots_rebuilt"] == 2
+    # Unchanged resend of the season: nothing to rebuild
+    assert _sync(client, scores)["snapshots_rebuilt"] == 0
+
+    # A gameweek 3 result only rebuilds gameweek 3
+    scores[4] = "3–0"
+    assert _sync(client, scores)["snapshots_rebuilt"] == 1
+    assert _table(conn, 3)[0] == ("A", 7)
+
+    # A corrected gameweek 2 result rebuilds 2 and 3
+    scores[2] = "0–1"
+    assert _sync(client, scores)["snapshots_rebuilt"] == 2
+    assert _table(conn, 2)[0] == ("C", 4)
+
+
+def test_result_edit_survives_failed_refresh(client, conn, monkeypatch):
+    _sync(client, ["", "", "", "", "", ""])
+    cur = conn.cursor()
+    cur.execute("SELECT id FROM matches ORDER BY gameweek, id LIMIT 1")
+    match_id = cur.fetchone()["id"]
+    conn.rollback()
+
+    def broken(*args):
+        raise RuntimeError("snapshot rebuild failed")
+
+    monkeypatch.setattr(derived_data, "rebuild_snapshots", broken)
+    response = client.put(f"/api/matches/{match_id}", params={"home_score": 2, "away_score": 1})
+    assert response.status_code == 200, response.text
+    assert _open_transactions(conn) == 0
+
+    cur.execute("SELECT home_score, away_score FROM matches WHERE id = %s", (match_id,))
+    assert cur.fetchone() == {"home_score": 2, "away_score": 1}
+    cur.execute("SELECT COUNT(*) AS n FROM team_ratings WHERE match_id = %s", (match_id,))
+    assert cur.fetchone()["n"] == 2  # later refreshes still ran
+
+
+def test_result_edit_of_unknown_match(client, conn):
+    assert client.put("/api/matches/999999", params={"home_score": 1, "away_score": 0}).status_code == 404
+    assert _open_transactions(conn) == 0
+
+
+def test_played_flag_follows_the_result(client, conn):
+    _sync(client, ["1–0", "", "", "", "", ""])
+    cur = conn.cursor()
+    cur.execute("SELECT COUNT(*) FILTER (WHERE is_played) AS played, COUNT(*) AS n FROM matches")
+    assert cur.fetchone() == {"played": 1, "n": 6}
+    cur.execute("SELECT id FROM matches WHERE NOT is_played ORDER BY id LIMIT 1")
+    match_id = cur.fetchone()["id"]
+    conn.rollback()
+    assert client.put(f"/api/matches/{match_id}", params={"home_score": 0, "away_score": 0}).json()["is_played"]
+
+
+def test_deleting_a_result_refreshes_derived_data(client, conn):
+    _sync(client, ["1–0", "0–0", "2–2", "0–1", "", ""])
+    cur = conn.cursor()
+    cur.execute("SELECT id FROM matches ORDER BY gameweek, id LIMIT 1")  # A 1-0 B
+    match_id = cur.fetchone()["id"]
+    cur.execute("SELECT elo FROM team_ratings r JOIN teams t ON t.id = r.team_id WHERE t.name = 'A' ORDER BY match_date DESC LIMIT 1")
+    elo_before = cur.fetchone()["elo"]
+    conn.rollback()
+
+    assert client.delete(f"/api/matches/{match_id}").json() == {"deleted": match_id}
+    assert _open_transactions(conn) == 0
+    assert ("A", 1) in _table(conn, 2)  # only the 2-2 draw left
+    cur.execute("SELECT elo FROM team_ratings r JOIN teams t ON t.id = r.team_id WHERE t.name = 'A' ORDER BY match_date DESC LIMIT 1")
+    assert cur.fetchone()["elo"] < elo_before  # replayed without the win
+    cur.execute("""
+        SELECT tf.form_games FROM team_features tf JOIN teams t ON t.id = tf.team_id
+        WHERE t.name = 'A' ORDER BY tf.match_date DESC LIMIT 1
+    """)
+    assert cur.fetchone()["form_games"] == 1  # the draw only
+    conn.rollback()
+    assert client.delete(f"/api/matches/{match_id}").status_code == 404
+
+
+def test_failed_refresh_is_logged_and_reported(client, conn, monkeypatch, caplog):
+    def broken(*args):
+        raise RuntimeError("snapshot rebuild failed")
+
+    monkeypatch.setattr(derived_data, "rebuild_snapshots", broken)
+    body = _sync(client, ["1–0", "", "", "", "", ""])
+    assert body["refresh_failed"] == ["snapshots"]
+    assert body["ratings_applied"] == 1
+    assert "snapshot rebuild failed" in caplog.text
@@ -0,0 +1,51 @@
+import asyncio
+import orjson
+import psycopg2
+import pytest
+import database
+import streaming
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """Connections stream_rows takes from the pool."""
+    taken = []
+
+    def get_connection():
+        taken.append(database.get_connection())
+        return taken[-1]
+
+    monkeypatch.setattr(streaming, "get_connection", get_connection)
+    return taken
+
+
+def _body(response):
+    async def collect():
+        return [chunk async for chunk in response.body_iterator]
+    return asyncio.run(collect())
+
+
+def test_rows_are_fetched_and_written_in_chunks(conn, opened):
+    response = streaming.stream_rows("SELECT n, n * 2 AS double FROM generate_series(1, 5) n", chunk_size=2)
+    [c] = opened
+    assert c._checked_out  # held while streaming
+    chunks = _body(response)
+    assert len(chunks) > 3
+    assert orjson.loads(b"".join(chunks)) == [{"n": n, "double": n * 2} for n in range(1, 6)]
+    assert not c._checked_out  # handed back once the body is done
+
+
+def test_sql_errors_surface_before_the_body(conn, opened):
+    with pytest.raises(psycopg2.Error):
+        streaming.stream_rows("SELECT no_such_column FROM teams")
+    assert not opened[0]._checked_out
+
+
+def test_unfiltered_lists_stream(client, league):
+    for name in ("C", "A", "B"):
+        league.team(name)
+    league.cur.connection.commit()
+    response = client.get("/api/teams")
+    assert response.headers["content-type"] == "application/json"
+    assert [t["name"] for t in response.json()] == ["A", "B", "C"]
+    assert client.get("/api/squad-stats").json() == []
@@ -0,0 +1,17 @@
+import benchmark
+
+
+def test_sync_all_writes_generated_league(client, conn):
+    payload = benchmark.sync_payload(0)
+    response = client.post("/api/sync/all", json=payload)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    n_teams = benchmark.TEAMS_PER_LEAGUE
+    assert body["fixtures_inserted"] == n_teams * (n_teams - 1)
+    assert body["standings_inserted"] == n_teams
+
+    cur = conn.cursor()
+    cur.execute("SELECT page_type, rows_inserted, duration_ms FROM scrape_log")
+    log = cur.fetchall()
+    assert [r["page_type"] for r in log] == ["sync_all"]
+    assert log[0]["duration_ms"] is not None
@@ -0,0 +1,84 @@
+import asyncio
+import os
+import psycopg2.extensions
+import database
+from routes import sync
+from routes.sync import log_scrape
+from sync_timing import SyncTimer
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _log(cur):
+    cur.execute("SELECT page_type, rows_inserted FROM scrape_log ORDER BY id")
+    return [(r["page_type"], r["rows_inserted"]) for r in cur.fetchall()]
+
+
+def test_timed_row(conn, league):
+    timer = SyncTimer()
+    with timer.phase("insert"):
+        pass
+    log_scrape(league.cur, league.league_id, league.season_id, "sync_all", 3, 0, timer)
+    league.cur.execute("SELECT duration_ms, phases FROM scrape_log")
+    row = league.cur.fetchone()
+    assert row["duration_ms"] is not None and "insert" in row["phases"]
+
+
+def test_falls_back_without_timing_columns(conn, league):
+    cur = league.cur
+    # Rolled back with the test's transaction
+    cur.execute("ALTER TABLE scrape_log DROP COLUMN duration_ms CASCADE, DROP COLUMN phases, DROP COLUMN tables")
+    log_scrape(cur, league.league_id, league.season_id, "sync_all", 5, 0, SyncTimer())
+    assert _log(cur) == [("sync_all", 5)]
+
+
+def test_failure_leaves_transaction_usable(conn, league):
+    cur = league.cur
+    log_scrape(cur, league.league_id, league.season_id, "x" * 500, 1, 0, SyncTimer())  # page_type too long
+    assert _log(cur) == []
+    cur.execute("SELECT COUNT(*) AS n FROM leagues")
+    assert cur.fetchone()["n"] == 1
+
+
+def _status(client):
+    response = client.get("/api/sync/status")
+    assert response.status_code == 200, response.text
+    return response.json()["leagues"]
+
+
+def test_status_reports_timings(client, conn, league):
+    log_scrape(league.cur, league.league_id, league.season_id, "sync_all", 3, 0, SyncTimer())
+    conn.commit()
+    [entry] = _status(client)
+    assert entry["league"] == "Test League" and entry["log"][0]["rows"] == 3
+    assert entry["timings"]["last"]["type"] == "sync_all"
+
+
+def test_status_without_timing_columns(client, conn, league):
+    cur = league.cur
+    cur.execute("ALTER TABLE scrape_log DROP COLUMN duration_ms CASCADE, DROP COLUMN phases, DROP COLUMN tables")
+    log_scrape(cur, league.league_id, league.season_id, "sync_all", 3, 0, SyncTimer())
+    conn.commit()
+    try:
+        [entry] = _status(client)
+        assert entry["log"][0]["rows"] == 3 and "timings" not in entry
+    finally:
+        with open(os.path.join(API_DIR, "..", "db", "09_sync_timings.sql")) as f:
+            cur.execute(f.read())
+        conn.commit()
+
+
+def test_status_connection_released_when_body_never_runs(conn, monkeypatch):
+    opened = []
+
+    def get_connection():
+        opened.append(database.get_connection())
+        return opened[-1]
+
+    monkeypatch.setattr(sync, "get_connection", get_connection)
+    response = sync.sync_status()
+    [c] = opened
+    assert c._checked_out
+    asyncio.run(response.background())  # the client went away before the body started
+    assert not c._checked_out and c in database._idle
+    assert c.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_IDLE
@@ -0,0 +1,69 @@
+import team_matrix
+
+
+def _squad(league, team, split, goals, shooting):
+    league.cur.execute("""
+        INSERT INTO team_squad_stats (team_id, league_id, season_id, split, goals, shooting)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """, (league.team(team), league.league_id, league.season_id, split, goals, shooting))
+
+
+def _venue(league, team, venue, points):
+    league.cur.execute("""
+        INSERT INTO team_venue_stats (team_id, league_id, season_id, venue, points)
+        VALUES (%s, %s, %s, %s, %s)
+    """, (league.team(team), league.league_id, league.season_id, venue, points))
+
+
+def _compare(client, league, ids, **params):
+    return client.get("/api/teams/compare", params={
+        "team_ids": ",".join(str(league.team(t)) for t in ids), "season_id": league.season_id, **params})
+
+
+def _league(league):
+    _squad(league, "A", "for", 60, '{"shots": "500", "sot_pct": 40.0}')
+    _squad(league, "B", "for", 40, '{"shots": "400", "sot_pct": 40.0}')
+    _squad(league, "C", "for", 20, '{"shots": "1,000"}')
+    _squad(league, "A", "against", 30, None)
+    _venue(league, "A", "home", 40)
+    _venue(league, "B", "home", 30)
+    league.cur.connection.commit()
+
+
+def test_stats_are_normalized_and_ranked_across_the_league(client, league):
+    _league(league)
+    response = _compare(client, league, ["B", "A"])
+    assert response.status_code == 200, response.text
+    b, a = response.json()["teams"]
+    assert (a["team"], b["team"]) == ("A", "B")
+    assert b["stats"]["for.goals"] == {"value": 40.0, "normalized": 0.5, "rank": 2, "of": 3}
+    assert b["stats"]["for.shots"]["rank"] == 3  # "1,000" parsed
+    assert a["stats"]["for.sot_pct"]["normalized"] == 1.0  # level on every team
+    assert a["stats"]["home.points"]["rank"] == 1
+    assert "against.goals" in a["stats"] and "against.goals" not in b["stats"]
+
+
+def test_stats_filter_and_errors(client, league):
+    _league(league)
+    [a] = _compare(client, league, ["A"], stats="for.goals,home.points").json()["teams"]
+    assert set(a["stats"]) == {"for.goals", "home.points"}
+    assert _compare(client, league, ["A"], stats="for.nope").status_code == 400
+    assert client.get("/api/teams/compare", params={"team_ids": "x", "season_id": 1}).status_code == 400
+    assert client.get("/api/teams/compare", params={"team_ids": "999", "season_id": 1}).status_code == 404
+
+
+def test_team_without_stats_is_listed_empty(client, league):
+    _league(league)
+    league.team("D")
+    league.cur.connection.commit()
+    [d] = _compare(client, league, ["D"]).json()["teams"]
+    assert d["stats"] == {} and d["league_id"] == league.league_id
+
+
+def test_matrix_rebuilt_only_after_a_sync(conn, league):
+    _league(league)
+    first = team_matrix.team_matrix(conn, league.league_id, league.season_id)
+    assert team_matrix.team_matrix(conn, league.league_id, league.season_id) is first
+    _venue(league, "C", "home", 10)
+    conn.commit()
+    assert team_matrix.team_matrix(conn, league.league_id, league.season_id) is not first
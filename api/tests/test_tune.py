@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+import numpy as np
+from ml import tune
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_league_id_is_rejected_with_dataset():
+    out = subprocess.run([sys.executable, "-m", "ml.tune", "--dataset", "data/train", "--league-id", "1", "--publish"],
+                         cwd=API_DIR, capture_output=True, text=True)
+    assert out.returncode == 2
+    assert "--league-id does not apply to --dataset" in out.stderr
+
+
+def test_folds_train_only_on_earlier_matches(monkeypatch):
+    monkeypatch.setattr(tune, "MIN_TRAIN_MATCHES", 1)
+    # Season 7 starts first; season 3 overlaps the end of season 7 in another league
+    seasons = np.array([7, 7, 7, 3, 3, 3, 5, 5])
+    days = np.array([0, 10, 20, 15, 30, 40, 50, 60])
+    folds = tune.season_folds(seasons, days)
+    assert [s for s, _, _ in folds] == [3, 5]
+    for _, train_idx, test_idx in folds:
+        assert days[train_idx].max() < days[test_idx].min()
+    assert list(folds[0][1]) == [0, 1]  # day 20 is after season 3 began
+
+
+def test_first_trial_is_the_defaults():
+    trials = tune.sample_trials("xgboost", 6, seed=1)
+    assert trials[0] == {} and len(trials) == 6
+    assert len({tuple(sorted(t.items())) for t in trials}) == 6
+    assert trials == tune.sample_trials("xgboost", 6, seed=1)
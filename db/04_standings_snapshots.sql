@@ -0,0 +1,27 @@
+-- Migration: per-gameweek standings snapshots ("table as of gameweek N")
+-- Rebuilt incrementally by api/standings_snapshots.py from matches.gameweek
+-- (falling back to match_date weeks when gameweek is missing).
+-- One narrow row per team per gameweek; no surrogate id, all counters SMALLINT.
+
+CREATE TABLE IF NOT EXISTS standings_snapshots (
+    league_id     INTEGER  NOT NULL REFERENCES leagues(id) ON DELETE CASCADE,
+    season_id     INTEGER  NOT NULL REFERENCES seasons(id) ON DELETE CASCADE,
+    gameweek      SMALLINT NOT NULL,
+    team_id       INTEGER  NOT NULL REFERENCES teams(id)   ON DELETE CASCADE,
+    rank          SMALLINT NOT NULL,
+    games         SMALLINT NOT NULL,
+    wins          SMALLINT NOT NULL,
+    ties          SMALLINT NOT NULL,
+    losses        SMALLINT NOT NULL,
+    goals_for     SMALLINT NOT NULL,
+    goals_against SMALLINT NOT NULL,
+    points        SMALLINT NOT NULL,
+    PRIMARY KEY (league_id, season_id, gameweek, team_id)
+);
+
+-- Position-over-time lookups for a single team
+CREATE INDEX IF NOT EXISTS idx_snapshots_team
+    ON standings_snapshots (team_id, season_id, gameweek);
+
+COMMENT ON TABLE standings_snapshots IS
+  'Cumulative league table after each gameweek. goal_diff is derived (goals_for - goals_against) at read time.';
@@ -0,0 +1,15 @@
+-- Migration: precomputed league-season overview documents
+-- Assembled by api/league_overview.py after every sync that touches the league
+-- and served by GET /api/leagues/{id}/overview (one primary-key read) with the
+-- upcoming fixtures, which depend on the current date, queried at serve time.
+
+CREATE TABLE IF NOT EXISTS league_overviews (
+    league_id  INTEGER NOT NULL REFERENCES leagues(id) ON DELETE CASCADE,
+    season_id  INTEGER NOT NULL REFERENCES seasons(id) ON DELETE CASCADE,
+    document   JSONB   NOT NULL,
+    built_at   TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (league_id, season_id)
+);
+
+COMMENT ON TABLE league_overviews IS
+  'Standings, top scorers, recent results and squad leaders for a league-season, rebuilt on sync.';
@@ -0,0 +1,47 @@
+-- Migration: typed generated columns for frequently ranked player stats
+-- Backs GET /api/players/leaderboard: the hot keys of player_stats.standard_stats
+-- are promoted to STORED double precision columns with plain and per-90
+-- expression indexes, so top-N queries walk an index instead of scanning JSONB.
+-- Keep the column list in sync with _HOT_STATS in api/routes/player_stats.py.
+
+-- FBref values arrive as JSON strings like "1,234" or "12.5%"; NULL when not numeric.
+CREATE OR REPLACE FUNCTION fbref_num(v JSONB)
+RETURNS DOUBLE PRECISION
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT CASE
+        WHEN jsonb_typeof(v) = 'number' THEN (v #>> '{}')::double precision
+        WHEN jsonb_typeof(v) = 'string'
+             AND translate(v #>> '{}', ',%', '') ~ '^-?[0-9]*\.?[0-9]+$'
+            THEN translate(v #>> '{}', ',%', '')::double precision
+    END
+$$;
+
+ALTER TABLE player_stats
+    ADD COLUMN IF NOT EXISTS stat_xg                          DOUBLE PRECISION
+        GENERATED ALWAYS AS (fbref_num(standard_stats -> 'xg')) STORED,
+    ADD COLUMN IF NOT EXISTS stat_npxg                        DOUBLE PRECISION
+        GENERATED ALWAYS AS (fbref_num(standard_stats -> 'npxg')) STORED,
+    ADD COLUMN IF NOT EXISTS stat_xg_assist                   DOUBLE PRECISION
+        GENERATED ALWAYS AS (fbref_num(standard_stats -> 'xg_assist')) STORED,
+    ADD COLUMN IF NOT EXISTS stat_progressive_carries         DOUBLE PRECISION
+        GENERATED ALWAYS AS (fbref_num(standard_stats -> 'progressive_carries')) STORED,
+    ADD COLUMN IF NOT EXISTS stat_progressive_passes          DOUBLE PRECISION
+        GENERATED ALWAYS AS (fbref_num(standard_stats -> 'progressive_passes')) STORED,
+    ADD COLUMN IF NOT EXISTS stat_progressive_passes_received DOUBLE PRECISION
+        GENERATED ALWAYS AS (fbref_num(standard_stats -> 'progressive_passes_received')) STORED;
+
+-- Totals, per season
+CREATE INDEX IF NOT EXISTS idx_player_stat_xg      ON player_stats (season_id, stat_xg DESC NULLS LAST);
+CREATE INDEX IF NOT EXISTS idx_player_stat_npxg    ON player_stats (season_id, stat_npxg DESC NULLS LAST);
+CREATE INDEX IF NOT EXISTS idx_player_stat_xa      ON player_stats (season_id, stat_xg_assist DESC NULLS LAST);
+CREATE INDEX IF NOT EXISTS idx_player_stat_prgc    ON player_stats (season_id, stat_progressive_carries DESC NULLS LAST);
+CREATE INDEX IF NOT EXISTS idx_player_stat_prgp    ON player_stats (season_id, stat_progressive_passes DESC NULLS LAST);
+CREATE INDEX IF NOT EXISTS idx_player_stat_prgr    ON player_stats (season_id, stat_progressive_passes_received DESC NULLS LAST);
+
+-- Per-90 rates (same expression the API orders by)
+CREATE INDEX IF NOT EXISTS idx_player_stat_xg_p90   ON player_stats (season_id, (stat_xg / NULLIF(minutes_90s, 0)::double precision) DESC NULLS LAST);
+CREATE INDEX IF NOT EXISTS idx_player_stat_npxg_p90 ON player_stats (season_id, (stat_npxg / NULLIF(minutes_90s, 0)::double precision) DESC NULLS LAST);
+CREATE INDEX IF NOT EXISTS idx_player_stat_xa_p90   ON player_stats (season_id, (stat_xg_assist / NULLIF(minutes_90s, 0)::double precision) DESC NULLS LAST);
+CREATE INDEX IF NOT EXISTS idx_player_stat_prgc_p90 ON player_stats (season_id, (stat_progressive_carries / NULLIF(minutes_90s, 0)::double precision) DESC NULLS LAST);
+CREATE INDEX IF NOT EXISTS idx_player_stat_prgp_p90 ON player_stats (season_id, (stat_progressive_passes / NULLIF(minutes_90s, 0)::double precision) DESC NULLS LAST);
+CREATE INDEX IF NOT EXISTS idx_player_stat_prgr_p90 ON player_stats (season_id, (stat_progressive_passes_received / NULLIF(minutes_90s, 0)::double precision) DESC NULLS LAST);
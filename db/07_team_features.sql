@@ -0,0 +1,38 @@
+-- Migration: per-team, per-match feature store for the match models
+-- Maintained incrementally by api/ml/feature_store.py after every fixtures sync:
+-- only teams whose stored outcome differs from matches are replayed, from their
+-- earliest changed match onwards.
+-- Feature columns describe the team *before* kick-off; goals_for/goals_against
+-- are this match's outcome (the training label), NULL until played.
+
+CREATE TABLE IF NOT EXISTS team_features (
+    team_id             INTEGER  NOT NULL REFERENCES teams(id)   ON DELETE CASCADE,
+    match_id            INTEGER  NOT NULL REFERENCES matches(id) ON DELETE CASCADE,
+    match_date          DATE     NOT NULL,
+    league_id           INTEGER  NOT NULL REFERENCES leagues(id) ON DELETE CASCADE,
+    season_id           INTEGER  NOT NULL REFERENCES seasons(id) ON DELETE CASCADE,
+    is_home             BOOLEAN  NOT NULL,
+    -- rolling form over the last N played matches (any competition)
+    form_games          SMALLINT NOT NULL,
+    form_points         REAL,
+    form_goals_for      REAL,
+    form_goals_against  REAL,
+    -- season-to-date strength at this venue: earlier results this season, home or away
+    venue_ppg           REAL,
+    venue_goals_for     REAL,
+    venue_goals_against REAL,
+    rest_days           SMALLINT,
+    goals_for           SMALLINT,
+    goals_against       SMALLINT,
+    updated_at          TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (team_id, match_id)
+);
+
+-- Match-level joins (home row + away row) and league-season training extracts
+CREATE INDEX IF NOT EXISTS idx_team_features_match
+    ON team_features (match_id);
+CREATE INDEX IF NOT EXISTS idx_team_features_league_season
+    ON team_features (league_id, season_id, match_date);
+-- Replays delete a team's rows from a date onwards
+CREATE INDEX IF NOT EXISTS idx_team_features_team_date
+    ON team_features (team_id, match_date);
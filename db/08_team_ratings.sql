@@ -0,0 +1,26 @@
+-- Migration: per-team rating history (Elo + Poisson attack/defence strengths)
+-- Maintained incrementally by api/ratings.py after every fixtures sync: results
+-- are replayed per league only from the earliest result not yet applied.
+-- One row per team per played match holding the ratings *after* that match;
+-- goals_for/goals_against record the result that was applied.
+
+CREATE TABLE IF NOT EXISTS team_ratings (
+    team_id       INTEGER  NOT NULL REFERENCES teams(id)   ON DELETE CASCADE,
+    match_id      INTEGER  NOT NULL REFERENCES matches(id) ON DELETE CASCADE,
+    match_date    DATE     NOT NULL,
+    league_id     INTEGER  NOT NULL REFERENCES leagues(id) ON DELETE CASCADE,
+    season_id     INTEGER  NOT NULL REFERENCES seasons(id) ON DELETE CASCADE,
+    elo           REAL     NOT NULL,
+    attack        REAL     NOT NULL,
+    defence       REAL     NOT NULL,
+    goals_for     SMALLINT NOT NULL,
+    goals_against SMALLINT NOT NULL,
+    PRIMARY KEY (team_id, match_id)
+);
+
+-- Current rating (latest row per team) and per-team history
+CREATE INDEX IF NOT EXISTS idx_team_ratings_team_date
+    ON team_ratings (team_id, match_date DESC);
+-- Replays delete a league's rows from a date onwards
+CREATE INDEX IF NOT EXISTS idx_team_ratings_league_date
+    ON team_ratings (league_id, match_date);
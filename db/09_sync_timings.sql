@@ -0,0 +1,14 @@
+-- Migration: per-phase sync timings on scrape_log
+-- Every /api/sync/* request records how long it took and where the time went
+-- (api/sync_timing.py): phases maps phase name -> milliseconds (validate,
+-- parse, resolve, insert, snapshots, features, ratings, overview, commit) and
+-- tables maps table type -> {"rows", "ms", "rows_per_sec"} for the rows written.
+-- /api/sync/status reports the latest sync and percentiles per league.
+
+ALTER TABLE scrape_log ADD COLUMN IF NOT EXISTS duration_ms REAL;
+ALTER TABLE scrape_log ADD COLUMN IF NOT EXISTS phases      JSONB;
+ALTER TABLE scrape_log ADD COLUMN IF NOT EXISTS tables      JSONB;
+
+-- Status percentiles only read timed rows from the last few weeks
+CREATE INDEX IF NOT EXISTS idx_scrape_log_timed
+    ON scrape_log(league_id, scraped_at DESC) WHERE duration_ms IS NOT NULL;
@@ -0,0 +1,25 @@
+-- Migration: pre-match venue strength in team_features
+-- venue_ppg / venue_goals_for / venue_goals_against used to be copied from the
+-- season's team_venue_stats totals, which include the match's own result and
+-- every later one. api/ml/feature_store.py now builds them from the team's
+-- earlier results this season at the same venue; this rewrites the stored rows
+-- the same way so training data needs no full replay.
+
+UPDATE team_features tf SET
+    venue_ppg           = v.ppg,
+    venue_goals_for     = v.gf,
+    venue_goals_against = v.ga,
+    updated_at          = NOW()
+FROM (
+    SELECT team_id, match_id,
+           AVG(CASE WHEN goals_for > goals_against THEN 3
+                    WHEN goals_for = goals_against THEN 1
+                    WHEN goals_for < goals_against THEN 0 END) OVER w AS ppg,
+           AVG(goals_for)     OVER w AS gf,
+           AVG(goals_against) OVER w AS ga
+    FROM team_features
+    WINDOW w AS (PARTITION BY team_id, season_id, is_home
+                 ORDER BY match_date, match_id
+                 ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING)
+) v
+WHERE tf.team_id = v.team_id AND tf.match_id = v.match_id;
@@ -209,30 +209,25 @@ def import_players(cur, season_id, league_id, headers, data):
     return inserted
 
 # ─── Main ─────────────────────────────────────────────────────────────────────
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--file", required=True, help="Path to the Excel file")
-    args = parser.parse_args()
+def import_workbook(conn, path, log=print):
+    """Import every section of the workbook at `path`; returns (fixtures, squad, players) row counts."""
+    cur = conn.cursor()
 
-    print(f"🔌 Connecting to database...")
-    conn = connect()
-    cur  = conn.cursor()
-
-    print(f"📂 Opening {args.file}")
-    wb = openpyxl.load_workbook(args.file, read_only=True, data_only=True)
+    log(f"📂 Opening {path}")
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
 
     total_fixtures = total_squad = total_players = 0
 
     for sheet_name in wb.sheetnames:
         if sheet_name.lower() == "metadata":
-            print(f"  ⏭  Skipping Metadata sheet")
+            log(f"  ⏭  Skipping Metadata sheet")
             continue
 
         ws   = wb[sheet_name]
         rows = rows_from_sheet(ws)
         secs = find_sections(rows)
 
-        print(f"\n📋 Sheet: {sheet_name!r} | {len(secs)} sections")
+        log(f"\n📋 Sheet: {sheet_name!r} | {len(secs)} sections")
 
         for i in range(len(secs)):
             title, headers, data = section_rows(rows, secs, i)
@@ -249,20 +244,32 @@ def main():
             if stype == "fixtures":
                 n = import_fixtures(cur, league_id, season_id, headers, data)
                 total_fixtures += n
-                print(f"  ✅ Fixtures ({season}): {n} rows")
+                log(f"  ✅ Fixtures ({season}): {n} rows")
 
             elif stype in ("standard", "goalkeeping", "shooting", "playing_time", "misc"):
                 n = import_squad_stats(cur, league_id, season_id, stype, headers, data)
                 total_squad += n
-                print(f"  ✅ Squad {stype} ({season}): {n} rows")
+                log(f"  ✅ Squad {stype} ({season}): {n} rows")
 
             elif stype == "player":
                 n = import_players(cur, season_id, league_id, headers, data)
                 total_players += n
-                print(f"  ✅ Players ({season}): {n} rows")
+                log(f"  ✅ Players ({season}): {n} rows")
 
         conn.commit()
 
+    wb.close()
+    return total_fixtures, total_squad, total_players
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--file", required=True, help="Path to the Excel file")
+    args = parser.parse_args()
+
+    print(f"🔌 Connecting to database...")
+    conn = connect()
+    total_fixtures, total_squad, total_players = import_workbook(conn, args.file)
+
     print(f"\n🎉 Import complete!")
     print(f"   Fixtures : {total_fixtures}")
     print(f"   Squad    : {total_squad}")